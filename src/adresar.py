@@ -0,0 +1,298 @@
+"""
+Partneri (príjemcovia platieb) zo SEPA súboru.
+
+RegisterPartnerov drží načítaných partnerov s indexmi podľa čísla, IBAN-u
+a normalizovaného názvu, takže vyhľadávanie je O(1) aj pri desaťtisícoch
+partnerov. Súbor sa znovu spracuje iba vtedy, keď sa zmení (mtime/veľkosť).
+Súbor sa číta iba raz, kódovanie sa zistí z BOM/obsahu a riadky sa spracúvajú
+postupne; neplatné riadky sa hlásia s číslom riadku až po načítaní.
+"""
+import bisect
+import codecs
+import io
+import mmap
+import os
+import re
+import threading
+import unicodedata
+from collections import namedtuple
+from collections.abc import Mapping
+
+import meranie
+from kontrola_iban import dovod_neplatnosti, normalizuj_iban
+
+ANSI_BLUE = "\033[94m"
+ANSI_YELLOW = "\033[93m"
+ANSI_RED = "\033[91m"
+ANSI_END = "\033[0m"
+
+VELKOST_VZORKY = 4096          # Vzorka na rozpoznanie UTF-16 bez BOM
+VELKOST_BLOKU = 1024 * 1024    # Blok pre overenie UTF-8
+HRANICA_MMAP = 8 * 1024 * 1024 # Od tejto veľkosti sa súbor mapuje do pamäte (mmap) namiesto čítania
+
+ChybnyRiadok = namedtuple('ChybnyRiadok', ['cislo_riadku', 'ukazka', 'dovod'])
+
+
+def zisti_kodovanie(data):
+    """
+    Zistí kódovanie obsahu súboru (bytes alebo mmap) jedným prechodom bez dekódovania do pamäte.
+    Poradie: BOM, UTF-16 bez BOM (nulové bajty vo vzorke), platné UTF-8, cp1250, iso-8859-2
+    (aj keď obsah nemá znaky typické pre iso-8859-2, ale má bajty, ktoré cp1250 nedefinuje).
+    """
+    if data[:3] == codecs.BOM_UTF8:
+        return 'utf-8-sig'
+    if data[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+        return 'utf-16'
+    if b'\x00' in data[:VELKOST_VZORKY]:
+        return 'utf-16-le' if data[1:2] == b'\x00' else 'utf-16-be'
+
+    # Overenie UTF-8 po blokoch (inkrementálny dekodér si text nepamätá)
+    dekoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for zaciatok in range(0, len(data), VELKOST_BLOKU):
+            dekoder.decode(data[zaciatok:zaciatok + VELKOST_BLOKU])
+        dekoder.decode(b'', final=True)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    # cp1250 (bežné pre SK Windows) má š, ž, ť, Š, Ž, Ť v rozsahu 0x80-0x9F, ktorý iso-8859-2
+    # nepoužíva (riadiace znaky). Bez nich, ale so Š/Ž/Ť/š/ť na pozíciách iso-8859-2, ide o iso-8859-2.
+    if not re.search(rb'[\x80-\x9f]', data) and re.search(rb'[\xa9\xab\xae\xb9\xbb]', data):
+        return 'iso-8859-2'
+    # Bajty, ktoré cp1250 nedefinuje: v cp1250 by sa súbor nedal dekódovať, iso-8859-2 ich prečíta
+    if re.search(rb'[\x81\x83\x88\x90\x98]', data):
+        return 'iso-8859-2'
+    return 'cp1250'
+
+
+def _riadky(data, kodovanie):
+    """Postupne vracia dekódované riadky obsahu (bez vytvárania zoznamu všetkých riadkov)."""
+    if kodovanie.startswith('utf-16'):
+        # UTF-16 nejde deliť po bajtoch '\n', takéto súbory sú malé exporty
+        yield from bytes(data).decode(kodovanie).splitlines()
+        return
+    citac = data.readline if hasattr(data, 'readline') else io.BytesIO(data).readline
+    for riadok in iter(citac, b''):
+        yield riadok.decode(kodovanie)
+
+
+def parsuj_partnerov(riadky, chybne_riadky):
+    """
+    Postupne spracuje riadky súboru partnerov (názov;IBAN;...;preferovaný názov).
+    Vracia dvojice (názov, IBAN); neplatné riadky pridá do chybne_riadky ako ChybnyRiadok.
+    """
+    for cislo_riadku, riadok in enumerate(riadky, start=1):
+        riadok = riadok.strip().lstrip('\ufeff')
+        if not riadok:
+            continue
+        casti = riadok.split(';')
+        if len(casti) < 2:
+            chybne_riadky.append(ChybnyRiadok(cislo_riadku, riadok[:30], "nemá očakávaný formát (chýba ';')"))
+            continue
+        nazov = casti[0].strip()
+        iban = normalizuj_iban(casti[1].strip()) # Odstránime aj medzery z IBANu
+
+        # Úplná kontrola (krajina, dĺžka, mod 97) hneď pri načítaní, nie až pri generovaní QR
+        dovod = dovod_neplatnosti(iban)
+        if dovod:
+            chybne_riadky.append(ChybnyRiadok(cislo_riadku, riadok[:30], f"neobsahuje platný IBAN ({dovod})"))
+            continue
+        preferovany_nazov = casti[3].strip() if len(casti) > 3 and casti[3].strip() else nazov
+        if preferovany_nazov:
+            yield preferovany_nazov, iban
+
+
+def nacitaj_partnerov(cesta_k_suboru):
+    """
+    Načíta partnerov zo súboru jedným čítaním (veľké súbory cez mmap).
+    Vráti (partneri, chybne_riadky, kodovanie), kde partneri je {číslo: {'nazov', 'iban'}}.
+    Chyby pri otváraní súboru (OSError) necháva volajúcemu.
+    """
+    chybne_riadky = []
+    partneri = {}
+    with meranie.meraj('partneri'), open(cesta_k_suboru, 'rb') as f:
+        velkost = os.fstat(f.fileno()).st_size
+        if velkost >= HRANICA_MMAP:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+        try:
+            kodovanie = zisti_kodovanie(data)
+            for cislo_partnera, (nazov, iban) in enumerate(parsuj_partnerov(_riadky(data, kodovanie), chybne_riadky), start=1):
+                partneri[str(cislo_partnera)] = {"nazov": nazov, "iban": iban}
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+    meranie.pripocitaj('partneri_nacitani', len(partneri))
+    meranie.pripocitaj('partneri_chybne_riadky', len(chybne_riadky))
+    return partneri, chybne_riadky, kodovanie
+
+
+def vypis_chybne_riadky(chybne_riadky, limit=10):
+    """Vypíše neplatné riadky súboru partnerov s číslami riadkov (najviac limit, zvyšok zhrnie)."""
+    for chyba in chybne_riadky[:limit]:
+        print(f"⚠️ {ANSI_YELLOW}Varovanie: Riadok {chyba.cislo_riadku} ('{chyba.ukazka}...') {chyba.dovod}, preskakuje sa.{ANSI_END}")
+    if len(chybne_riadky) > limit:
+        print(f"⚠️ {ANSI_YELLOW}... a ďalších {len(chybne_riadky) - limit} neplatných riadkov.{ANSI_END}")
+
+
+def _nacitaj_s_hlaseniami(cesta_k_suboru):
+    """Načíta partnerov a vypíše hlásenia pre používateľa. Vráti (partneri, chybne_riadky) alebo (None, None)."""
+    try:
+        partneri, chybne_riadky, kodovanie = nacitaj_partnerov(cesta_k_suboru)
+    except FileNotFoundError:
+        print(f"❌ {ANSI_RED}Chyba: Súbor '{cesta_k_suboru}' sa nenašiel.{ANSI_END}")
+        return None, None
+    except (PermissionError, IsADirectoryError):
+        print(f"❌ {ANSI_RED}Chyba: Program nemá povolenie čítať súbor/priečinok.{ANSI_END}")
+        print(f"   {ANSI_RED}Uistite sa, že zadávate cestu k SÚBORU (napr. partneri.txt), nie k priečinku.{ANSI_END}")
+        return None, None
+    except UnicodeDecodeError as e:
+        print(f"❌ {ANSI_RED}Chyba: Súbor sa nepodarilo dekódovať ({e}).{ANSI_END}")
+        print(f"   {ANSI_RED}Skontrolujte, či súbor nie je poškodený alebo v inom kódovaní.{ANSI_END}")
+        return None, None
+    except Exception as e:
+        # Iná chyba
+        print(f"❌ {ANSI_RED}Chyba pri otváraní súboru: {e}{ANSI_END}")
+        return None, None
+
+    print(f"ℹ️ {ANSI_BLUE}Súbor úspešne načítaný s kódovaním: {kodovanie}{ANSI_END}")
+    vypis_chybne_riadky(chybne_riadky)
+    if not partneri:
+        print(f"❌ {ANSI_RED}V súbore sa nenašli žiadni platní partneri.{ANSI_END}")
+        return None, None
+    return partneri, chybne_riadky
+
+
+def nacitaj_partnerov_zo_suboru(cesta_k_suboru):
+    """
+    Načíta partnerov (názov, IBAN) z textového súboru.
+    Kódovanie (utf-8, cp1250, atď.) sa zistí automaticky.
+    Akceptuje rôzne SEPA IBAN formáty. Vráti {číslo: {'nazov', 'iban'}} alebo None.
+    """
+    return _nacitaj_s_hlaseniami(cesta_k_suboru)[0]
+
+
+def normalizuj_nazov(nazov):
+    """Názov bez diakritiky, veľkých písmen a nadbytočných medzier (pre vyhľadávanie)."""
+    bez_diakritiky = unicodedata.normalize('NFKD', nazov)
+    bez_diakritiky = ''.join(znak for znak in bez_diakritiky if not unicodedata.combining(znak))
+    return ' '.join(bez_diakritiky.casefold().split())
+
+
+class RegisterPartnerov(Mapping):
+    """
+    Partneri s indexmi pre rýchle vyhľadávanie.
+    Správa sa ako pôvodný slovník {číslo: {'nazov', 'iban'}}, iteruje sa v poradí čísel.
+    """
+
+    def __init__(self, partneri, cesta=None, chybne_riadky=()):
+        self.cesta = cesta
+        self.chybne_riadky = list(chybne_riadky)
+        self._podla_kluca = dict(partneri)
+        self._podla_ibanu = {}
+        self._podla_nazvu = {}
+        for kluc, partner in self._podla_kluca.items():
+            # Pri duplicitnom IBAN-e platí prvý výskyt (ako v menu)
+            self._podla_ibanu.setdefault(normalizuj_iban(partner['iban']), kluc)
+            self._podla_nazvu.setdefault(normalizuj_nazov(partner['nazov']), []).append(kluc)
+        # Zoradené názvy pre vyhľadávanie podľa začiatku (bisect)
+        self._zoradene_nazvy = sorted(self._podla_nazvu)
+
+    def __getitem__(self, kluc):
+        return self._podla_kluca[kluc]
+
+    def __iter__(self):
+        return iter(self._podla_kluca)
+
+    def __len__(self):
+        return len(self._podla_kluca)
+
+    def podla_ibanu(self, iban):
+        """Vráti číslo partnera s daným IBAN-om alebo None."""
+        return self._podla_ibanu.get(normalizuj_iban(iban))
+
+    def podla_nazvu(self, nazov):
+        """Vráti čísla partnerov s presne týmto názvom (bez ohľadu na diakritiku a veľkosť písmen)."""
+        return list(self._podla_nazvu.get(normalizuj_nazov(nazov), []))
+
+    def najdi_partnera(self, text):
+        """
+        Jednoznačne určí partnera podľa čísla, IBAN-u alebo presného názvu.
+        Vráti číslo partnera alebo None (nenájdený alebo nejednoznačný názov).
+        """
+        text = text.strip()
+        if text in self._podla_kluca:
+            return text
+        kluc = self.podla_ibanu(text)
+        if kluc is not None:
+            return kluc
+        podla_nazvu = self.podla_nazvu(text)
+        return podla_nazvu[0] if len(podla_nazvu) == 1 else None
+
+    def hladaj(self, text, limit=20):
+        """
+        Vyhľadá partnerov pre menu: najprv podľa začiatku názvu, potom podľa časti názvu,
+        a ak nič nenájde, podľa podobnosti (preklepy). Vráti zoznam čísel partnerov.
+        """
+        hladany = normalizuj_nazov(text)
+        if not hladany:
+            return []
+        vysledok = []
+
+        def pridaj(nazov):
+            for kluc in self._podla_nazvu[nazov]:
+                if kluc not in vysledok:
+                    vysledok.append(kluc)
+
+        i = bisect.bisect_left(self._zoradene_nazvy, hladany)
+        while i < len(self._zoradene_nazvy) and self._zoradene_nazvy[i].startswith(hladany) and len(vysledok) < limit:
+            pridaj(self._zoradene_nazvy[i])
+            i += 1
+        if len(vysledok) < limit:
+            for nazov in self._zoradene_nazvy:
+                if hladany in nazov:
+                    pridaj(nazov)
+                    if len(vysledok) >= limit:
+                        break
+        if not vysledok:
+            import difflib  # Iba pre preklepy, štart programu ho nepotrebuje
+            # Preklepy: hľadaný text porovnáme so začiatkami názvov rovnakej dĺžky
+            zaciatky = {}
+            for nazov in self._zoradene_nazvy:
+                zaciatky.setdefault(nazov[:len(hladany)], []).append(nazov)
+            for zaciatok in difflib.get_close_matches(hladany, zaciatky, n=limit, cutoff=0.7):
+                for nazov in zaciatky[zaciatok]:
+                    pridaj(nazov)
+        return vysledok[:limit]
+
+
+_zamok = threading.Lock()
+_snapshoty = {}  # absolútna cesta -> (mtime_ns, veľkosť, RegisterPartnerov)
+
+
+def nacitaj_register(cesta_k_suboru):
+    """
+    Vráti RegisterPartnerov pre súbor, alebo None ak sa partnerov nepodarilo načítať.
+    Ak sa súbor od posledného načítania nezmenil (mtime a veľkosť), vráti zapamätaný register bez čítania.
+    """
+    try:
+        stav = os.stat(cesta_k_suboru)
+        kluc = os.path.abspath(cesta_k_suboru)
+    except OSError:
+        stav = kluc = None  # Chybu (neexistujúci súbor a pod.) vypíše _nacitaj_s_hlaseniami
+
+    if kluc is not None:
+        with _zamok:
+            snapshot = _snapshoty.get(kluc)
+        if snapshot and snapshot[0] == stav.st_mtime_ns and snapshot[1] == stav.st_size:
+            return snapshot[2]
+
+    partneri, chybne_riadky = _nacitaj_s_hlaseniami(cesta_k_suboru)
+    if not partneri:
+        return None
+    register = RegisterPartnerov(partneri, cesta_k_suboru, chybne_riadky)
+    if kluc is not None:
+        with _zamok:
+            _snapshoty[kluc] = (stav.st_mtime_ns, stav.st_size, register)
+    return register
@@ -0,0 +1,354 @@
+"""
+Meranie výkonu celej cesty payload -> QR -> PDF.
+
+Pre každú veľkosť (počet čiastok) vytvorí syntetický súbor partnerov a platbu,
+ktorá sa rozdelí na daný počet čiastok, a zmeria jednotlivé etapy zvlášť:
+načítanie partnerov, delenie sumy, pay_by_square.generate, QR maticu, uloženie PNG,
+načítanie cez ImageReader, PDF s vektorovými aj rastrovými QR kódmi a celý beh
+vygeneruj_platbu so studenou cache (so špičkou pamäte cez tracemalloc).
+Výsledok sa uloží ako JSON a dá sa porovnať s meraním inej verzie.
+Zvlášť sa dá overiť aj štart programu: import main.py (python -X importtime) musí byť
+pod rozpočtom a nesmie načítať ťažké knižnice, ktoré sa importujú až pri generovaní.
+
+Použitie:
+    python src/benchmark.py                                 (veľkosti 1, 100, 10000)
+    python src/benchmark.py --velkosti 1 100 --vystup nove.json --porovnaj stare.json
+    python src/benchmark.py --start                         (iba štart, kód 1 pri prekročení rozpočtu)
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ZACIATOK_IMPORTU = time.perf_counter()
+import pay_by_square
+from reportlab.lib.utils import ImageReader
+
+import adresar
+import cache
+import fonty
+import kontrola_iban
+import main
+TRVANIE_IMPORTU = time.perf_counter() - ZACIATOK_IMPORTU
+
+ANSI_BOLD = "\033[1m"
+ANSI_GREEN = "\033[92m"
+ANSI_RED = "\033[91m"
+ANSI_YELLOW = "\033[93m"
+ANSI_END = "\033[0m"
+
+PREDVOLENE_VELKOSTI = (1, 100, 10000)
+PREDVOLENA_TOLERANCIA = 10.0  # Percent, o koľko môže byť etapa pomalšia, kým sa hlási regresia
+MIN_POROVNATELNY_CAS = 0.05  # Etapy kratšie ako 50 ms sú príliš zašumené na hlásenie regresie
+VERZIA_FORMATU = 1
+ROZPOCET_STARTU_MS = 50  # Najdlhší prípustný import main.py (pred lenivými importmi ~80 ms, po nich ~22 ms)
+OPAKOVANI_STARTU = 5     # Počet meraní štartu, berie sa najkratšie
+# Knižnice, ktoré main.py importuje až pri generovaní - pri štarte (menu, --help) sa načítať nesmú
+NESMU_BYT_PRI_STARTE = ('pay_by_square', 'qrcode', 'PIL', 'reportlab.pdfgen', 'reportlab.pdfbase',
+                        'multiprocessing', 'concurrent.futures', 'cProfile', 'tracemalloc', 'difflib', 'zipfile')
+
+
+def _suhrn_casov(casy, poloziek=None):
+    """Súhrn meraní jednej etapy: celkový čas, latencia na položku a priepustnosť."""
+    spolu = sum(casy)
+    poloziek = poloziek or len(casy)
+    zoradene = sorted(casy)
+    vysledok = {
+        'poloziek': poloziek,
+        'spolu_s': round(spolu, 4),
+        'na_polozku_ms': round(spolu / poloziek * 1000, 3),
+        'za_sekundu': round(poloziek / spolu, 1) if spolu else None,
+    }
+    if len(casy) > 1:
+        vysledok['p50_ms'] = round(statistics.median(zoradene) * 1000, 3)
+        vysledok['p95_ms'] = round(zoradene[min(len(zoradene) - 1, int(len(zoradene) * 0.95))] * 1000, 3)
+    return vysledok
+
+
+def _zmeraj_polozky(polozky, funkcia):
+    """Zavolá funkciu pre každú položku zvlášť, vráti (výsledky, súhrn časov)."""
+    vysledky, casy = [], []
+    for polozka in polozky:
+        zaciatok = time.perf_counter()
+        vysledky.append(funkcia(polozka))
+        casy.append(time.perf_counter() - zaciatok)
+    return vysledky, _suhrn_casov(casy)
+
+
+def _zmeraj_raz(funkcia, poloziek):
+    """Zmeria jedno volanie, ktoré spracuje 'poloziek' položiek naraz."""
+    zaciatok = time.perf_counter()
+    vysledok = funkcia()
+    return vysledok, _suhrn_casov([time.perf_counter() - zaciatok], poloziek)
+
+
+def _synteticky_iban(cislo):
+    """Platný slovenský IBAN odvodený z čísla (kontrolné číslice cez mod 97)."""
+    bban = f"1100{cislo:016d}"
+    kontrolne = 98 - kontrola_iban.zvysok_mod97(f"SK00{bban}")
+    return f"SK{kontrolne:02d}{bban}"
+
+
+def vytvor_subor_partnerov(cesta, pocet):
+    """Zapíše syntetický súbor partnerov v rovnakom formáte ako SEPA export (cp1250)."""
+    with open(cesta, 'w', encoding='cp1250', newline='\r\n') as f:
+        for i in range(1, pocet + 1):
+            f.write(f"Partner č. {i} s.r.o.;{_synteticky_iban(i)};;Partner {i}\n")
+
+
+def zmeraj_velkost(pocet_ciastok, priecinok, bez_rastra=False, meraj_pamat=True):
+    """Zmeria všetky etapy pre platbu rozdelenú na pocet_ciastok čiastok. Vráti slovník výsledkov."""
+    etapy = {}
+    cesta_partnerov = os.path.join(priecinok, f"partneri_{pocet_ciastok}.txt")
+    pocet_partnerov = max(pocet_ciastok, 100)
+    vytvor_subor_partnerov(cesta_partnerov, pocet_partnerov)
+    (partneri, _, _), etapy['partneri'] = _zmeraj_raz(lambda: adresar.nacitaj_partnerov(cesta_partnerov), pocet_partnerov)
+
+    info_platby = main.zostav_info_platby(partneri['1'], main.MAX_SUMA_NA_QR * pocet_ciastok, '2024001', '0308', 'Benchmark')
+    sumy, etapy['delenie'] = _zmeraj_raz(lambda: list(main.rozdel_sumu(info_platby)[1]), pocet_ciastok)
+
+    poznamky = [f"(Platba {i}/{pocet_ciastok}) Benchmark" for i in range(1, pocet_ciastok + 1)]
+    payloady, etapy['payload'] = _zmeraj_polozky(zip(sumy, poznamky), lambda polozka: pay_by_square.generate(
+        iban=info_platby['iban'], swift=info_platby['bic'], amount=polozka[0], variable_symbol=info_platby['vs'],
+        constant_symbol=info_platby['ks'], note=polozka[1], beneficiary_name=info_platby['prijemca'],
+        date=info_platby['datum']))
+    matice, etapy['qr_matica'] = _zmeraj_polozky(payloady, main._zostav_qr_maticu)
+
+    platby_vektor = [{'suma': suma, 'poradie': i + 1, 'celkovy_pocet': pocet_ciastok, 'qr_matica': matica}
+                     for i, (suma, matica) in enumerate(zip(sumy, matice))]
+    vystup = io.BytesIO()
+    statistiky = {}
+    _, etapy['pdf_vektor'] = _zmeraj_raz(
+        lambda: main.vytvor_pdf_dokument(info_platby, platby_vektor, vystup, statistiky=statistiky), pocet_ciastok)
+    etapy['pdf_vektor'].update(bajtov=len(vystup.getvalue()), stran=statistiky['stran'],
+                               stran_za_sekundu=round(statistiky['stran'] / etapy['pdf_vektor']['spolu_s'], 1))
+    del platby_vektor, vystup
+
+    def uloz_png(matica):
+        obrazok = main.matica_na_obrazok(matica)
+        data = io.BytesIO()
+        obrazok.save(data, format='PNG')
+        return obrazok, len(data.getvalue())
+
+    obrazky, etapy['png'] = _zmeraj_polozky(matice, uloz_png)
+    etapy['png']['bajtov_priemer'] = round(sum(velkost for _, velkost in obrazky) / len(obrazky))
+    obrazky = [obrazok for obrazok, _ in obrazky]
+    _, etapy['imagereader'] = _zmeraj_polozky(obrazky, lambda obrazok: ImageReader(obrazok).getSize())
+
+    if not bez_rastra:
+        platby_raster = [{'suma': suma, 'poradie': i + 1, 'celkovy_pocet': pocet_ciastok, 'qr_obrazok': obrazok}
+                         for i, (suma, obrazok) in enumerate(zip(sumy, obrazky))]
+        vystup = io.BytesIO()
+        _, etapy['pdf_raster'] = _zmeraj_raz(
+            lambda: main.vytvor_pdf_dokument(info_platby, platby_raster, vystup), pocet_ciastok)
+        etapy['pdf_raster']['bajtov'] = len(vystup.getvalue())
+        del platby_raster, vystup
+    del obrazky, matice, payloady
+
+    # Celý beh ako v programe: studená cache a zápis do súboru. Špička pamäte sa meria
+    # v samostatnom behu, lebo tracemalloc celý beh niekoľkonásobne spomalí.
+    povodny_priecinok = os.getcwd()
+    os.chdir(priecinok)
+    try:
+        cache.vycisti()
+        vystupny_subor, etapy['spolu'] = _zmeraj_raz(
+            lambda: main.vygeneruj_platbu(info_platby, tichy=True, vektorove_qr=True), pocet_ciastok)
+        etapy['spolu']['bajtov'] = os.path.getsize(vystupny_subor)
+        if meraj_pamat:
+            cache.vycisti()
+            tracemalloc.start()
+            try:
+                main.vygeneruj_platbu(info_platby, tichy=True, vektorove_qr=True)
+                etapy['spolu']['pamat_spicka_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+            finally:
+                tracemalloc.stop()
+    finally:
+        os.chdir(povodny_priecinok)
+    return etapy
+
+
+def zmeraj_start(opakovani=OPAKOVANI_STARTU):
+    """
+    Zmeria import main.py v novom procese cez python -X importtime (najkratší z behov;
+    beh navyše na začiatku pripraví .pyc súbory, ako sú aj v .exe). Vráti čas importu,
+    najdrahšie moduly importované priamo z main.py a ťažké moduly, ktoré sa pri štarte načítali.
+    """
+    prostredie = dict(os.environ)
+    prostredie.pop('PYTHONDONTWRITEBYTECODE', None)
+    najrychlejsi = None
+    for _ in range(opakovani + 1):
+        proces = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'], env=prostredie,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True)
+        moduly = []  # (hĺbka vnorenia, názov, spolu mikrosekúnd)
+        for riadok in proces.stderr.splitlines():
+            casti = riadok.split('|')
+            if not riadok.startswith('import time:') or len(casti) != 3 or not casti[1].strip().isdigit():
+                continue
+            moduly.append((len(casti[2]) - len(casti[2].lstrip()), casti[2].strip(), int(casti[1])))
+        import_main = next(spolu for _, nazov, spolu in moduly if nazov == 'main')
+        if najrychlejsi is None or import_main < najrychlejsi[0]:
+            najrychlejsi = (import_main, moduly)
+
+    import_main, moduly = najrychlejsi
+    hlbka_main = next(hlbka for hlbka, nazov, _ in moduly if nazov == 'main')
+    priame = sorted(((nazov, spolu) for hlbka, nazov, spolu in moduly if hlbka == hlbka_main + 2),
+                    key=lambda modul: -modul[1])
+    return {
+        'import_main_ms': round(import_main / 1000, 1),
+        'najdrahsie': [[nazov, round(spolu / 1000, 1)] for nazov, spolu in priame[:5]],
+        'tazke_moduly': [tazky for tazky in NESMU_BYT_PRI_STARTE
+                         if any(nazov == tazky or nazov.startswith(tazky + '.') for _, nazov, _ in moduly)],
+    }
+
+
+def over_start(rozpocet_ms=ROZPOCET_STARTU_MS, opakovani=OPAKOVANI_STARTU):
+    """Zmeria štart, vypíše výsledok a vráti 1, ak je import pomalší ako rozpočet alebo načíta ťažké knižnice."""
+    start = zmeraj_start(opakovani)
+    najdrahsie = ', '.join(f"{nazov} {ms:.1f} ms" for nazov, ms in start['najdrahsie'])
+    print(f"import main.py: {ANSI_BOLD}{start['import_main_ms']:.1f} ms{ANSI_END} "
+          f"(rozpočet {rozpocet_ms:.0f} ms), najdrahšie: {najdrahsie}")
+    vysledok = 0
+    if start['tazke_moduly']:
+        print(f"❌ {ANSI_RED}Pri štarte sa načítali ťažké knižnice: {', '.join(start['tazke_moduly'])}{ANSI_END}")
+        vysledok = 1
+    if start['import_main_ms'] > rozpocet_ms:
+        print(f"❌ {ANSI_RED}Štart je pomalší ako rozpočet {rozpocet_ms:.0f} ms.{ANSI_END}")
+        vysledok = 1
+    if not vysledok:
+        print(f"✅ {ANSI_GREEN}Štart je v rozpočte.{ANSI_END}")
+    return vysledok
+
+
+def verzia_kodu():
+    """Krátky hash gitu pre označenie meraní (None mimo git repozitára)."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def spusti_meranie(velkosti, bez_rastra=False, meraj_pamat=True):
+    """Zmeria všetky veľkosti, vráti celý výsledok (slovník pripravený na JSON)."""
+    vysledok = {
+        'format': VERZIA_FORMATU,
+        'datum': datetime.now().isoformat(timespec='seconds'),
+        'verzia': verzia_kodu(),
+        'python': platform.python_version(),
+        'platforma': platform.platform(),
+        'procesorov': os.cpu_count(),
+        'import_s': round(TRVANIE_IMPORTU, 4),
+        'start': zmeraj_start(),
+        'velkosti': {},
+    }
+    zaciatok = time.perf_counter()
+    fonty.ziskaj_fonty()
+    vysledok['font_s'] = round(time.perf_counter() - zaciatok, 4)
+
+    with tempfile.TemporaryDirectory(prefix='qr_benchmark_') as priecinok:
+        for velkost in velkosti:
+            print(f"{ANSI_BOLD}Meranie: {velkost} čiastok...{ANSI_END}")
+            vysledok['velkosti'][str(velkost)] = zmeraj_velkost(velkost, priecinok, bez_rastra, meraj_pamat)
+    return vysledok
+
+
+def vypis_vysledok(vysledok):
+    """Prehľadná tabuľka s latenciou na položku a priepustnosťou pre každú etapu."""
+    print(f"\nimport: {vysledok['import_s'] * 1000:.0f} ms, štart (import main.py): "
+          f"{vysledok['start']['import_main_ms']:.0f} ms, registrácia fontu: {vysledok['font_s'] * 1000:.0f} ms")
+    for velkost, etapy in vysledok['velkosti'].items():
+        print(f"\n{ANSI_BOLD}--- {velkost} čiastok ---{ANSI_END}")
+        print(f"{'etapa':<12} {'spolu s':>9} {'ms/položku':>11} {'p95 ms':>8} {'položiek/s':>11}  poznámka")
+        for nazov, etapa in etapy.items():
+            poznamka = []
+            if 'bajtov' in etapa:
+                poznamka.append(f"{etapa['bajtov'] / 1024:.0f} KiB")
+            if 'stran' in etapa:
+                poznamka.append(f"{etapa['stran']} strán ({etapa['stran_za_sekundu']} str/s)")
+            if 'pamat_spicka_mb' in etapa:
+                poznamka.append(f"špička {etapa['pamat_spicka_mb']} MiB")
+            p95 = f"{etapa['p95_ms']:.2f}" if 'p95_ms' in etapa else '-'
+            print(f"{nazov:<12} {etapa['spolu_s']:>9.3f} {etapa['na_polozku_ms']:>11.3f} {p95:>8} "
+                  f"{etapa['za_sekundu'] or 0:>11.1f}  {', '.join(poznamka)}")
+
+
+def porovnaj(stary, novy, tolerancia=PREDVOLENA_TOLERANCIA):
+    """
+    Porovná latenciu na položku každej etapy s predchádzajúcim meraním a vypíše zmenu.
+    Vráti počet regresií (etapa pomalšia o viac ako tolerancia percent); etapy kratšie
+    ako MIN_POROVNATELNY_CAS sa iba vypíšu.
+    """
+    print(f"\n{ANSI_BOLD}--- Porovnanie s verziou {stary.get('verzia') or '?'} ({stary.get('datum')}) ---{ANSI_END}")
+    regresie = 0
+    for velkost, etapy in novy['velkosti'].items():
+        stare_etapy = stary.get('velkosti', {}).get(velkost)
+        if not stare_etapy:
+            continue
+        for nazov, etapa in etapy.items():
+            stara = stare_etapy.get(nazov)
+            if not stara or not stara.get('na_polozku_ms'):
+                continue
+            zmena = (etapa['na_polozku_ms'] / stara['na_polozku_ms'] - 1) * 100
+            if max(etapa['spolu_s'], stara['spolu_s']) < MIN_POROVNATELNY_CAS:
+                farba = ''
+            elif zmena > tolerancia:
+                farba, regresie = ANSI_RED, regresie + 1
+            elif zmena < -tolerancia:
+                farba = ANSI_GREEN
+            else:
+                farba = ''
+            print(f"{velkost:>6} {nazov:<12} {stara['na_polozku_ms']:>10.3f} -> {etapa['na_polozku_ms']:>10.3f} ms "
+                  f"{farba}{zmena:+7.1f} %{ANSI_END}")
+    return regresie
+
+
+def spusti(argumenty=None):
+    """Spracuje argumenty, spustí meranie a vráti návratový kód (1 pri regresii)."""
+    parser = argparse.ArgumentParser(prog="benchmark.py", description="Meranie výkonu payload -> QR -> PDF.")
+    parser.add_argument("--velkosti", type=int, nargs='+', default=list(PREDVOLENE_VELKOSTI), metavar="N",
+                        help="Počty čiastok, pre ktoré sa meria (predvolene 1 100 10000).")
+    parser.add_argument("--vystup", default="benchmark.json", help="JSON súbor s výsledkom (predvolene benchmark.json).")
+    parser.add_argument("--porovnaj", metavar="JSON", help="Predchádzajúce meranie na porovnanie.")
+    parser.add_argument("--tolerancia", type=float, default=PREDVOLENA_TOLERANCIA, metavar="PERCENT",
+                        help=f"Spomalenie etapy, ktoré sa už hlási ako regresia (predvolene {PREDVOLENA_TOLERANCIA:.0f} %%).")
+    parser.add_argument("--bez-rastra", action="store_true", help="Preskočiť PDF s rastrovými QR kódmi (najpomalšia etapa).")
+    parser.add_argument("--bez-pamate", action="store_true", help="Nemerať špičku pamäte (ušetrí jeden beh na veľkosť).")
+    parser.add_argument("--start", action="store_true",
+                        help="Iba overiť štart programu (čas importu main.py a lenivé importy), kód 1 pri prekročení.")
+    parser.add_argument("--rozpocet-startu", type=float, default=ROZPOCET_STARTU_MS, metavar="MS",
+                        help=f"Rozpočet na import main.py pri --start (predvolene {ROZPOCET_STARTU_MS} ms).")
+    args = parser.parse_args(argumenty)
+
+    if args.start:
+        return over_start(args.rozpocet_startu)
+
+    vysledok = spusti_meranie(args.velkosti, args.bez_rastra, not args.bez_pamate)
+    vypis_vysledok(vysledok)
+    with open(args.vystup, 'w', encoding='utf-8') as f:
+        json.dump(vysledok, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ {ANSI_GREEN}Výsledok uložený do '{args.vystup}'.{ANSI_END}")
+
+    if args.porovnaj:
+        try:
+            with open(args.porovnaj, 'r', encoding='utf-8') as f:
+                stary = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ {ANSI_RED}Predchádzajúce meranie sa nepodarilo načítať: {e}{ANSI_END}")
+            return 2
+        regresie = porovnaj(stary, vysledok, args.tolerancia)
+        if regresie:
+            print(f"⚠️ {ANSI_YELLOW}Regresie: {regresie} (spomalenie nad {args.tolerancia:.0f} %).{ANSI_END}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(spusti(sys.argv[1:]))
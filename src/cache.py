@@ -0,0 +1,179 @@
+"""
+Vyrovnávacia pamäť (cache) pre payloady Pay by Square a QR matice.
+
+Každá cache má LRU v pamäti a voliteľne aj úložisko na disku s obmedzenou
+veľkosťou (najdlhšie nepoužité súbory sa mažú ako prvé), takže opakované behy
+toho istého manifestu nemusia znovu počítať LZMA kompresiu ani QR kód.
+Zápis na disk je atomický (dočasný súbor + os.replace), cache na disku
+môže zdieľať viacero procesov naraz.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+PREDVOLENA_KAPACITA = 4096          # Počet položiek v pamäti pre každú cache
+PREDVOLENA_VELKOST_DISKU_MB = 100   # Spolu pre všetky cache na disku
+
+
+class DiskovaCache:
+    """Súbory v jednom priečinku, pomenované podľa hashu kľúča, s limitom celkovej veľkosti."""
+
+    def __init__(self, priecinok, max_bajtov):
+        self.priecinok = priecinok
+        self.max_bajtov = max_bajtov
+        os.makedirs(priecinok, exist_ok=True)
+        self._zamok = threading.Lock()
+        self._velkost = sum(polozka.stat().st_size for polozka in os.scandir(priecinok) if polozka.is_file())
+
+    def nacitaj(self, nazov):
+        """Vráti uložené bajty alebo None. Prečítaný súbor sa označí ako naposledy použitý."""
+        cesta = os.path.join(self.priecinok, nazov)
+        try:
+            with open(cesta, 'rb') as f:
+                data = f.read()
+            os.utime(cesta)
+            return data
+        except OSError:
+            return None
+
+    def uloz(self, nazov, data):
+        """Atomicky zapíše bajty a pri prekročení limitu uvoľní miesto."""
+        try:
+            fd, docasny = tempfile.mkstemp(dir=self.priecinok, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(docasny, os.path.join(self.priecinok, nazov))
+        except OSError:
+            return  # Cache na disku je len zrýchlenie, chyba zápisu nesmie zastaviť generovanie
+        with self._zamok:
+            self._velkost += len(data)
+            if self._velkost > self.max_bajtov:
+                self._uvolni_miesto()
+
+    def _uvolni_miesto(self):
+        """Zmaže najdlhšie nepoužité súbory, kým veľkosť neklesne na 80 % limitu."""
+        subory = []
+        for polozka in os.scandir(self.priecinok):
+            if polozka.is_file() and not polozka.name.endswith('.tmp'):
+                info = polozka.stat()
+                subory.append((info.st_mtime, info.st_size, polozka.path))
+        subory.sort()
+        self._velkost = sum(velkost for _, velkost, _ in subory)
+        ciel = self.max_bajtov * 0.8
+        for _, velkost, cesta in subory:
+            if self._velkost <= ciel:
+                break
+            try:
+                os.remove(cesta)
+                self._velkost -= velkost
+            except OSError:
+                pass  # Súbor mohol zmazať iný proces
+
+
+class Cache:
+    """LRU cache v pamäti s voliteľnou diskovou vrstvou a počítadlami zásahov/minutí."""
+
+    def __init__(self, nazov, serializuj, deserializuj, kapacita=PREDVOLENA_KAPACITA):
+        self.nazov = nazov
+        self.kapacita = kapacita
+        self.disk = None
+        self._serializuj = serializuj
+        self._deserializuj = deserializuj
+        self._polozky = OrderedDict()
+        self._zamok = threading.Lock()
+        self.zasahy_pamat = 0
+        self.zasahy_disk = 0
+        self.minutia = 0
+
+    def ziskaj_alebo_vytvor(self, kluc, vytvor):
+        """Vráti hodnotu pre kľúč z pamäte, z disku, alebo ju vytvorí volaním vytvor() a uloží."""
+        with self._zamok:
+            if kluc in self._polozky:
+                self._polozky.move_to_end(kluc)
+                self.zasahy_pamat += 1
+                return self._polozky[kluc]
+
+        hodnota = None
+        if self.disk is not None:
+            nazov_suboru = hashlib.sha256(repr(kluc).encode('utf-8')).hexdigest()
+            data = self.disk.nacitaj(nazov_suboru)
+            if data is not None:
+                hodnota = self._deserializuj(data)
+                with self._zamok:
+                    self.zasahy_disk += 1
+        if hodnota is None:
+            hodnota = vytvor()
+            with self._zamok:
+                self.minutia += 1
+            if self.disk is not None:
+                self.disk.uloz(nazov_suboru, self._serializuj(hodnota))
+
+        with self._zamok:
+            self._polozky[kluc] = hodnota
+            while len(self._polozky) > self.kapacita:
+                self._polozky.popitem(last=False)
+        return hodnota
+
+    def vycisti(self):
+        """Zabudne položky v pamäti a vynuluje počítadlá (disk ostáva, napr. pre meranie studeného behu)."""
+        with self._zamok:
+            self._polozky.clear()
+            self.zasahy_pamat = self.zasahy_disk = self.minutia = 0
+
+    def statistiky(self):
+        """Počítadlá zásahov a minutí ako slovník."""
+        return {
+            'zasahy_pamat': self.zasahy_pamat,
+            'zasahy_disk': self.zasahy_disk,
+            'minutia': self.minutia,
+            'poloziek': len(self._polozky),
+        }
+
+
+# Na disku je matica textová ('0'/'1', riadky oddelené '\n'), v pamäti riadky bytes s hodnotami 0/1
+_NA_ZNAKY = bytes.maketrans(b'\x00\x01', b'01')
+_NA_MODULY = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def _matica_na_bajty(matica):
+    return b'\n'.join(bytes(riadok).translate(_NA_ZNAKY) for riadok in matica)
+
+
+def _bajty_na_maticu(data):
+    return tuple(riadok.translate(_NA_MODULY) for riadok in data.split(b'\n'))
+
+
+payloady = Cache('payloady', lambda text: text.encode('utf-8'), lambda data: data.decode('utf-8'))
+matice = Cache('matice', _matica_na_bajty, _bajty_na_maticu)
+_vsetky = (payloady, matice)
+_nastavenie_disku = None
+
+
+def nastav_disk(priecinok, max_mb=PREDVOLENA_VELKOST_DISKU_MB):
+    """Zapne (alebo pri priecinok=None vypne) cache na disku pre payloady aj QR matice."""
+    global _nastavenie_disku
+    _nastavenie_disku = (priecinok, max_mb) if priecinok else None
+    for cache in _vsetky:
+        if priecinok:
+            max_bajtov = int(max_mb * 1024 * 1024 / len(_vsetky))
+            cache.disk = DiskovaCache(os.path.join(priecinok, cache.nazov), max_bajtov)
+        else:
+            cache.disk = None
+
+
+def nastavenie_disku():
+    """Aktuálne nastavenie disku (priecinok, max_mb) alebo None - na odovzdanie procesom v poole."""
+    return _nastavenie_disku
+
+
+def vycisti():
+    """Vyčistí pamäťovú časť všetkých cache v tomto procese."""
+    for cache in _vsetky:
+        cache.vycisti()
+
+
+def statistiky():
+    """Počítadlá všetkých cache v tomto procese."""
+    return {cache.nazov: cache.statistiky() for cache in _vsetky}
@@ -0,0 +1,107 @@
+"""
+Presné delenie celkovej sumy na čiastkové platby.
+
+Všetko sa počíta v celých centoch (int), takže súčet čiastok je vždy presne
+rovný celkovej sume. Čiastky sa vracajú postupne (generátor), bez vytvárania
+dlhých zoznamov pri veľkých sumách.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENT = Decimal('0.01')
+MAX_CIASTOK = 100_000  # Viac čiastok je takmer iste preklep v sume (pri limite 1000 € to je 100 mil. €)
+
+# Stratégie delenia:
+#   strop        - plné čiastky po limite, zvyšok ako posledná platba (5562 -> 1000 x5 + 562)
+#   zvysok_prvy  - rovnako ako strop, ale zvyšok ide ako prvá platba (562 + 1000 x5)
+#   rovnomerne   - najmenší možný počet platieb s rovnakými čiastkami (5562 -> 927 x6)
+#   banka        - ako strop, ale limit sa vyberie podľa kódu banky z IBAN-u
+STRATEGIE = ('strop', 'zvysok_prvy', 'rovnomerne', 'banka')
+
+
+def na_sumu(hodnota):
+    """Prevedie číslo alebo text na Decimal zaokrúhlený na centy. Pri neplatnej hodnote vyhodí ValueError."""
+    try:
+        suma = Decimal(str(hodnota).strip().replace(',', '.'))
+    except InvalidOperation:
+        raise ValueError(f"'{hodnota}' nie je platná suma.") from None
+    if not suma.is_finite():
+        raise ValueError(f"'{hodnota}' nie je platná suma.")
+    try:
+        return suma.quantize(CENT, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        # Napr. '1e26' - na centy zaokrúhlená suma má viac číslic, ako zvládne presnosť Decimal
+        raise ValueError(f"Suma '{hodnota}' je príliš veľká.") from None
+
+
+def na_centy(suma):
+    """Prevedie sumu (Decimal, float, int alebo text) na celé centy."""
+    return int(na_sumu(suma) * 100)
+
+
+def z_centov(centy):
+    """Prevedie celé centy späť na Decimal s dvomi desatinnými miestami."""
+    return (Decimal(centy) / 100).quantize(CENT)
+
+
+def kod_banky(iban):
+    """Vráti kód banky z IBAN-u (pre SK/CZ sú to 4 číslice za kontrolnými číslicami), inak None."""
+    if iban and len(iban) >= 8:
+        return iban[4:8]
+    return None
+
+
+def limit_ciastky(strop, strategia='strop', iban=None, limity_bank=None):
+    """Vráti maximálnu čiastku v centoch pre danú stratégiu (pri 'banka' podľa limity_bank[kód banky])."""
+    if strategia not in STRATEGIE:
+        raise ValueError(f"Neznáma stratégia delenia '{strategia}' (možnosti: {', '.join(STRATEGIE)}).")
+    if strategia == 'banka' and limity_bank:
+        strop = limity_bank.get(kod_banky(iban), strop)
+    limit = na_centy(strop)
+    if limit <= 0:
+        raise ValueError("Limit čiastky musí byť kladný.")
+    return limit
+
+
+def pocet_ciastok(celkova_suma, strop, strategia='strop', iban=None, limity_bank=None):
+    """
+    Počet čiastkových platieb, na ktoré sa suma rozdelí (potrebný vopred pre 'Platba i/N').
+    Pri viac ako MAX_CIASTOK čiastkach vyhodí ValueError.
+    """
+    celkove_centy = na_centy(celkova_suma)
+    limit = limit_ciastky(strop, strategia, iban, limity_bank)
+    return _over_pocet(max(1, -(-celkove_centy // limit)))
+
+
+def _over_pocet(pocet):
+    if pocet > MAX_CIASTOK:
+        raise ValueError(f"Suma by sa rozdelila na {pocet} platieb, najviac je možných {MAX_CIASTOK}.")
+    return pocet
+
+
+def ciastky(celkova_suma, strop, strategia='strop', iban=None, limity_bank=None):
+    """
+    Postupne vracia čiastkové sumy (Decimal) podľa zvolenej stratégie.
+    Súčet vrátených čiastok je vždy presne rovný celkovej sume zaokrúhlenej na centy.
+    """
+    celkove_centy = na_centy(celkova_suma)
+    if celkove_centy <= 0:
+        raise ValueError("Suma musí byť kladné číslo.")
+    limit = limit_ciastky(strop, strategia, iban, limity_bank)
+    pocet_plnych, zvysok = divmod(celkove_centy, limit)
+    _over_pocet(pocet_plnych + (1 if zvysok else 0))
+
+    if strategia == 'rovnomerne':
+        pocet = pocet_plnych + (1 if zvysok else 0)
+        zaklad, navyse = divmod(celkove_centy, pocet)
+        # Prvých 'navyse' platieb dostane o cent viac, aby súčet sedel na cent
+        for i in range(pocet):
+            yield z_centov(zaklad + 1 if i < navyse else zaklad)
+        return
+
+    if strategia == 'zvysok_prvy' and zvysok:
+        yield z_centov(zvysok)
+    plna_ciastka = z_centov(limit)
+    for _ in range(pocet_plnych):
+        yield plna_ciastka
+    if strategia != 'zvysok_prvy' and zvysok:
+        yield z_centov(zvysok)
@@ -0,0 +1,93 @@
+"""
+Fonty pre PDF dokumenty.
+
+TTF súbor sa načíta a zaregistruje v ReportLab iba raz za beh procesu
+(aj pri tisíckach platieb), výsledok sa pamätá a je bezpečný pre vlákna.
+ReportLab sa importuje až pri registrácii, nastavenie cesty je lacné.
+"""
+import os
+import sys
+import threading
+from collections import namedtuple
+
+ANSI_YELLOW = "\033[93m"
+ANSI_END = "\033[0m"
+
+PREDVOLENY_FONT = 'Arial'
+ZALOZNY_FONT = 'Helvetica'            # Záložný font, ak sa TTF nenájde/nezaregistruje
+ZALOZNY_FONT_PORADIE = 'Helvetica-Bold'
+
+# text: font pre bežný text, poradie: font pre veľké poradové číslo,
+# pouzita_zaloha: True, ak sa TTF nepodarilo použiť a kreslí sa záložným fontom
+Fonty = namedtuple('Fonty', ['text', 'poradie', 'pouzita_zaloha', 'cesta'])
+
+_zamok = threading.Lock()
+_zaregistrovane = {}  # cesta k TTF -> Fonty
+_nastavena_cesta = None
+
+
+def predvolena_cesta_fontu():
+    """
+    Vráti cestu k assets/arial.ttf.
+    Rozlišuje medzi spustením ako skript a ako PyInstaller bundle.
+    """
+    if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
+        # Program beží ako PyInstaller bundle (.exe)
+        # sys._MEIPASS ukazuje na priečinok s pribalenými súbormi (pri --onefile dočasný, kam sa rozbalili)
+        # Cesta k fontu zodpovedá cieľu v --add-data "assets/arial.ttf;assets"
+        return os.path.join(sys._MEIPASS, 'assets', 'arial.ttf')
+    # Program beží ako normálny Python skript (.py)
+    # Ideme o úroveň vyššie (z src do rootu projektu) a potom do assets
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.abspath(os.path.join(script_dir, '..', 'assets', 'arial.ttf'))
+
+
+def nastav_cestu_fontu(cesta):
+    """Nastaví vlastný TTF súbor, ktorý použije ziskaj_fonty() bez argumentu (None = predvolený Arial)."""
+    global _nastavena_cesta
+    _nastavena_cesta = cesta
+
+
+def nastavena_cesta_fontu():
+    """Cesta nastavená cez nastav_cestu_fontu (None = predvolený Arial), napr. na odovzdanie procesom."""
+    return _nastavena_cesta
+
+
+def _nazov_fontu(cesta):
+    """Názov, pod ktorým sa TTF zaregistruje (pre predvolený súbor zostáva 'Arial')."""
+    if cesta == predvolena_cesta_fontu():
+        return PREDVOLENY_FONT
+    return os.path.splitext(os.path.basename(cesta))[0]
+
+
+def ziskaj_fonty(cesta_fontu=None):
+    """
+    Zaregistruje TTF font (ak ešte nie je) a vráti Fonty s názvami na použitie v canvas.setFont.
+    Ak sa font nepodarí načítať, vypíše varovanie (iba raz) a vráti záložné Helvetica fonty.
+    """
+    cesta = os.path.abspath(cesta_fontu or _nastavena_cesta or predvolena_cesta_fontu())
+
+    with _zamok:
+        fonty = _zaregistrovane.get(cesta)
+        if fonty is not None:
+            return fonty
+
+        varovanie = None
+        if not os.path.exists(cesta):
+            varovanie = f"Varovanie: Súbor fontu '{cesta}' sa nenašiel."
+        else:
+            try:
+                from reportlab.pdfbase import pdfmetrics
+                from reportlab.pdfbase.ttfonts import TTFont
+                nazov = _nazov_fontu(cesta)
+                pdfmetrics.registerFont(TTFont(nazov, cesta))
+                fonty = Fonty(nazov, nazov, False, cesta)
+            except Exception as e:
+                varovanie = f"Chyba pri registrácii fontu '{cesta}': {e}."
+
+        if fonty is None:
+            print(f"⚠️ {ANSI_YELLOW}{varovanie} Použije sa {ZALOZNY_FONT}.{ANSI_END}")
+            fonty = Fonty(ZALOZNY_FONT, ZALOZNY_FONT_PORADIE, True, None)
+
+        _zaregistrovane[cesta] = fonty
+        return fonty
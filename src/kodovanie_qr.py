@@ -0,0 +1,129 @@
+"""
+Kódovanie QR kódov s nastavením prispôsobeným payloadom Pay by Square.
+
+Payload je vždy base32hex (veľké písmená a číslice), takže sa kóduje v alfanumerickom
+režime a potrebná verzia sa dá vypočítať iba z dĺžky (tabuľka sa pamätá).
+Najdrahšia časť knižnice qrcode je výber masky: predvolene skúša všetkých 8 masiek
+a pre každú počíta pokutu. Každá maska je podľa normy platná, pokuta iba odhaľuje vzory,
+ktoré sťažujú čítanie (veľké jednofarebné plochy, falošné vyhľadávacie štvorce).
+Rýchla cesta preto skúša masky v poradí, v akom na payloadoch Pay by Square vychádzajú
+najlepšie, a prvú s pokutou pod hranicou použije; ak žiadna hranicu nesplní, vyberie
+najlepšiu zo všetkých ako pôvodná cesta.
+Knižnica qrcode sa importuje až pri prvom kódovaní, nastavenia sa dajú overiť bez nej.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+# Hodnoty qrcode.constants.ERROR_CORRECT_* (indikátor úrovne korekcie podľa normy QR)
+UROVNE_KOREKCIE = {
+    'L': 1,   # ~7 % poškodenia
+    'M': 0,   # ~15 % (predvolené, rovnaké ako qrcode.make)
+    'Q': 3,   # ~25 %
+    'H': 2,   # ~30 %
+}
+MASKY = ('rychla', 'auto') + tuple(str(maska) for maska in range(8))
+OKRAJ = 4                       # Tichá zóna v moduloch (minimum podľa normy)
+MIN_VELKOST_MODULU = 2          # Menšie moduly v PNG už tlačiarne a skenery rozmazávajú
+# Poradie masiek pre rýchlu cestu: podľa toho, ako často vyšli najlepšie na vzorke payloadov
+PORADIE_MASIEK = (2, 4, 0, 3, 6, 5, 7, 1)
+# Najvyššia prípustná pokuta na modul: medián najlepšej masky je ~0,68, maska 2 má p95 ~0,80
+HRANICA_POKUTY_NA_MODUL = 0.8
+
+NastaveniaQR = namedtuple('NastaveniaQR', [
+    'korekcia',         # 'L', 'M', 'Q' alebo 'H'
+    'verzia',           # Najmenšia použitá verzia (1-40), None = najmenšia, do ktorej sa payload zmestí
+    'maska',            # 'rychla', 'auto' (všetkých 8 masiek) alebo '0'-'7' (pevná maska)
+    'velkost_modulu',   # Pixely na modul v PNG obrázku
+])
+
+
+def vytvor_nastavenia(korekcia='M', verzia=None, maska='rychla', velkost_modulu=10):
+    """Overí a zostaví nastavenia QR kódu. Pri neplatných hodnotách vyhodí ValueError."""
+    korekcia = str(korekcia).upper()
+    if korekcia not in UROVNE_KOREKCIE:
+        raise ValueError(f"Neznáma úroveň korekcie '{korekcia}' (možnosti: {', '.join(UROVNE_KOREKCIE)}).")
+    if verzia is not None:
+        verzia = int(verzia)
+        if not 1 <= verzia <= 40:
+            raise ValueError("Verzia QR kódu musí byť od 1 do 40.")
+    maska = str(maska)
+    if maska not in MASKY:
+        raise ValueError(f"Neznáma maska '{maska}' (možnosti: {', '.join(MASKY)}).")
+    velkost_modulu = int(velkost_modulu)
+    if velkost_modulu < MIN_VELKOST_MODULU:
+        raise ValueError(f"Veľkosť modulu musí byť aspoň {MIN_VELKOST_MODULU} px.")
+    return NastaveniaQR(korekcia, verzia, maska, velkost_modulu)
+
+
+PREDVOLENE = vytvor_nastavenia()
+_nastavenia = PREDVOLENE
+
+
+def nastav(nastavenia):
+    """Nastaví QR kódovanie pre tento proces (None = predvolené)."""
+    global _nastavenia
+    _nastavenia = nastavenia or PREDVOLENE
+
+
+def nastavenia():
+    """Aktuálne nastavenia - na odovzdanie procesom v poole."""
+    return _nastavenia
+
+
+@lru_cache(maxsize=1024)
+def verzia_pre_dlzku(dlzka, korekcia):
+    """Najmenšia verzia, do ktorej sa zmestí alfanumerický reťazec danej dĺžky (None = nezmestí sa)."""
+    from qrcode import util
+    bity_dat = 11 * (dlzka // 2) + 6 * (dlzka % 2)
+    limity = util.BIT_LIMIT_TABLE[UROVNE_KOREKCIE[korekcia]]
+    for verzia in range(1, 41):
+        if 4 + util.length_in_bits(util.MODE_ALPHA_NUM, verzia) + bity_dat <= limity[verzia]:
+            return verzia
+    return None
+
+
+def _vyber_masku(qr, pocet_modulov):
+    """Rýchla cesta: prvá maska v PORADIE_MASIEK s pokutou pod hranicou, inak najlepšia zo všetkých."""
+    from qrcode import util
+    hranica = HRANICA_POKUTY_NA_MODUL * pocet_modulov * pocet_modulov
+    najlepsia = None
+    for maska in PORADIE_MASIEK:
+        qr.makeImpl(False, maska)
+        pokuta = util.lost_point(qr.modules)
+        if pokuta <= hranica:
+            return
+        if najlepsia is None or pokuta < najlepsia[0]:
+            najlepsia = (pokuta, maska)
+    qr.makeImpl(False, najlepsia[1])
+
+
+def zostav_maticu(payload, nastavenia=None):
+    """
+    Zakóduje payload do QR matice (riadky bytes, 1 = tmavý modul, vrátane tichej zóny).
+    Bez zadaných nastavení sa použijú nastavenia procesu (pozri nastav).
+    """
+    import qrcode
+    from qrcode import util
+    nastavenia = nastavenia or _nastavenia
+    uroven = UROVNE_KOREKCIE[nastavenia.korekcia]
+    # optimize=0: celý payload je jeden alfanumerický úsek, verzia teda závisí iba od dĺžky
+    potrebna = None
+    if util.RE_ALPHA_NUM.match(payload.encode('utf-8')):
+        potrebna = verzia_pre_dlzku(len(payload), nastavenia.korekcia)
+    if potrebna is None:
+        # Iný ako alfanumerický obsah: verziu nájde knižnica
+        qr = qrcode.QRCode(version=nastavenia.verzia, error_correction=uroven, border=OKRAJ)
+        qr.add_data(payload, optimize=0)
+        potrebna = qr.best_fit(start=nastavenia.verzia)
+    verzia = max(potrebna, nastavenia.verzia or 1)
+
+    pevna_maska = int(nastavenia.maska) if nastavenia.maska.isdigit() else None
+    qr = qrcode.QRCode(version=verzia, error_correction=uroven, border=OKRAJ, mask_pattern=pevna_maska)
+    qr.add_data(payload, optimize=0)
+    if nastavenia.maska == 'rychla':
+        _vyber_masku(qr, verzia * 4 + 17)
+    else:
+        qr.make(fit=False)  # Pevná maska, alebo pri 'auto' pôvodný výber zo všetkých 8 masiek
+    # Riadky ako bytes (1 = tmavý modul) zaberajú v pamäti a pri posielaní medzi procesmi
+    # zlomok miesta oproti zoznamom True/False
+    return tuple(bytes(riadok) for riadok in qr.get_matrix())
@@ -0,0 +1,119 @@
+"""
+Úplná kontrola IBAN-u (a voliteľne BIC) ešte pred generovaním QR kódov.
+
+Kontroluje kód krajiny a dĺžku podľa tabuľky krajín, formát BBAN pre krajiny
+s čisto číselným BBAN a kontrolný súčet mod 97, ktorý sa počíta priebežne
+po znakoch v celých číslach (bez skladania dlhého číselného reťazca).
+Výsledky sa pamätajú, takže opakovaná kontrola celého súboru partnerov je rýchla.
+"""
+import re
+from functools import lru_cache
+
+# Dĺžka IBAN-u podľa krajiny (register SWIFT)
+DLZKY_IBAN = {
+    'AD': 24, 'AE': 23, 'AL': 28, 'AT': 20, 'AZ': 28, 'BA': 20, 'BE': 16, 'BG': 22,
+    'BH': 22, 'BI': 27, 'BR': 29, 'BY': 28, 'CH': 21, 'CR': 22, 'CY': 28, 'CZ': 24,
+    'DE': 22, 'DJ': 27, 'DK': 18, 'DO': 28, 'EE': 20, 'EG': 29, 'ES': 24, 'FI': 18,
+    'FK': 18, 'FO': 18, 'FR': 27, 'GB': 22, 'GE': 22, 'GI': 23, 'GL': 18, 'GR': 27,
+    'GT': 28, 'HR': 21, 'HU': 28, 'IE': 22, 'IL': 23, 'IQ': 23, 'IS': 26, 'IT': 27,
+    'JO': 30, 'KW': 30, 'KZ': 20, 'LB': 28, 'LC': 32, 'LI': 21, 'LT': 20, 'LU': 20,
+    'LV': 21, 'LY': 25, 'MC': 27, 'MD': 24, 'ME': 22, 'MK': 19, 'MN': 20, 'MR': 27,
+    'MT': 31, 'MU': 30, 'NI': 28, 'NL': 18, 'NO': 15, 'OM': 23, 'PK': 24, 'PL': 28,
+    'PS': 29, 'PT': 25, 'QA': 29, 'RO': 24, 'RS': 22, 'RU': 33, 'SA': 24, 'SC': 31,
+    'SD': 18, 'SE': 24, 'SI': 19, 'SK': 24, 'SM': 27, 'SO': 23, 'ST': 25, 'SV': 28,
+    'TL': 23, 'TN': 24, 'TR': 26, 'UA': 29, 'VA': 22, 'VG': 24, 'XK': 20, 'YE': 30,
+}
+
+# Krajiny, kde BBAN (časť za kontrolnými číslicami) obsahuje iba číslice
+CISELNY_BBAN = {
+    'AT', 'BA', 'BE', 'CZ', 'DE', 'DK', 'EE', 'ES', 'FI', 'FO', 'GL', 'HR', 'HU',
+    'IS', 'LT', 'ME', 'NO', 'PL', 'PT', 'RS', 'SE', 'SI', 'SK', 'TN', 'XK',
+}
+
+# Predpočítané pravidlá: krajina -> (dĺžka, regulárny výraz pre celý IBAN)
+# Iba ASCII číslice - \d by prepustil aj iné číslice Unicode (napr. arabské '٣')
+PRAVIDLA = {
+    krajina: (dlzka, re.compile(f'{krajina}[0-9][0-9]' + ('[0-9]' if krajina in CISELNY_BBAN else '[0-9A-Z]') + f'{{{dlzka - 4}}}'))
+    for krajina, dlzka in DLZKY_IBAN.items()
+}
+
+# Pre mod 97: číslica sa pripája ako 1 cifra, písmeno (A=10 ... Z=35) ako 2 cifry
+_HODNOTY_ZNAKOV = {znak: (10, int(znak)) for znak in '0123456789'}
+_HODNOTY_ZNAKOV.update({znak: (100, ord(znak) - 55) for znak in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'})
+
+_BIC = re.compile(r'[A-Z]{4}[A-Z]{2}[A-Z0-9]{2}([A-Z0-9]{3})?')
+
+
+def normalizuj_iban(iban):
+    """IBAN bez medzier a veľkými písmenami."""
+    return iban.replace(' ', '').upper()
+
+
+def zvysok_mod97(iban):
+    """
+    Zvyšok IBAN-u po delení 97 (prvé 4 znaky sa presunú na koniec), počítaný po znakoch.
+    Pri inom znaku ako A-Z a 0-9 vyhodí ValueError.
+    """
+    bban = iban[4:]
+    if bban.isascii() and bban.isdigit():
+        # Číselný BBAN (napr. SK, CZ) je jedno celé číslo, po znakoch stačí doplniť prvé 4 znaky
+        zvysok, zostava = int(bban) % 97, iban[:4]
+    else:
+        zvysok, zostava = 0, bban + iban[:4]
+    for znak in zostava:
+        try:
+            nasobok, hodnota = _HODNOTY_ZNAKOV[znak]
+        except KeyError:
+            raise ValueError(f"IBAN obsahuje nepovolený znak '{znak}'") from None
+        zvysok = (zvysok * nasobok + hodnota) % 97
+    return zvysok
+
+
+@lru_cache(maxsize=65536)
+def dovod_neplatnosti(iban):
+    """Vráti popis chyby pre (normalizovaný) IBAN, alebo None ak je IBAN platný."""
+    if not iban:
+        return "IBAN je prázdny"
+    pravidlo = PRAVIDLA.get(iban[:2])
+    if pravidlo is None:
+        return f"neznámy kód krajiny '{iban[:2]}'"
+    dlzka, vzor = pravidlo
+    if len(iban) != dlzka:
+        return f"IBAN pre {iban[:2]} musí mať {dlzka} znakov (má {len(iban)})"
+    if not vzor.fullmatch(iban):
+        return "IBAN obsahuje nepovolené znaky"
+    if zvysok_mod97(iban) != 1:
+        return "nesprávny kontrolný súčet"
+    return None
+
+
+def je_platny_iban(iban):
+    """True, ak je IBAN (aj s medzerami/malými písmenami) platný."""
+    return dovod_neplatnosti(normalizuj_iban(iban)) is None
+
+
+def over_iban(iban):
+    """Vráti normalizovaný IBAN, alebo vyhodí ValueError s popisom chyby."""
+    normalizovany = normalizuj_iban(iban)
+    dovod = dovod_neplatnosti(normalizovany)
+    if dovod:
+        raise ValueError(f"Neplatný IBAN '{iban}': {dovod}.")
+    return normalizovany
+
+
+def over_bic(bic):
+    """Vráti normalizovaný BIC (prázdny reťazec, ak nie je zadaný), alebo vyhodí ValueError."""
+    bic = bic.replace(' ', '').upper()
+    if bic and not _BIC.fullmatch(bic):
+        raise ValueError(f"Neplatný BIC '{bic}'.")
+    return bic
+
+
+def over_ibany(ibany):
+    """Hromadná kontrola: vráti {iban: popis chyby} iba pre neplatné IBAN-y."""
+    chyby = {}
+    for iban in ibany:
+        dovod = dovod_neplatnosti(normalizuj_iban(iban))
+        if dovod:
+            chyby[iban] = dovod
+    return chyby
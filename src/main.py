@@ -1,16 +1,32 @@
 import os
-import math
+import io
+import itertools
+import time
 import json  # Potrebné pre prácu s config súborom
 import sys   # Potrebné pre ukončenie programu a detekciu PyInstaller
-import pay_by_square
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
+import csv   # Potrebné pre dávkový manifest platieb
+import argparse
+import collections
+import contextlib
+import threading
+from decimal import Decimal
+from datetime import date
+# Ťažké knižnice (pay_by_square, reportlab.pdfgen, PIL, qrcode, multiprocessing) sa importujú
+# až vo funkciách, ktoré ich potrebujú, aby menu a --help naštartovali rýchlo (pozri predohrej)
 from reportlab.lib.units import mm
-from reportlab.lib.utils import ImageReader
-import qrcode
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 import colorama
+import fonty
+import delenie
+import cache
+import adresar
+import kontrola_iban
+import rozlozenie
+import meranie
+import kodovanie_qr
+import vystupy
+import stav_behu
+import overenie
+import subory
 
 # --- ANSI NASTAVENIA PRE SPRAVY ---
 ANSI_CYAN = "\033[96m"
@@ -22,108 +38,49 @@ ANSI_GREEN = "\033[92m"
 ANSI_END = "\033[0m"
 
 # --- NASTAVENIA ---
-MAX_SUMA_NA_QR = 1000.00
+MAX_SUMA_NA_QR = Decimal('1000.00')
+STRATEGIA_DELENIA = 'strop'   # Predvolená stratégia delenia sumy (pozri delenie.STRATEGIE)
+MAX_ZOBRAZENYCH_PARTNEROV = 50 # Pri viac partneroch menu nevypisuje celý zoznam, iba vyhľadáva
+VELKOST_BALIKA_PRE_PROCES = 8 # Koľko čiastkových platieb naraz sa posiela jednému procesu
+MAX_BALIKOV_V_POOLE = 4 * (os.cpu_count() or 1) # Koľko balíkov môže byť naraz rozpracovaných v procesoch
+MAX_STRAN_NA_SUBOR = 1000 # Väčšie PDF sa rozdelí na časti, aby pamäť nerástla s veľkosťou dokumentu
 CONFIG_SUBOR = "config.json" # Súbor na uloženie cesty k partnerom
-TEMP_DIR = "temp_qrs"        # Priečinok pre dočasné QR kódy
+VYSTUPNY_PRIECINOK = "." # Kam sa zapisujú výstupy (prepínač --priecinok alebo 'vystupny_priecinok' v config.json)
 
 # --- FUNKCIE PRE PRÁCU S KONFIGURÁCIOU ---
 
-def nacitaj_cestu_k_partnerom():
-    """Načíta posledne uloženú cestu k súboru partnerov z config.json."""
+def nacitaj_config():
+    """Načíta celý config.json ako slovník (ak neexistuje alebo je poškodený, vráti prázdny)."""
     try:
         if os.path.exists(CONFIG_SUBOR):
             with open(CONFIG_SUBOR, 'r', encoding='utf-8') as f:
                 config = json.load(f)
-                return config.get('cesta_partneri')
+                if isinstance(config, dict):
+                    return config
     except Exception as e:
         print(f"⚠️ {ANSI_YELLOW}Chyba pri čítaní {CONFIG_SUBOR}: {e}{ANSI_END}")
-    return None
-
-def uloz_cestu_k_partnerom(cesta):
-    """Uloží cestu k súboru partnerov do config.json."""
-    try:
-        with open(CONFIG_SUBOR, 'w', encoding='utf-8') as f:
-            json.dump({'cesta_partneri': cesta}, f, indent=4)
-    except Exception as e:
-        print(f"⚠️ {ANSI_YELLOW}Chyba pri ukladaní {CONFIG_SUBOR}: {e}{ANSI_END}")
+    return {}
 
-# --- FUNKCIE PRE SPRACOVANIE PARTNEROV ---
+def nacitaj_cestu_k_partnerom():
+    """Načíta posledne uloženú cestu k súboru partnerov z config.json."""
+    return nacitaj_config().get('cesta_partneri')
 
-def nacitaj_partnerov_zo_suboru(cesta_k_suboru):
+def uloz_cestu_k_partnerom(cesta):
     """
-    Načíta partnerov (názov, IBAN) z textového súboru.
-    Automaticky skúsi viacero kódovaní (utf-8, cp1250, atď.).
-    Akceptuje rôzne SEPA IBAN formáty.
+    Uloží cestu k súboru partnerov do config.json (ostatné nastavenia ponechá).
+    Pod zámkom, aby si súbežne bežiace procesy navzájom neprepísali zmeny, a atomicky,
+    aby iný proces nikdy nenačítal rozpísaný súbor.
     """
-    partneri = {}
-    cislo_partnera = 1
-
-    # Zoznam kódovaní, ktoré sa pokúsime použiť (cp1250 je bežné pre SK Windows)
-    kodovania = ['utf-8', 'cp1250', 'iso-8859-2', 'utf-16']
-    uspesne_kodovanie = None
-    obsah_suboru = None
-
-    for kodovanie in kodovania:
-        try:
-            with open(cesta_k_suboru, 'r', encoding=kodovanie) as f:
-                obsah_suboru = f.readlines() # Načítame celý súbor
-            uspesne_kodovanie = kodovanie
-            print(f"ℹ️ {ANSI_BLUE}Súbor úspešne načítaný s kódovaním: {kodovanie}{ANSI_END}")
-            break # Našli sme platné kódovanie, môžeme skončiť slučku
-        except UnicodeDecodeError:
-            # Toto kódovanie zlyhalo, skúsime ďalšie
-            continue
-        except FileNotFoundError:
-            print(f"❌ {ANSI_RED}Chyba: Súbor '{cesta_k_suboru}' sa nenašiel.{ANSI_END}")
-            return None
-        except PermissionError:
-            print(f"❌ {ANSI_RED}Chyba: Program nemá povolenie čítať súbor/priečinok.{ANSI_END}")
-            print(f"   {ANSI_RED}Uistite sa, že zadávate cestu k SÚBORU (napr. partneri.txt), nie k priečinku.{ANSI_END}")
-            return None
-        except Exception as e:
-            # Iná chyba
-            print(f"❌ {ANSI_RED}Chyba pri otváraní súboru: {e}{ANSI_END}")
-            return None
-
-    if not obsah_suboru:
-        print(f"❌ {ANSI_RED}Chyba: Súbor sa nepodarilo prečítať so žiadnym z podporovaných kódovaní ({', '.join(kodovania)}).{ANSI_END}")
-        print(f"   {ANSI_RED}Skontrolujte, či súbor nie je poškodený alebo v inom kódovaní.{ANSI_END}")
-        return None
-
-    # Teraz spracujeme obsah_suboru, ktorý bol načítaný
     try:
-        for riadok in obsah_suboru:
-            riadok = riadok.strip()
-            if not riadok:
-                continue
-            casti = riadok.split(';')
-            if len(casti) >= 2:
-                nazov = casti[0].strip()
-                iban = casti[1].strip().replace(" ", "") # Odstránime aj medzery z IBANu
-
-                # --- UPRAVENÁ KONTROLA ---
-                # Základná kontrola - musí obsahovať aspoň niečo a dĺžka je v rozumnom rozsahu pre IBAN
-                # Presnejšiu validáciu necháme na knižnicu pay_by_square
-                if iban and 15 <= len(iban) <= 34 and iban[:2].isalpha(): # IBAN zvyčajne začína 2 písmenami kódu krajiny
-                    preferovany_nazov = casti[3].strip() if len(casti) > 3 and casti[3].strip() else nazov
-                    if preferovany_nazov and iban:
-                        partneri[str(cislo_partnera)] = {"nazov": preferovany_nazov, "iban": iban}
-                        cislo_partnera += 1
-                else:
-                    print(f"⚠️ {ANSI_YELLOW}Varovanie: Riadok '{riadok[:30]}...' neobsahuje platný IBAN formát (po odstránení medzier), preskakuje sa.{ANSI_END}")
-                 # --- KONIEC UPRAVENEJ KONTROLY ---
-            else:
-                print(f"⚠️ {ANSI_YELLOW}Varovanie: Riadok '{riadok[:30]}...' nemá očakávaný formát (chýba ';'), preskakuje sa.{ANSI_END}")
-
+        with subory.zamok(CONFIG_SUBOR):
+            subory.vycisti_docasne(os.path.dirname(os.path.abspath(CONFIG_SUBOR)))
+            config = nacitaj_config()
+            config['cesta_partneri'] = cesta
+            subory.zapis_atomicky(CONFIG_SUBOR, json.dumps(config, indent=4).encode('utf-8'))
     except Exception as e:
-        print(f"❌ {ANSI_RED}Chyba pri spracovaní obsahu súboru (kódovanie {uspesne_kodovanie}): {e}{ANSI_END}")
-        return None
-
-    if not partneri:
-        print(f"❌ {ANSI_RED}V súbore sa nenašli žiadni platní partneri.{ANSI_END}")
-        return None
+        print(f"⚠️ {ANSI_YELLOW}Chyba pri ukladaní {CONFIG_SUBOR}: {e}{ANSI_END}")
 
-    return partneri
+# --- FUNKCIE PRE SPRACOVANIE PARTNEROV ---
 
 def pýtaj_a_nacitaj_partnerov_s_ulozenim():
     """
@@ -143,7 +100,7 @@ def pýtaj_a_nacitaj_partnerov_s_ulozenim():
         if cesta.lower() == 'q':
             return None, None
 
-        partneri = nacitaj_partnerov_zo_suboru(cesta)
+        partneri = adresar.nacitaj_register(cesta)
         if partneri:
             uloz_cestu_k_partnerom(cesta)
             print(f"✅ {ANSI_GREEN}Partneri úspešne načítaní a cesta uložená.{ANSI_END}")
@@ -153,136 +110,311 @@ def pýtaj_a_nacitaj_partnerov_s_ulozenim():
 
 # --- FUNKCIE PRE GENEROVANIE PDF A QR ---
 
-def vygeneruj_qr_kod(payload, subor_qr):
-    """Vygeneruje a uloží obrázok QR kódu."""
-    img = qrcode.make(payload)
-    img.save(subor_qr)
-    return subor_qr
-
-def registruj_font(c):
+def vygeneruj_qr_kod(payload, velkost_modulu=None):
     """
-    Pokúsi sa zaregistrovať Arial font pre PDF.
-    Rozlišuje medzi spustením ako skript a ako PyInstaller bundle.
+    Vygeneruje obrázok QR kódu a vráti ho priamo v pamäti (PIL Image).
+    Do PDF sa odovzdá bez ukladania do dočasného PNG súboru.
+    Obrázok sa kreslí z (cachovanej) matice podľa nastavení kodovanie_qr.
     """
-    font_path = None
-    font_registered = False
-    font_name = 'Arial'
-    fallback_font = 'Helvetica' # Záložný font, ak sa Arial nenájde/nezaregistruje
-
-    try:
-        if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
-            # Program beží ako PyInstaller bundle (.exe)
-            # sys._MEIPASS ukazuje na dočasný priečinok, kam PyInstaller rozbalil súbory
-            base_path = sys._MEIPASS
-            # Cesta k fontu zodpovedá cieľu v --add-data "assets/arial.ttf;assets"
-            font_path = os.path.join(base_path, 'assets', 'arial.ttf')
-            # print(f"DEBUG (Frozen): Hľadám font v: {font_path}") # Pre ladenie
-        else:
-            # Program beží ako normálny Python skript (.py)
-            # Cesta sa počíta relatívne k aktuálnemu súboru (__file__)
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            # Ideme o úroveň vyššie (z src do rootu projektu) a potom do assets
-            font_path = os.path.abspath(os.path.join(script_dir, '..', 'assets', 'arial.ttf'))
-            # print(f"DEBUG (Script): Hľadám font v: {font_path}") # Pre ladenie
-
-        if font_path and os.path.exists(font_path):
-            try:
-                pdfmetrics.registerFont(TTFont(font_name, font_path))
-                c.setFont(font_name, 10)
-                font_registered = True
-                # print(f"INFO: Font '{font_path}' úspešne zaregistrovaný.") # Pre ladenie
-            except Exception as e:
-                print(f"⚠️ {ANSI_YELLOW}Chyba pri registrácii fontu '{font_path}': {e}. Použije sa {fallback_font}.{ANSI_END}")
-        else:
-            if font_path:
-                 print(f"⚠️ {ANSI_YELLOW}Varovanie: Súbor fontu '{font_path}' sa nenašiel. Použije sa {fallback_font}.{ANSI_END}")
-            else:
-                 print(f"⚠️ {ANSI_YELLOW}Varovanie: Nepodarilo sa určiť cestu k fontu. Použije sa {fallback_font}.{ANSI_END}")
-
-    except Exception as general_e:
-        print(f"⚠️ {ANSI_YELLOW}Neočekávaná chyba pri hľadaní/registrácii fontu: {general_e}. Použije sa {fallback_font}.{ANSI_END}")
-
-    # Ak registrácia zlyhala, nastavíme záložný font
-    if not font_registered:
-        c.setFont(fallback_font, 10)
-
-    return font_registered # Vráti True, ak sa podarilo použiť Arial, inak False
-
+    return matica_na_obrazok(vygeneruj_qr_maticu(payload), velkost_modulu)
 
-def vytvor_pdf_dokument(zakladne_info, zoznam_platieb):
+def matica_na_obrazok(matica, velkost_modulu=None):
     """
-    Vytvorí PDF súbor s novým horizontálnym rozložením podľa predlohy.
+    Prevedie QR maticu na čiernobiely PIL obrázok (každý modul má velkost_modulu pixelov,
+    predvolene podľa nastavení kodovanie_qr).
     """
-    vystupny_subor = f"QR_Platba_VS_{zakladne_info['vs']}.pdf"
-    c = canvas.Canvas(vystupny_subor, pagesize=A4)
-    sirka, vyska = A4
-
-    vyska_bloku_platby = 55 * mm
-    horny_okraj = 20 * mm
-    lavy_okraj = 15 * mm
-    pravy_okraj = 15 * mm
-    pozicia_y = vyska - horny_okraj
+    from PIL import Image
+    velkost_modulu = velkost_modulu or kodovanie_qr.nastavenia().velkost_modulu
+    with meranie.meraj('qr_obrazok'):
+        pocet_modulov = len(matica)
+        obrazok = Image.new('1', (pocet_modulov, pocet_modulov))
+        obrazok.putdata([0 if modul else 255 for riadok in matica for modul in riadok])
+        return obrazok.resize((pocet_modulov * velkost_modulu,) * 2, Image.NEAREST)
+
+def matica_na_svg(matica, velkost_modulu=None):
+    """
+    Prevedie QR maticu na SVG (text). Súvislé tmavé moduly v riadku sú jeden obdĺžnik
+    v jedinej ceste, rovnako ako pri vektorovom kreslení do PDF.
+    """
+    velkost_modulu = velkost_modulu or kodovanie_qr.nastavenia().velkost_modulu
+    pocet_modulov = len(matica)
+    casti_cesty = [f"M{zaciatok} {cislo_riadku}h{dlzka}v1h-{dlzka}z" for cislo_riadku, zaciatok, dlzka in _useky_modulov(matica)]
+    velkost = pocet_modulov * velkost_modulu
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{velkost}" height="{velkost}" '
+            f'viewBox="0 0 {pocet_modulov} {pocet_modulov}" shape-rendering="crispEdges">'
+            f'<rect width="100%" height="100%" fill="#fff"/>'
+            f'<path d="{"".join(casti_cesty)}" fill="#000"/></svg>')
+
+def _zostav_qr_maticu(payload, nastavenia_qr=None):
+    with meranie.meraj('qr_matica'):
+        return kodovanie_qr.zostav_maticu(payload, nastavenia_qr)
+
+def vygeneruj_qr_maticu(payload):
+    """
+    Vygeneruje maticu modulov QR kódu (riadky bytes, 1/0 pre tmavý/svetlý modul).
+    Matica obsahuje aj tichú zónu (okraj), rovnako ako obrázok z vygeneruj_qr_kod.
+    Výsledok sa pamätá v cache.matice podľa payloadu a nastavení kódovania (maticu preto nemeňte).
+    """
+    nastavenia_qr = kodovanie_qr.nastavenia()
+    kluc = (payload, nastavenia_qr.korekcia, nastavenia_qr.verzia, nastavenia_qr.maska)
+    return cache.matice.ziskaj_alebo_vytvor(kluc, lambda: _zostav_qr_maticu(payload, nastavenia_qr))
 
-    for platba in zoznam_platieb:
-        # Ak sa blok nezmestí na aktuálnu stranu, začneme novú
-        if pozicia_y < vyska_bloku_platby + horny_okraj: # Pridáme malú rezervu
-            c.showPage()
-            pozicia_y = vyska - horny_okraj
+def vygeneruj_payload(info_platby, suma, poznamka):
+    """
+    Vygeneruje Pay by Square reťazec pre jednu čiastku.
+    Výsledok sa pamätá v cache.payloady podľa všetkých polí platby vrátane dátumu,
+    ktorý je súčasťou payloadu.
+    """
+    datum = info_platby.get('datum') or date.today()
+    bic = info_platby.get('bic', '')
+    kluc = (info_platby['iban'], bic, str(suma), info_platby['vs'], info_platby['ks'],
+            poznamka, info_platby['prijemca'], datum.isoformat())
+
+    def vytvor():
+        import pay_by_square
+        with meranie.meraj('payload'):
+            return pay_by_square.generate(
+                iban=info_platby['iban'],
+                swift=bic,
+                amount=suma, # Decimal presne na centy
+                variable_symbol=info_platby['vs'],
+                constant_symbol=info_platby['ks'],
+                note=poznamka,
+                beneficiary_name=info_platby['prijemca'],
+                date=datum
+            )
+    return cache.payloady.ziskaj_alebo_vytvor(kluc, vytvor)
 
-        vrch_bloku_y = pozicia_y
-        velkost_qr = 40 * mm
-        qr_obr = ImageReader(platba['subor_qr']) # ImageReader načíta cestu k súboru
-        # Pozícia QR kódu (ľavý okraj, y súradnica spodku QR)
-        qr_y_spodok = vrch_bloku_y - velkost_qr - (5*mm)
-        c.drawImage(qr_obr, lavy_okraj, qr_y_spodok, width=velkost_qr, height=velkost_qr)
+def vykresli_qr_vektorovo(c, matica, x, y, velkost):
+    """
+    Vykreslí QR maticu do PDF ako vektorové obdĺžniky (x, y je ľavý dolný roh).
+    Súvislé tmavé moduly v riadku sa spoja do jedného obdĺžnika a celý kód
+    je jedna cesta, takže PDF je menšie a kód ostáva ostrý pri akomkoľvek DPI.
+    """
+    modul = velkost / len(matica)
+    # Súradnice sa zapisujú v moduloch (celé čísla) a na miesto v PDF ich prevedie matica 'cm';
+    # je to rovnaká cesta ako cez canvas.beginPath().rect(), ale bez formátovania tisícok
+    # desatinných čísel, ktoré pri veľkých dokumentoch zaberalo väčšinu času
+    operacie = [f"q {modul:.4f} 0 0 {-modul:.4f} {x:.4f} {y + velkost:.4f} cm"]
+    operacie.extend(f"{zaciatok} {cislo_riadku} {dlzka} 1 re" for cislo_riadku, zaciatok, dlzka in _useky_modulov(matica))
+    operacie.append("f Q")
+    c.addLiteral('\n'.join(operacie))
+
+def _useky_modulov(matica):
+    """Súvislé úseky tmavých modulov v riadkoch matice ako (riadok, prvý stĺpec, dĺžka)."""
+    pocet_modulov = len(matica)
+    for cislo_riadku, riadok in enumerate(matica):
+        stlpec = 0
+        while stlpec < pocet_modulov:
+            if not riadok[stlpec]:
+                stlpec += 1
+                continue
+            zaciatok = stlpec
+            while stlpec < pocet_modulov and riadok[stlpec]:
+                stlpec += 1
+            yield cislo_riadku, zaciatok, stlpec - zaciatok
 
-        # --- Text vedľa QR ---
-        # Registrácia a nastavenie fontu pre každý blok (aj pre novú stranu)
-        ma_arial = registruj_font(c) # Zaregistruje a nastaví 10pt
+MIN_VELKOST_TEXTU = 5 # Pod túto veľkosť písma sa text radšej skráti
 
-        text_x = lavy_okraj + velkost_qr + (10 * mm)
-        text_y = vrch_bloku_y - (8 * mm) # Začíname trochu nižšie od vrchu bloku
-        suma_text = f"{platba['suma']:.2f} EUR"
-        texty = [
+def _prisposob_text(text, font, velkost, sirka):
+    """
+    Vráti (text, veľkosť písma) tak, aby sa text zmestil do šírky:
+    najskôr zmenší písmo (najviac na MIN_VELKOST_TEXTU), potom text skráti.
+    """
+    from reportlab.pdfbase import pdfmetrics
+    dlzka = pdfmetrics.stringWidth(text, font, velkost)
+    if dlzka <= sirka:
+        return text, velkost
+    if velkost * sirka / dlzka >= MIN_VELKOST_TEXTU:
+        return text, velkost * sirka / dlzka
+    while text and pdfmetrics.stringWidth(text + '…', font, MIN_VELKOST_TEXTU) > sirka:
+        text = text[:-1]
+    return text + '…', MIN_VELKOST_TEXTU
+
+def _priprav_texty(zakladne_info, rozlozenie_strany, pouzite_fonty, celkovy_pocet):
+    """
+    Vypočíta raz pre celý dokument všetko, čo je pre platby rovnaké: riadky textu
+    s veľkosťou písma prispôsobenou šírke políčka a x-ovú pozíciu textu v políčku.
+    """
+    r = rozlozenie_strany
+    texty = {}
+    if r.styl == 'blok':
+        texty['x'] = r.velkost_qr + r.medzera_textu
+        sirka_textu = r.sirka_bunky - texty['x']
+        posledny_riadok = r.odsadenie_textu + 4 * r.krok_riadku
+        if r.odsadenie_poradia <= posledny_riadok:
+            # Poradové číslo je vedľa textu, text sa mu musí vyhnúť
+            from reportlab.pdfbase import pdfmetrics
+            najsirsie_poradie = f"{celkovy_pocet}/{celkovy_pocet}"
+            sirka_textu -= pdfmetrics.stringWidth(najsirsie_poradie, pouzite_fonty.poradie, r.velkost_poradia) + 2 * mm
+        texty['riadky'] = [_prisposob_text(text, pouzite_fonty.text, r.velkost_textu, sirka_textu) for text in (
             f"Dodávateľ: {zakladne_info['prijemca']}",
             f"IBAN: {zakladne_info['iban']}",
             f"VS: {zakladne_info['vs']}",
             f"KS: {zakladne_info['ks'] if zakladne_info['ks'] else '-'}",
-            f"Suma: {suma_text}"
-        ]
-        # Nastavenie fontu pre bežný text
-        if ma_arial:
-            c.setFont("Arial", 10)
-        else:
-            c.setFont("Helvetica", 10)
-
-        for text in texty:
-            c.drawString(text_x, text_y, text)
-            text_y -= 5 * mm # Posun pre ďalší riadok
-
-        # --- Poradové číslo (veľké, vpravo) ---
-        if ma_arial:
-            c.setFont("Arial", 24) # Väčší font pre poradové číslo
-        else:
-            c.setFont("Helvetica-Bold", 24) # Záložný väčší font
-
-        poradove_cislo_text = f"{platba['poradie']}/{platba['celkovy_pocet']}"
-        # Y pozícia približne v strede výšky bloku
-        poradove_cislo_y = vrch_bloku_y - (vyska_bloku_platby / 2) + (5*mm) # Mierne vyššie
-        c.drawRightString(sirka - pravy_okraj, poradove_cislo_y, poradove_cislo_text)
-
-        # --- Čiarkovaná čiara pod blokom ---
-        pozicia_ciary_y = vrch_bloku_y - vyska_bloku_platby + (5 * mm)
-        c.setDash(3, 3) # Nastavenie prerušovanej čiary
-        c.line(lavy_okraj, pozicia_ciary_y, sirka - pravy_okraj, pozicia_ciary_y)
-        c.setDash([], 0) # Vrátenie na plnú čiaru pre prípadné ďalšie kreslenie
-
-        # Posun pre ďalší blok
-        pozicia_y -= vyska_bloku_platby
-
-    c.save()
+        )]
+    if r.hlavicka:
+        sirka_strany = r.strana[0] - 2 * r.pozicie[0][0]
+        texty['hlavicka'] = [_prisposob_text(text, pouzite_fonty.text, 9, sirka_strany) for text in (
+            f"Dodávateľ: {zakladne_info['prijemca']}    IBAN: {zakladne_info['iban']}",
+            f"VS: {zakladne_info['vs']}    KS: {zakladne_info['ks'] if zakladne_info['ks'] else '-'}    "
+            f"Počet platieb: {celkovy_pocet}",
+        )]
+    return texty
+
+def _vykresli_qr(c, platba, x, y, velkost):
+    if 'qr_matica' in platba:
+        vykresli_qr_vektorovo(c, platba['qr_matica'], x, y, velkost)
+    else:
+        from reportlab.lib.utils import ImageReader
+        qr_obr = ImageReader(platba['qr_obrazok']) # Obrázok QR kódu priamo z pamäte
+        c.drawImage(qr_obr, x, y, width=velkost, height=velkost)
+
+def _vykresli_blok(c, r, texty, pouzite_fonty, platba, x, y):
+    """Blok: QR vľavo, text vpravo od neho, veľké poradové číslo pri pravom okraji."""
+    vrch_bloku_y = y + r.vyska_bunky
+    # Pozícia QR kódu (ľavý okraj, y súradnica spodku QR)
+    _vykresli_qr(c, platba, x, vrch_bloku_y - r.velkost_qr - r.odsadenie_qr, r.velkost_qr)
+
+    # --- Text vedľa QR --- (jeden textový objekt pre všetky riadky)
+    text = c.beginText(x + texty['x'], vrch_bloku_y - r.odsadenie_textu)
+    for riadok, velkost in texty['riadky']:
+        text.setFont(pouzite_fonty.text, velkost, leading=r.krok_riadku)
+        text.textLine(riadok)
+    text.setFont(pouzite_fonty.text, r.velkost_textu, leading=r.krok_riadku)
+    text.textLine(f"Suma: {platba['suma']:.2f} EUR")
+    c.drawText(text)
+
+    # --- Poradové číslo (veľké, vpravo) ---
+    c.setFont(pouzite_fonty.poradie, r.velkost_poradia)
+    c.drawRightString(x + r.sirka_bunky, vrch_bloku_y - r.odsadenie_poradia,
+                      f"{platba['poradie']}/{platba['celkovy_pocet']}")
+
+    # --- Čiarkovaná čiara pod blokom ---
+    if r.oddelovac is not None:
+        c.line(x, y + r.oddelovac, x + r.sirka_bunky, y + r.oddelovac)
+
+def _vykresli_bunku(c, r, pouzite_fonty, platba, x, y):
+    """Bunka mriežky: QR v strede hore, pod ním suma a poradie (spoločné údaje sú v hlavičke strany)."""
+    vrch_qr = y + r.vyska_bunky - r.odsadenie_qr
+    stred = x + r.sirka_bunky / 2
+    _vykresli_qr(c, platba, stred - r.velkost_qr / 2, vrch_qr - r.velkost_qr, r.velkost_qr)
+    c.setFont(pouzite_fonty.text, r.velkost_textu)
+    c.drawCentredString(stred, vrch_qr - r.velkost_qr - r.krok_riadku, f"{platba['suma']:.2f} EUR")
+    c.drawCentredString(stred, vrch_qr - r.velkost_qr - 2 * r.krok_riadku,
+                        f"Platba {platba['poradie']}/{platba['celkovy_pocet']}")
+
+def _zacni_stranu(c, r, texty, pouzite_fonty, cislo_strany, pocet_stran):
+    """Nastavenia a hlavička, ktoré platia pre celú stranu."""
+    if r.oddelovac is not None:
+        c.setDash(3, 3) # Prerušovaná čiara pre oddeľovače na celej strane
+    if r.hlavicka:
+        x = r.pozicie[0][0]
+        y = r.strana[1] - 10 * mm - 4 * mm
+        for riadok, velkost in texty['hlavicka']:
+            c.setFont(pouzite_fonty.text, velkost)
+            c.drawString(x, y, riadok)
+            y -= 5 * mm
+        c.drawRightString(r.strana[0] - x, r.strana[1] - 10 * mm - 4 * mm, f"Strana {cislo_strany}/{pocet_stran}")
+
+def _nazov_casti(vystupny_subor, cislo_casti, pocet_casti):
+    """Názov súboru pre časť dokumentu (pri jednej časti ostáva pôvodný)."""
+    if pocet_casti == 1:
+        return vystupny_subor
+    zaklad, pripona = os.path.splitext(vystupny_subor)
+    return f"{zaklad}_cast{cislo_casti}{pripona}"
+
+def vytvor_pdf_dokument(zakladne_info, zoznam_platieb, vystup=None, rozlozenie_strany=None, statistiky=None,
+                        max_stran=None, ciel=None):
+    """
+    Vytvorí PDF súbor s platbami rozmiestnenými podľa rozloženia strany
+    (predvolene pôvodné horizontálne bloky pod sebou, pozri modul rozlozenie).
+    zoznam_platieb môže byť aj generátor - platby sa kreslia postupne, ako prichádzajú,
+    a nikdy nie sú v pamäti všetky naraz (počet čiastok sa zistí z prvej platby).
+    Ak je zadaný vystup (cesta alebo binárny súborový objekt, napr. io.BytesIO),
+    PDF sa zapíše tam namiesto QR_Platba_VS_<vs>.pdf.
+    Pri max_stran sa dokument do súboru rozdelí na časti '<názov>_cast<i>.pdf' po najviac
+    max_stran stranách; ReportLab drží strany v pamäti až do uloženia, takže toto ohraničuje pamäť.
+    Ak je zadaný ciel (vystupy.CielPriecinok/CielZip), súbory (aj časti) sa zapíšu doň,
+    inak do aktuálneho priečinka; súbor sa na svojom názve objaví až celý zapísaný.
+    Ak je zadaný slovník statistiky, doplní sa doň počet strán, platieb, zoznam súborov a čas.
+    Vráti názov vytvoreného súboru (pri viacerých častiach prvej časti, alebo zadaný vystup).
+    """
+    from reportlab.pdfgen import canvas
+    zaciatok = time.perf_counter()
+    r = rozlozenie_strany or rozlozenie.vytvor_rozlozenie()
+    vystupny_subor = vystup or f"{vystupy.zaklad_nazvu(zakladne_info)}.pdf"
+    if ciel is None and isinstance(vystupny_subor, str):
+        ciel = vystupy.CielPriecinok()
+    # Font sa zaregistruje iba raz za beh programu, ďalšie volania vrátia zapamätaný výsledok
+    pouzite_fonty = fonty.ziskaj_fonty()
+
+    platby = iter(zoznam_platieb)
+    prva_platba = next(platby, None)
+    celkovy_pocet = prva_platba['celkovy_pocet'] if prva_platba else 0
+    na_stranu = len(r.pozicie)
+    pocet_stran = rozlozenie.pocet_stran(r, celkovy_pocet)
+    texty = _priprav_texty(zakladne_info, r, pouzite_fonty, celkovy_pocet)
+    if not max_stran or not isinstance(vystupny_subor, str):
+        max_stran = pocet_stran  # Do súborového objektu sa zapisuje vždy celý dokument
+    pocet_casti = -(-pocet_stran // max_stran)
+
+    def otvor_cast(cislo_casti):
+        nazov = _nazov_casti(vystupny_subor, cislo_casti, pocet_casti)
+        if ciel is None:
+            vytvorene_subory.append(nazov)
+            return canvas.Canvas(nazov, pagesize=r.strana), None
+        vytvorene_subory.append(ciel.cesta(nazov))
+        subor = ciel.otvor(nazov)
+        return canvas.Canvas(subor, pagesize=r.strana), subor
+
+    def uloz_cast(c, subor):
+        with meranie.meraj('pdf_ulozenie'):
+            c.save()
+            if subor is not None:
+                subor.close()
+
+    vytvorene_subory = []
+    c, subor = otvor_cast(1)
+    try:
+        _zacni_stranu(c, r, texty, pouzite_fonty, 1, pocet_stran)
+        pocet_platieb = 0
+        for i, platba in enumerate(itertools.chain([prva_platba], platby) if prva_platba else ()):
+            policko = i % na_stranu
+            # Strana je plná, začneme novú (pri limite strán v novom súbore)
+            if i and not policko:
+                cislo_strany = i // na_stranu + 1
+                if (cislo_strany - 1) % max_stran == 0:
+                    uloz_cast(c, subor)
+                    c, subor = otvor_cast(len(vytvorene_subory) + 1)
+                else:
+                    c.showPage()
+                _zacni_stranu(c, r, texty, pouzite_fonty, cislo_strany, pocet_stran)
+            x, y = r.pozicie[policko]
+            with meranie.meraj('pdf_kreslenie'):
+                if r.styl == 'bunka':
+                    _vykresli_bunku(c, r, pouzite_fonty, platba, x, y)
+                else:
+                    _vykresli_blok(c, r, texty, pouzite_fonty, platba, x, y)
+            pocet_platieb += 1
+        uloz_cast(c, subor)
+    except BaseException:
+        if subor is not None:
+            ciel.zrus(subor)  # Rozpísaná časť sa zahodí (položka ZIP archívu sa iba zatvorí)
+        raise
+    meranie.pripocitaj('pdf_strany', pocet_stran)
+    meranie.pripocitaj('pdf_subory', len(vytvorene_subory))
+    if statistiky is not None:
+        statistiky.update(stran=pocet_stran, platieb=pocet_platieb, subory=vytvorene_subory,
+                          trvanie_s=time.perf_counter() - zaciatok)
+    return vytvorene_subory[0]
+
+
+def vypis_uspesne_pdf(vystupny_subor, format_vystupu='pdf'):
+    """Vypíše hlásenie o úspešne vygenerovanom PDF súbore (alebo výstupe v inom formáte)."""
+    popis = {'pdf': 'PDF súbor', 'payload': 'Súbor s payloadmi'}.get(format_vystupu, f"{format_vystupu.upper()} QR kódy")
     print(f"\n{ANSI_BOLD}----------------------------------------------------{ANSI_END}")
-    print(f"✅ {ANSI_GREEN}PDF súbor '{vystupny_subor}' bol úspešne vygenerovaný!{ANSI_END}")
+    print(f"✅ {ANSI_GREEN}{popis} '{vystupny_subor}' úspešne vygenerované!{ANSI_END}")
     # Skúsime získať absolútnu cestu pre lepšiu informáciu
     try:
         abs_path = os.path.abspath(vystupny_subor)
@@ -292,36 +424,57 @@ def vytvor_pdf_dokument(zakladne_info, zoznam_platieb):
     print(f"{ANSI_BOLD}----------------------------------------------------{ANSI_END}")
 
 
-def vycisti_temp_priecinok():
-    """Odstráni dočasné QR kódy a priečinok."""
-    try:
-        if os.path.exists(TEMP_DIR):
-            for subor in os.listdir(TEMP_DIR):
-                try:
-                    os.remove(os.path.join(TEMP_DIR, subor))
-                except Exception as e_file:
-                     print(f"⚠️ {ANSI_YELLOW}Nepodarilo sa odstrániť dočasný súbor {subor}: {e_file}{ANSI_END}")
-            try:
-                os.rmdir(TEMP_DIR)
-            except Exception as e_dir:
-                 print(f"⚠️ {ANSI_YELLOW}Nepodarilo sa odstrániť dočasný priečinok {TEMP_DIR}: {e_dir}{ANSI_END}")
-    except Exception as e:
-        print(f"⚠️ {ANSI_YELLOW}Nepodarilo sa vyčistiť dočasný priečinok: {e}{ANSI_END}")
-
 # --- HLAVNÉ FUNKCIE LOGIKY PROGRAMU ---
 
-def ziskaj_detaily_platby(partner_info):
+def over_sumu(suma_str):
+    """Prevedie zadaný text (aj s desatinnou čiarkou) na kladnú sumu v Decimal, inak vyhodí ValueError."""
+    suma = delenie.na_sumu(suma_str)
+    if suma <= 0:
+        raise ValueError("Suma musí byť kladné číslo.")
+    return suma
+
+def je_platny_vs(vs):
+    """Variabilný symbol: iba číslice, max 10."""
+    return vs.isdigit() and len(vs) <= 10
+
+def je_platny_ks(ks):
+    """Konštantný symbol: nepovinný, iba číslice, max 4."""
+    return not ks or (ks.isdigit() and len(ks) <= 4)
+
+def zostav_info_platby(partner_info, suma, vs, ks, povodna_poznamka, strategia_delenia=None, limity_bank=None):
+    """
+    Zostaví slovník s údajmi platby, s ktorým pracuje spracuj_platbu.
+    Nastavenia delenia sú súčasťou platby, aby ich videli aj procesy pri paralelnom generovaní.
+    IBAN (a BIC, ak je zadaný) a počet čiastok (delenie.MAX_CIASTOK) sa overia hneď tu,
+    ešte pred generovaním QR kódov (ValueError).
+    """
+    info_platby = {
+        "prijemca": partner_info['nazov'],
+        "iban": kontrola_iban.over_iban(partner_info['iban'].strip()),
+        "bic": kontrola_iban.over_bic(partner_info.get('bic') or ''),
+        "celkova_suma": suma,
+        "vs": vs,
+        "ks": ks,
+        "povodna_poznamka": povodna_poznamka,
+        "delenie": strategia_delenia or STRATEGIA_DELENIA,
+        "limity_bank": limity_bank,
+        "datum": date.today() # Dátum splatnosti v payloade (rovnaký pre všetky čiastky)
+    }
+    rozdel_sumu(info_platby)
+    return info_platby
+
+def ziskaj_detaily_platby(partner_info, strategia_delenia=None, limity_bank=None):
     """Získa od používateľa sumu, VS, KS, poznámku."""
     print(f"\n{ANSI_BOLD}--- Zadanie platby pre: {partner_info['nazov']} ({partner_info['iban']}) ---{ANSI_END}")
     print(f"(Pre zrušenie zadávania a návrat do menu zadajte '{ANSI_CYAN}q{ANSI_END}' kedykoľvek)")
 
     while True:
         try:
-            suma_str = input(f"Zadajte CELKOVÚ sumu ({ANSI_YELLOW}napr. 5562.00{ANSI_END}): ").replace(',', '.')
+            suma_str = input(f"Zadajte CELKOVÚ sumu ({ANSI_YELLOW}napr. 5562.00{ANSI_END}): ")
             if suma_str.lower() == 'q': return None
-            suma = float(suma_str)
-            if suma <= 0:
-                raise ValueError("Suma musí byť kladné číslo.")
+            suma = over_sumu(suma_str)
+            delenie.pocet_ciastok(suma, MAX_SUMA_NA_QR, strategia_delenia or STRATEGIA_DELENIA,
+                                  partner_info['iban'].strip(), limity_bank)
             break
         except ValueError as e:
             print(f"❌ {ANSI_RED}Neplatná suma. Zadajte číslo (napr. 1234.50). {e}{ANSI_END}")
@@ -329,104 +482,786 @@ def ziskaj_detaily_platby(partner_info):
     while True:
         vs = input(f"Zadajte {ANSI_YELLOW}variabilný symbol{ANSI_END} (max 10 číslic): ")
         if vs.lower() == 'q': return None
-        if vs.isdigit() and len(vs) <= 10:
+        if je_platny_vs(vs):
             break
         print(f"❌ {ANSI_RED}Neplatný VS. Musí obsahovať iba číslice (max 10).{ANSI_END}")
 
     while True:
         ks = input(f"Zadajte {ANSI_YELLOW}konštantný symbol{ANSI_END} (nepovinné, max 4 číslice): ")
         if ks.lower() == 'q': return None
-        if not ks or (ks.isdigit() and len(ks) <= 4):
+        if je_platny_ks(ks):
             break
         print(f"❌ {ANSI_RED}Neplatný KS. Musí obsahovať iba číslice (max 4).{ANSI_END}")
 
     povodna_poznamka = input(f"Zadajte {ANSI_YELLOW}poznámku pre príjemcu{ANSI_END} (nepovinné): ")
     if povodna_poznamka.lower() == 'q': return None
 
-    return {
-        "prijemca": partner_info['nazov'],
-        "iban": partner_info['iban'].strip(),
-        "celkova_suma": suma,
-        "vs": vs,
-        "ks": ks,
-        "povodna_poznamka": povodna_poznamka
-    }
-
-def spracuj_platbu(info_platby):
-    """Rozdelí platbu, vygeneruje QR kódy a vytvorí PDF."""
-    celkova_suma = info_platby["celkova_suma"]
-    ciastocne_sumy = []
+    return zostav_info_platby(partner_info, suma, vs, ks, povodna_poznamka, strategia_delenia, limity_bank)
 
-    if celkova_suma > MAX_SUMA_NA_QR:
-        pocet_plnych_platieb = math.floor(celkova_suma / MAX_SUMA_NA_QR) # Použijeme floor pre istotu
-        zostatok = round(celkova_suma - (pocet_plnych_platieb * MAX_SUMA_NA_QR), 2) # Presnejší výpočet zostatku
+def rozdel_sumu(info_platby):
+    """
+    Rozdelí celkovú sumu platby na čiastky po najviac MAX_SUMA_NA_QR (napr. 2500 -> 1000, 1000, 500).
+    Stratégiu určuje info_platby['delenie'] (pozri delenie.STRATEGIE).
+    Vráti dvojicu (počet čiastok, generátor čiastok v Decimal).
+    """
+    parametre = (
+        info_platby["celkova_suma"],
+        MAX_SUMA_NA_QR,
+        info_platby.get('delenie') or STRATEGIA_DELENIA,
+        info_platby['iban'],
+        info_platby.get('limity_bank'),
+    )
+    with meranie.meraj('delenie'):
+        pocet = delenie.pocet_ciastok(*parametre)
+    return pocet, delenie.ciastky(*parametre)
+
+def forma_qr(format_vystupu='pdf', vektorove_qr=False):
+    """
+    Čo sa má pre každú čiastku pripraviť (pozri _vygeneruj_ciastkovu_platbu): pre PDF matica
+    alebo obrázok, pre SVG/PNG rovno bajty súboru, pre 'payload' iba payload bez QR kódu.
+    """
+    if format_vystupu == 'pdf':
+        return 'matica' if vektorove_qr else 'obrazok'
+    return format_vystupu
+
+def poznamka_ciastky(info_platby, poradie, celkovy_pocet_platieb):
+    """Poznámka v payloade čiastky: pri delení s poradím '(Platba i/n)' na začiatku, skrátená na 60 znakov."""
+    poznamka = info_platby['povodna_poznamka']
+    if celkovy_pocet_platieb > 1:
+        dodatok_poznamky = f"(Platba {poradie}/{celkovy_pocet_platieb})"
+        # Pridáme dodatok na začiatok, aby bol vždy viditeľný
+        poznamka = f"{dodatok_poznamky} {poznamka}".strip()
+        # Skrátime poznámku, ak je príliš dlhá pre QR kód (limit je cca 60 znakov)
+        if len(poznamka) > 60:
+            poznamka = poznamka[:57] + "..."
+    return poznamka
+
+def _vygeneruj_ciastkovu_platbu(uloha):
+    """
+    Vygeneruje payload a QR kód pre jednu čiastkovú platbu v požadovanej forme
+    ('matica', 'obrazok', 'svg', 'png' alebo 'payload', pozri forma_qr).
+    Je na úrovni modulu, aby sa dala spustiť aj v samostatnom procese (ProcessPoolExecutor).
+    """
+    info_platby, suma, poradie, celkovy_pocet_platieb, forma = uloha
+    payload = vygeneruj_payload(info_platby, suma, poznamka_ciastky(info_platby, poradie, celkovy_pocet_platieb))
+    platba = {
+        'suma': suma,
+        'poradie': poradie,
+        'celkovy_pocet': celkovy_pocet_platieb,
+        'payload': payload
+    }
+    if forma == 'matica':
+        platba['qr_matica'] = vygeneruj_qr_maticu(payload)
+    elif forma == 'obrazok':
+        platba['qr_obrazok'] = vygeneruj_qr_kod(payload) # QR kód zostáva v pamäti, žiadne dočasné súbory
+    elif forma == 'svg':
+        platba['qr_svg'] = matica_na_svg(vygeneruj_qr_maticu(payload)).encode('utf-8')
+    elif forma == 'png':
+        vystup = io.BytesIO()
+        matica_na_obrazok(vygeneruj_qr_maticu(payload)).save(vystup, format='PNG')
+        platba['qr_png'] = vystup.getvalue()
+    return platba
+
+def spusti_s_meranim(funkcia, *argumenty):
+    """Spustí funkciu v procese poolu a s výsledkom vráti aj časy etáp namerané v tomto procese."""
+    vysledok = funkcia(*argumenty)
+    return vysledok, meranie.odober()
+
+def _vysledok_ulohy(uloha):
+    """Počká na úlohu odoslanú cez spusti_s_meranim, pripočíta jej merania a vráti výsledok."""
+    vysledok, namerane = uloha.result()
+    meranie.pripoj(namerane)
+    return vysledok
+
+def _vygeneruj_balik(ulohy):
+    """Vygeneruje niekoľko čiastkových platieb naraz (jedna úloha pre proces v poole)."""
+    return [_vygeneruj_ciastkovu_platbu(uloha) for uloha in ulohy]
+
+def generuj_ciastkove_platby(info_platby, ciastocne_sumy, celkovy_pocet_platieb, forma='obrazok', pool=None):
+    """
+    Postupne (generátor) vracia čiastkové platby s payloadom a QR kódom v poradí platieb
+    (QR kód v danej forme, pozri forma_qr).
+    Ak je zadaný pool (ProcessPoolExecutor), čiastky sa generujú paralelne v balíkoch,
+    ale rozpracovaných je najviac MAX_BALIKOV_V_POOLE balíkov - pamäť teda nerastie
+    s počtom čiastok, aj keď ich je desaťtisíce.
+    """
+    ulohy = ((info_platby, suma, i + 1, celkovy_pocet_platieb, forma) for i, suma in enumerate(ciastocne_sumy))
+    if pool is None or celkovy_pocet_platieb < 2:
+        for uloha in ulohy:
+            yield _vygeneruj_ciastkovu_platbu(uloha)
+        return
 
-        # Kontrola zaokrúhlenia - ak je zostatok veľmi blízko nule, považujeme ho za nulu
-        if abs(zostatok) < 0.001:
-            zostatok = 0.0
+    rozpracovane = collections.deque()
+    try:
+        while True:
+            while len(rozpracovane) < MAX_BALIKOV_V_POOLE:
+                balik = list(itertools.islice(ulohy, VELKOST_BALIKA_PRE_PROCES))
+                if not balik:
+                    break
+                rozpracovane.append(pool.submit(spusti_s_meranim, _vygeneruj_balik, balik))
+            if not rozpracovane:
+                return
+            # Balíky sa vyberajú v poradí odoslania, takže 'poradie' zostáva deterministické
+            yield from _vysledok_ulohy(rozpracovane.popleft())
+    finally:
+        for uloha in rozpracovane:
+            uloha.cancel()
 
-        for _ in range(pocet_plnych_platieb):
-            ciastocne_sumy.append(MAX_SUMA_NA_QR)
-        if zostatok > 0:
-            ciastocne_sumy.append(zostatok)
-        print(f"\n{ANSI_BLUE}INFO:{ANSI_END} Celková suma {ANSI_YELLOW}{celkova_suma:.2f} EUR{ANSI_END} bude rozdelená na {ANSI_YELLOW}{len(ciastocne_sumy)} platieb{ANSI_END}.")
-    else:
-        ciastocne_sumy.append(celkova_suma)
+def vygeneruj_ciastkove_platby(info_platby, ciastocne_sumy, celkovy_pocet_platieb, forma='obrazok', pool=None):
+    """Ako generuj_ciastkove_platby, ale vráti celý zoznam naraz (pre menšie platby)."""
+    return list(generuj_ciastkove_platby(info_platby, ciastocne_sumy, celkovy_pocet_platieb, forma, pool))
 
-    zoznam_vygenerovaných_platieb = []
-    celkovy_pocet_platieb = len(ciastocne_sumy)
+def _vygeneruj_platby_riadku(info_platby, forma):
+    """Rozdelí a vygeneruje všetky čiastky jednej platby (úloha pre proces pri dávkovom spracovaní)."""
+    celkovy_pocet_platieb, ciastocne_sumy = rozdel_sumu(info_platby)
+    return vygeneruj_ciastkove_platby(info_platby, ciastocne_sumy, celkovy_pocet_platieb, forma)
 
-    # Vytvoríme TEMP_DIR až keď ho naozaj potrebujeme
-    try:
-        if not os.path.exists(TEMP_DIR):
-            os.makedirs(TEMP_DIR)
-    except Exception as e:
-         print(f"❌ {ANSI_RED}Nepodarilo sa vytvoriť dočasný priečinok '{TEMP_DIR}': {e}{ANSI_END}")
-         return # Nemôžeme pokračovať bez dočasného priečinka
+def vyrenderuj_platbu(info_platby, format_vystupu='pdf', poradie=1, vektorove_qr=True, rozlozenie_strany=None):
+    """
+    Vyrenderuje platbu priamo do bajtov bez zápisu na disk (pre HTTP službu).
+    'pdf' vráti celý dokument so všetkými čiastkami, 'png' a 'svg' iba QR kód čiastky
+    s daným poradím. Vráti (bajty, počet čiastok). Pri neplatných údajoch vyhodí ValueError.
+    Je na úrovni modulu, aby sa dala spustiť aj v samostatnom procese.
+    """
+    celkovy_pocet_platieb, ciastocne_sumy = rozdel_sumu(info_platby)
+    if format_vystupu == 'pdf':
+        vystup = io.BytesIO()
+        platby = vygeneruj_ciastkove_platby(info_platby, ciastocne_sumy, celkovy_pocet_platieb,
+                                            forma_qr('pdf', vektorove_qr))
+        vytvor_pdf_dokument(info_platby, platby, vystup, rozlozenie_strany)
+        return vystup.getvalue(), celkovy_pocet_platieb
+
+    if not 1 <= poradie <= celkovy_pocet_platieb:
+        raise ValueError(f"Poradie platby musí byť od 1 do {celkovy_pocet_platieb}.")
+    suma = next(itertools.islice(ciastocne_sumy, poradie - 1, None))
+    platba = _vygeneruj_ciastkovu_platbu((info_platby, suma, poradie, celkovy_pocet_platieb, 'matica'))
+    if format_vystupu == 'svg':
+        return matica_na_svg(platba['qr_matica']).encode('utf-8'), celkovy_pocet_platieb
+    if format_vystupu == 'png':
+        vystup = io.BytesIO()
+        matica_na_obrazok(platba['qr_matica']).save(vystup, format='PNG')
+        return vystup.getvalue(), celkovy_pocet_platieb
+    raise ValueError(f"Neznámy formát '{format_vystupu}' (možnosti: pdf, png, svg).")
+
+def pocet_pracovnikov(pracovnici):
+    """Prevedie nastavenie počtu procesov na skutočný počet (0 alebo None = počet jadier)."""
+    return pracovnici or os.cpu_count() or 1
+
+def vytvor_pool(pracovnici, zahriat_fonty=False):
+    """
+    Vytvorí ProcessPoolExecutor s daným počtom procesov (0 = počet jadier).
+    Pri 1 procese vráti None a všetko beží sériovo v hlavnom procese.
+    Pri zahriat_fonty=True si každý proces hneď pri štarte naimportuje knižnice a zaregistruje font
+    (pozri predohrej), aby na to nečakala prvá požiadavka.
+    """
+    pracovnici = pocet_pracovnikov(pracovnici)
+    if pracovnici <= 1:
+        return None
+    from concurrent.futures import ProcessPoolExecutor
+    # Procesy dostanú rovnaké nastavenie diskovej cache a fontu ako hlavný proces
+    return ProcessPoolExecutor(max_workers=pracovnici, initializer=_inicializuj_proces,
+                               initargs=(cache.nastavenie_disku(), fonty.nastavena_cesta_fontu(), zahriat_fonty,
+                                         kodovanie_qr.nastavenia()))
 
+def predohrej(na_pozadi=True):
+    """
+    Naimportuje knižnice na generovanie (pay_by_square, qrcode, PIL, reportlab) a zaregistruje font.
+    Interaktívny režim to spúšťa vo vlákne na pozadí, kým používateľ vyberá partnera a zadáva sumu,
+    takže prvá platba nečaká na import (v .exe sa knižnice pri prvom importe aj načítavajú z balíka).
+    Vráti spustené vlákno, pri na_pozadi=False predohreje hneď a vráti None.
+    """
+    def zahrej():
+        try:
+            with meranie.meraj('predohriatie'):
+                # Stačí import, moduly ostanú v sys.modules pre lenivé importy vo funkciách
+                import pay_by_square
+                import qrcode
+                import PIL.Image
+                import reportlab.pdfgen.canvas
+                import reportlab.lib.utils
+                fonty.ziskaj_fonty()
+        except ImportError:
+            pass  # Chýbajúca knižnica sa ohlási až pri skutočnom generovaní
+
+    if not na_pozadi:
+        zahrej()
+        return None
+    vlakno = threading.Thread(target=zahrej, name='predohriatie', daemon=True)
+    vlakno.start()
+    return vlakno
+
+def _inicializuj_proces(nastavenie_disku, cesta_fontu=None, zahriat_fonty=False, nastavenia_qr=None):
+    """Spustí sa v každom novom procese poolu."""
+    meranie.vynuluj()  # Pri fork by proces zdedil merania hlavného procesu a vrátil by ich znova
+    if nastavenie_disku:
+        cache.nastav_disk(*nastavenie_disku)
+    fonty.nastav_cestu_fontu(cesta_fontu)
+    kodovanie_qr.nastav(nastavenia_qr)
+    if zahriat_fonty:
+        predohrej(na_pozadi=False)
+
+def zapis_vystup(info_platby, platby, format_vystupu='pdf', ciel=None, rozlozenie_strany=None,
+                 max_stran=MAX_STRAN_NA_SUBOR, statistiky=None):
+    """
+    Zapíše platby vo zvolenom formáte (pozri vystupy.FORMATY) do cieľa (predvolene aktuálny priečinok).
+    Platby musia byť vygenerované vo forme forma_qr(format_vystupu, ...).
+    Vráti zoznam vytvorených súborov (pri SVG/PNG súborov jednotlivých kódov).
+    """
+    if format_vystupu == 'pdf':
+        statistiky = statistiky if statistiky is not None else {}
+        vytvor_pdf_dokument(info_platby, platby, rozlozenie_strany=rozlozenie_strany, statistiky=statistiky,
+                            max_stran=max_stran, ciel=ciel)
+        return statistiky['subory']
+    zapisovac = vystupy.ZAPISOVACE.get(format_vystupu)
+    if zapisovac is None:
+        raise ValueError(f"Neznámy formát výstupu '{format_vystupu}' (možnosti: {', '.join(vystupy.FORMATY)}).")
+    return zapisovac(info_platby, platby, ciel or vystupy.CielPriecinok(), statistiky)
+
+def vygeneruj_platbu(info_platby, tichy=False, vektorove_qr=False, pool=None, rozlozenie_strany=None,
+                     max_stran=MAX_STRAN_NA_SUBOR, statistiky=None, format_vystupu='pdf', ciel=None):
+    """
+    Rozdelí platbu, vygeneruje QR kódy a vytvorí PDF (alebo iný formát, pozri zapis_vystup).
+    Pri vektorove_qr=True sa QR kódy kreslia ako vektorové moduly namiesto obrázkov.
+    rozlozenie_strany určuje rozmiestnenie platieb na strane (None = pôvodné bloky na A4).
+    Ak je zadaný pool, payloady a QR kódy sa generujú paralelne; súbory zapisuje vždy len hlavný proces.
+    Čiastky sa generujú a kreslia priebežne, PDF nad max_stran strán sa rozdelí na časti.
+    Chyby neodchytáva (rieši ich volajúci), vráti názov vytvoreného súboru
+    (pri častiach prvej; všetky sú v statistiky['subory'], ak je slovník zadaný).
+    """
+    celkova_suma = info_platby["celkova_suma"]
+    celkovy_pocet_platieb, ciastocne_sumy = rozdel_sumu(info_platby)
+    if celkovy_pocet_platieb > 1 and not tichy:
+        print(f"\n{ANSI_BLUE}INFO:{ANSI_END} Celková suma {ANSI_YELLOW}{celkova_suma:.2f} EUR{ANSI_END} bude rozdelená na {ANSI_YELLOW}{celkovy_pocet_platieb} platieb{ANSI_END}.")
+
+    platby = generuj_ciastkove_platby(info_platby, ciastocne_sumy, celkovy_pocet_platieb,
+                                      forma_qr(format_vystupu, vektorove_qr), pool)
+    statistiky = statistiky if statistiky is not None else {}
+    zapis_vystup(info_platby, platby, format_vystupu, ciel, rozlozenie_strany, max_stran, statistiky)
+    vystupny_subor = statistiky['subory'][0]
+    meranie.zaznamenaj('platba', vs=info_platby['vs'], suma=celkova_suma, format=format_vystupu,
+                       platieb=statistiky['platieb'], stran=statistiky['stran'], subory=statistiky['subory'],
+                       trvanie_s=round(statistiky['trvanie_s'], 4))
+    if not tichy and statistiky['stran'] > 1:
+        trvanie = max(statistiky['trvanie_s'], 1e-6)
+        print(f"{ANSI_BLUE}INFO:{ANSI_END} {statistiky['platieb']} QR kódov na {statistiky['stran']} stranách za {trvanie:.1f} s "
+              f"({statistiky['platieb'] / trvanie:.0f} kódov/s, {statistiky['stran'] / trvanie:.1f} strán/s).")
+        if len(statistiky['subory']) > 1:
+            print(f"{ANSI_BLUE}INFO:{ANSI_END} PDF bolo rozdelené na {len(statistiky['subory'])} časti po najviac {max_stran} stranách.")
+    return vystupny_subor
+
+def spracuj_platbu(info_platby, vektorove_qr=False, pracovnici=1, rozlozenie_strany=None,
+                   max_stran=MAX_STRAN_NA_SUBOR, format_vystupu='pdf', priecinok_vystupu=VYSTUPNY_PRIECINOK):
+    """
+    Rozdelí platbu, vygeneruje QR kódy a vytvorí PDF (alebo iný formát výstupu) v priecinok_vystupu.
+    Vráti názov súboru alebo None pri chybe.
+    Pri pracovnici > 1 (alebo 0 = všetky jadrá) sa čiastky generujú paralelne.
+    """
+    pool = None
     try:
-        for i, suma in enumerate(ciastocne_sumy):
-            poradie = i + 1
-            poznamka = info_platby['povodna_poznamka']
-            if celkovy_pocet_platieb > 1:
-                dodatok_poznamky = f"(Platba {poradie}/{celkovy_pocet_platieb})"
-                # Pridáme dodatok na začiatok, aby bol vždy viditeľný
-                poznamka = f"{dodatok_poznamky} {poznamka}".strip()
-                # Skrátime poznámku, ak je príliš dlhá pre QR kód (limit je cca 60 znakov)
-                if len(poznamka) > 60:
-                    poznamka = poznamka[:57] + "..."
-
-
-            payload = pay_by_square.generate(
-                iban=info_platby['iban'],
-                amount=round(suma, 2), # Zaokrúhlime sumu na 2 desatinné miesta pre istotu
-                variable_symbol=info_platby['vs'],
-                constant_symbol=info_platby['ks'],
-                note=poznamka,
-                beneficiary_name=info_platby['prijemca']
-            )
-            # Zabezpečíme unikátnosť názvu súboru aj v prípade rýchleho generovania
-            subor_qr_cesta = os.path.join(TEMP_DIR, f"temp_qr_{info_platby['vs']}_{poradie}_{i}.png")
-            vygeneruj_qr_kod(payload, subor_qr_cesta)
-            zoznam_vygenerovaných_platieb.append({
-                'suma': round(suma, 2), # Uložíme zaokrúhlenú sumu
-                'subor_qr': subor_qr_cesta, # Uložíme cestu k súboru
-                'poradie': poradie,
-                'celkovy_pocet': celkovy_pocet_platieb
-            })
-
-        if zoznam_vygenerovaných_platieb:
-            vytvor_pdf_dokument(info_platby, zoznam_vygenerovaných_platieb)
-
-    except pay_by_square.exceptions.InvalidInput as e:
+        pool = vytvor_pool(pracovnici)
+        vystupny_subor = vygeneruj_platbu(info_platby, vektorove_qr=vektorove_qr, pool=pool,
+                                          rozlozenie_strany=rozlozenie_strany, max_stran=max_stran,
+                                          format_vystupu=format_vystupu,
+                                          ciel=vystupy.CielPriecinok(priecinok_vystupu))
+    except OSError as e:
+        print(f"❌ {ANSI_RED}Nepodarilo sa zapísať výstupný súbor: {e}{ANSI_END}")
+        return None
+    except ValueError as e:
         print(f"❌ {ANSI_RED}Chyba pri generovaní PayBySquare dát: {e}{ANSI_END}")
         print(f"   {ANSI_RED}Skontrolujte zadané údaje, najmä IBAN, dĺžku poznámky alebo špeciálne znaky.{ANSI_END}") # Upravené hlásenie
+        return None
     except Exception as e:
         print(f"❌ {ANSI_RED}Vyskytla sa chyba pri generovaní QR/PDF: {e}{ANSI_END}")
-    # finally pre vyčistenie je v hlavnej funkcii
+        return None
+    finally:
+        if pool:
+            pool.shutdown()
+    vypis_uspesne_pdf(vystupny_subor, format_vystupu)
+    return vystupny_subor
+
+# --- DÁVKOVÉ (NEINTERAKTÍVNE) SPRACOVANIE ---
+
+def citaj_manifest(cesta_manifestu):
+    """
+    Postupne (riadok po riadku) číta manifest platieb z CSV alebo JSONL súboru.
+    Vracia dvojice (číslo riadku, záznam). Ak sa riadok JSONL nedá prečítať,
+    namiesto slovníka je záznamom výnimka, aby ju volajúci mohol nahlásiť.
+    """
+    if cesta_manifestu.lower().endswith(('.jsonl', '.json')):
+        with open(cesta_manifestu, 'r', encoding='utf-8-sig') as f:
+            for cislo_riadku, riadok in enumerate(f, start=1):
+                riadok = riadok.strip()
+                if not riadok:
+                    continue
+                try:
+                    zaznam = json.loads(riadok)
+                    if not isinstance(zaznam, dict):
+                        raise ValueError("Riadok JSONL musí byť objekt.")
+                except ValueError as e:
+                    zaznam = e
+                yield cislo_riadku, zaznam
+        return
+
+    with open(cesta_manifestu, 'r', encoding='utf-8-sig', newline='') as f:
+        # Oddeľovač (; , alebo tab) zistíme z hlavičky
+        ukazka = f.readline()
+        f.seek(0)
+        try:
+            oddelovac = csv.Sniffer().sniff(ukazka, delimiters=';,\t').delimiter
+        except csv.Error:
+            oddelovac = ';'
+        citac = csv.DictReader(f, delimiter=oddelovac)
+        citac.fieldnames = [(nazov or '').strip().lower() for nazov in citac.fieldnames or []]
+        for zaznam in citac:
+            # Hlavička je riadok 1, dáta začínajú na riadku 2
+            yield citac.line_num, zaznam
+
+def priprav_platbu_z_manifestu(zaznam, partneri, strategia_delenia=None, limity_bank=None):
+    """
+    Z jedného riadku manifestu zostaví info_platby rovnako ako interaktívne zadanie.
+    Príjemcu určí stĺpec 'partner' (číslo, IBAN alebo presný názov zo súboru partnerov)
+    alebo 'iban' (+ 'prijemca'; ak chýba, doplní sa podľa IBAN-u zo súboru partnerov).
+    Nepovinný stĺpec 'bic' sa pridá do payloadu, 'delenie' prepíše stratégiu delenia pre daný riadok.
+    Pri neplatných údajoch vyhodí ValueError.
+    """
+    def hodnota(stlpec):
+        return str(zaznam.get(stlpec) if zaznam.get(stlpec) is not None else '').strip()
+
+    kluc_partnera = hodnota('partner')
+    iban = hodnota('iban')
+    if kluc_partnera:
+        najdeny = partneri.najdi_partnera(kluc_partnera) if partneri else None
+        if najdeny is None:
+            raise ValueError(f"Neznámy alebo nejednoznačný partner '{kluc_partnera}'.")
+        partner_info = dict(partneri[najdeny], bic=hodnota('bic'))
+    elif iban:
+        iban = kontrola_iban.over_iban(iban)
+        prijemca = hodnota('prijemca')
+        if not prijemca and partneri:
+            najdeny = partneri.podla_ibanu(iban)
+            if najdeny is not None:
+                prijemca = partneri[najdeny]['nazov']
+        partner_info = {"nazov": prijemca, "iban": iban, "bic": hodnota('bic')}
+    else:
+        raise ValueError("Chýba stĺpec 'partner' aj 'iban'.")
+
+    suma = over_sumu(hodnota('suma'))
+    vs = hodnota('vs')
+    if not je_platny_vs(vs):
+        raise ValueError(f"Neplatný VS '{vs}'. Musí obsahovať iba číslice (max 10).")
+    ks = hodnota('ks')
+    if not je_platny_ks(ks):
+        raise ValueError(f"Neplatný KS '{ks}'. Musí obsahovať iba číslice (max 4).")
+
+    strategia = hodnota('delenie') or strategia_delenia
+    if strategia and strategia not in delenie.STRATEGIE:
+        raise ValueError(f"Neznáma stratégia delenia '{strategia}' (možnosti: {', '.join(delenie.STRATEGIE)}).")
+
+    return zostav_info_platby(partner_info, suma, vs, ks, hodnota('poznamka'), strategia, limity_bank)
+
+def _dokonci_riadok_davky(rozpracovany, forma, suhrn, zapisovac, rozlozenie_strany=None,
+                          max_stran=MAX_STRAN_NA_SUBOR, pool=None, format_vystupu='pdf', ciel=None, stav=None):
+    """
+    Dokončí jeden riadok dávky: počká na jeho QR kódy, zapíše výstup (PDF, SVG/PNG, payloady)
+    do cieľa a zaznamená výsledok (aj do stavu behu, ak je zadaný).
+    Riadok bez odoslanej úlohy (veľká platba alebo beh bez poolu) sa generuje priebežne počas kreslenia.
+    Riadok hotový z predchádzajúceho behu sa iba zaznamená ako preskočený.
+    """
+    cislo_riadku, vs, info_platby, uloha, chyba, odtlacok, hotovy = rozpracovany
+    if hotovy is not None:
+        suhrn['preskocene'] += 1
+        hotove_subory = hotovy.get('vystup') or [cesta for cesta, _ in hotovy['subory']]
+        meranie.zaznamenaj('riadok', riadok=cislo_riadku, vs=vs, stav='PRESKOCENE', subory=hotove_subory)
+        if zapisovac:
+            zapisovac.writerow([cislo_riadku, vs, 'PRESKOCENE', ', '.join(hotove_subory)])
+        return
+    zaciatok = time.perf_counter()
+    vystupny_subor = None
+    vsetky_subory = []
+    statistiky = {}
+    if chyba is None:
+        try:
+            if uloha is not None:
+                platby = _vysledok_ulohy(uloha)
+            else:
+                celkovy_pocet_platieb, ciastocne_sumy = rozdel_sumu(info_platby)
+                platby = generuj_ciastkove_platby(info_platby, ciastocne_sumy, celkovy_pocet_platieb, forma, pool)
+            vsetky_subory = zapis_vystup(info_platby, platby, format_vystupu, ciel, rozlozenie_strany, max_stran,
+                                         statistiky)
+            vystupny_subor = ', '.join(statistiky['subory'])
+        except Exception as e:
+            chyba = str(e)
+
+    trvanie = round(time.perf_counter() - zaciatok, 4)
+    if chyba is not None:
+        suhrn['chyby'].append((cislo_riadku, vs, chyba))
+        meranie.pripocitaj('chybne_riadky')
+        meranie.zaznamenaj('riadok', riadok=cislo_riadku, vs=vs, stav='CHYBA', chyba=chyba, trvanie_s=trvanie)
+        if zapisovac:
+            zapisovac.writerow([cislo_riadku, vs, 'CHYBA', chyba])
+        return
+    suhrn['uspesne'] += 1
+    if stav is not None:
+        # Do stavu ide každý súbor (pri SVG/PNG každý kód s veľkosťou), do reportu iba priečinok
+        stav.zapis(_kluc_stavu(info_platby, format_vystupu), odtlacok, vsetky_subory, riadok=cislo_riadku, vs=vs,
+                   vystup=statistiky['subory'])
+    meranie.zaznamenaj('riadok', riadok=cislo_riadku, vs=vs, stav='OK', platieb=statistiky['platieb'],
+                       stran=statistiky['stran'], subory=statistiky['subory'], trvanie_s=trvanie)
+    if zapisovac:
+        zapisovac.writerow([cislo_riadku, vs, 'OK', vystupny_subor])
+
+def _kluc_stavu(info_platby, format_vystupu):
+    """Kľúč platby v stave behu: jej výstup (rovnaký VS prepíše rovnaký súbor)."""
+    return f"{format_vystupu}:{vystupy.zaklad_nazvu(info_platby)}"
+
+def over_manifest(cesta_manifestu, partneri=None, strategia_delenia=None, limity_bank=None):
+    """
+    Overí všetky riadky manifestu (IBAN, sumy, symboly, partnerov) bez generovania QR kódov a PDF.
+    Vráti zoznam chýb [(riadok, vs, popis), ...] v rovnakom tvare ako súhrn dávky.
+    """
+    chyby = []
+    for cislo_riadku, zaznam in citaj_manifest(cesta_manifestu):
+        vs = zaznam.get('vs', '') if isinstance(zaznam, dict) else ''
+        try:
+            if isinstance(zaznam, Exception):
+                raise zaznam
+            priprav_platbu_z_manifestu(zaznam, partneri, strategia_delenia, limity_bank)
+        except Exception as e:
+            chyby.append((cislo_riadku, vs, str(e)))
+    return chyby
+
+def spracuj_davku(cesta_manifestu, partneri=None, cesta_reportu=None, vektorove_qr=False, pracovnici=1,
+                  strategia_delenia=None, limity_bank=None, najprv_overit=False, rozlozenie_strany=None,
+                  max_stran=MAX_STRAN_NA_SUBOR, format_vystupu='pdf', cesta_zip=None, cesta_stavu=None,
+                  vsetko_znova=False, priecinok_vystupu=VYSTUPNY_PRIECINOK):
+    """
+    Neinteraktívne spracuje všetky platby z manifestu (CSV/JSONL), pre každý VS vytvorí PDF
+    (alebo SVG/PNG kódy či payloady podľa format_vystupu) v priecinok_vystupu. Pri cesta_zip
+    idú všetky výstupy dávky do jedného ZIP archívu.
+    Výstupy sa zapisujú atomicky (pozri subory), súbežné dávky s rozdielnymi priečinkami
+    (alebo rôznymi VS) sa teda navzájom neovplyvnia.
+    Pri cesta_stavu sa každá dokončená platba zaznamená do stavu behu (pozri stav_behu)
+    a platby, ktoré sa od predchádzajúceho behu nezmenili, sa preskočia (pri vsetko_znova
+    sa vygenerujú všetky). Prerušený beh tak pokračuje za poslednou dokončenou platbou.
+    Riadky sa spracúvajú postupne, takže pamäť nerastie s veľkosťou manifestu.
+    Pri pracovnici > 1 (alebo 0 = všetky jadrá) sa QR kódy riadkov generujú paralelne
+    v procesoch, PDF však zapisuje hlavný proces v pôvodnom poradí riadkov.
+    Ak je zadaný cesta_reportu, výsledok každého riadku sa priebežne zapisuje do CSV.
+    Pri najprv_overit=True sa celý manifest najskôr overí a ak má chybné riadky,
+    negeneruje sa nič (chyby sa vrátia v súhrne).
+    Vráti súhrn {'uspesne': počet, 'preskocene': počet, 'chyby': [(riadok, vs, popis), ...]}.
+    """
+    if cesta_stavu and cesta_zip:
+        raise ValueError("Stav behu sa nedá kombinovať so ZIP archívom (archív sa pri každom behu vytvára znova).")
+    if partneri is not None and not isinstance(partneri, adresar.RegisterPartnerov):
+        partneri = adresar.RegisterPartnerov(partneri)
+    suhrn = {'uspesne': 0, 'preskocene': 0, 'chyby': []}
+    if najprv_overit:
+        suhrn['chyby'] = over_manifest(cesta_manifestu, partneri, strategia_delenia, limity_bank)
+        if suhrn['chyby']:
+            return suhrn
+    report = None
+    zapisovac = None
+    pool = None
+    ciel = None
+    stav = None
+    forma = forma_qr(format_vystupu, vektorove_qr)
+    # Všetko okrem údajov platby, čo mení výstup; zmena ktoréhokoľvek vygeneruje všetky platby znova
+    nastavenia_vystupu = [format_vystupu, forma, rozlozenie_strany, max_stran, kodovanie_qr.nastavenia(),
+                          fonty.nastavena_cesta_fontu(), os.path.abspath(priecinok_vystupu)]
+    try:
+        if cesta_stavu:
+            stav = stav_behu.StavBehu(cesta_stavu)
+        if cesta_reportu:
+            report = open(cesta_reportu, 'w', encoding='utf-8', newline='')
+            zapisovac = csv.writer(report, delimiter=';')
+            zapisovac.writerow(['riadok', 'vs', 'stav', 'vysledok'])
+        ciel = vystupy.CielZip(cesta_zip) if cesta_zip else vystupy.CielPriecinok(priecinok_vystupu)
+
+        pool = vytvor_pool(pracovnici)
+        # Koľko riadkov môže byť naraz rozpracovaných v procesoch (ohraničuje pamäť)
+        okno = 2 * pocet_pracovnikov(pracovnici) if pool else 0
+        rozpracovane = collections.deque()
+
+        for cislo_riadku, zaznam in citaj_manifest(cesta_manifestu):
+            vs = zaznam.get('vs', '') if isinstance(zaznam, dict) else ''
+            info_platby = uloha = chyba = odtlacok = hotovy = None
+            try:
+                if isinstance(zaznam, Exception):
+                    raise zaznam
+                info_platby = priprav_platbu_z_manifestu(zaznam, partneri, strategia_delenia, limity_bank)
+                if stav is not None:
+                    odtlacok = stav_behu.odtlacok(info_platby, nastavenia_vystupu)
+                    if not vsetko_znova:
+                        hotovy = stav.hotova(_kluc_stavu(info_platby, format_vystupu), odtlacok)
+                # Veľká platba by celá ležala v pamäti procesu, tá sa generuje priebežne až pri kreslení;
+                # nezmenená platba z predchádzajúceho behu (hotovy) sa negeneruje vôbec
+                if (hotovy is None and pool
+                        and rozdel_sumu(info_platby)[0] <= VELKOST_BALIKA_PRE_PROCES * MAX_BALIKOV_V_POOLE):
+                    uloha = pool.submit(spusti_s_meranim, _vygeneruj_platby_riadku, info_platby, forma)
+            except Exception as e:
+                chyba = str(e)
+            rozpracovane.append((cislo_riadku, vs, info_platby, uloha, chyba, odtlacok, hotovy))
+            while len(rozpracovane) > okno:
+                _dokonci_riadok_davky(rozpracovane.popleft(), forma, suhrn, zapisovac, rozlozenie_strany, max_stran, pool,
+                                      format_vystupu, ciel, stav)
+
+        while rozpracovane:
+            _dokonci_riadok_davky(rozpracovane.popleft(), forma, suhrn, zapisovac, rozlozenie_strany, max_stran, pool,
+                                  format_vystupu, ciel, stav)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        if stav:
+            stav.zatvor()
+        if ciel:
+            ciel.zatvor()
+        if report:
+            report.close()
+    return suhrn
+
+# --- OVERENIE VYGENEROVANÝCH PLATIEB ---
+
+MAX_ROZDIELOV_RIADKU = 20 # Viac rozdielov jedného riadku sa v reporte iba spočíta
+
+def _payloady_z_vystupu(info_platby, format_vystupu='pdf', priecinok=VYSTUPNY_PRIECINOK):
+    """
+    Vráti trojice (poradie, payload, chyba) pre čiastky platby prečítané z výstupu:
+    z JSONL payloadov, alebo z QR kódov dekódovaných zo SVG/PNG súborov či z PDF
+    (vektorové aj rastrové kódy, pri rozdelenom PDF zo všetkých častí v poradí).
+    Chýbajúci výstup vyhodí OSError.
+    """
+    zaklad = vystupy.zaklad_nazvu(info_platby)
+    if format_vystupu == 'payload':
+        with open(os.path.join(priecinok, f"{zaklad}.jsonl"), 'r', encoding='utf-8') as f:
+            for riadok in f:
+                if riadok.strip():
+                    zaznam = json.loads(riadok)
+                    yield zaznam['poradie'], zaznam['payload'], None
+        return
+    if format_vystupu in ('svg', 'png'):
+        from PIL import Image
+        priecinok_kodov = os.path.join(priecinok, zaklad)
+        for nazov in sorted(os.listdir(priecinok_kodov)):
+            poradie = nazov[len(zaklad) + 1:-len(format_vystupu) - 1]
+            if not (nazov.startswith(f"{zaklad}_") and nazov.endswith(f".{format_vystupu}") and poradie.isdigit()):
+                continue
+            with open(os.path.join(priecinok_kodov, nazov), 'rb') as f:
+                data = f.read()
+            try:
+                if format_vystupu == 'svg':
+                    matica = overenie.matica_zo_svg(data.decode('utf-8'))
+                else:
+                    matica = overenie.matica_z_obrazka(Image.open(io.BytesIO(data)))
+                yield int(poradie), overenie.dekoduj_maticu(matica), None
+            except ValueError as e:
+                yield int(poradie), None, f"QR kód sa nedá prečítať: {e}"
+        return
+    poradie = 0
+    for cesta in _subory_pdf(os.path.join(priecinok, f"{zaklad}.pdf")):
+        with open(cesta, 'rb') as f:
+            data = f.read()
+        try:
+            for matica in overenie.matice_z_pdf(data):
+                poradie += 1
+                try:
+                    yield poradie, overenie.dekoduj_maticu(matica), None
+                except ValueError as e:
+                    yield poradie, None, f"QR kód v '{cesta}' sa nedá prečítať: {e}"
+        except ValueError as e:
+            yield poradie + 1, None, f"PDF '{cesta}' sa nedá prečítať: {e}"
+            return
+
+def _subory_pdf(cesta):
+    """
+    PDF platby: súbor, alebo všetky jeho časti '<názov>_cast<i>.pdf' v poradí (pozri _nazov_casti).
+    Ak neexistuje ani súbor, ani prvá časť, vyhodí FileNotFoundError.
+    """
+    if os.path.exists(cesta) or not os.path.exists(_nazov_casti(cesta, 1, 2)):
+        return [cesta]
+    casti = []
+    while os.path.exists(_nazov_casti(cesta, len(casti) + 1, 2)):
+        casti.append(_nazov_casti(cesta, len(casti) + 1, 2))
+    return casti
+
+def over_platbu(info_platby, format_vystupu='pdf', priecinok=VYSTUPNY_PRIECINOK):
+    """
+    Dekóduje payload každej čiastky z výstupu platby (pozri _payloady_z_vystupu), porovná
+    IBAN, BIC, sumu, menu, VS, KS, poznámku a príjemcu s očakávanými hodnotami a súčet
+    čiastok s celkovou sumou. Je na úrovni modulu, aby sa dala spustiť v procese poolu.
+    Vráti {'ciastok', 'ocakavanych', 'sucet', 'rozdiely': [popis, ...]}.
+    """
+    with meranie.meraj('overenie'):
+        celkovy_pocet_platieb, ciastocne_sumy = rozdel_sumu(info_platby)
+        ciastocne_sumy = list(ciastocne_sumy)
+        rozdiely = []
+        sucet = Decimal('0')
+        najdene = set()
+        try:
+            for poradie, payload, chyba in _payloady_z_vystupu(info_platby, format_vystupu, priecinok):
+                if chyba is None:
+                    try:
+                        dekodovane = overenie.dekoduj_payload(payload)
+                    except ValueError as e:
+                        chyba = str(e)
+                if chyba is not None:
+                    rozdiely.append(f"Čiastka {poradie}: {chyba}")
+                    continue
+                sucet += dekodovane['suma']
+                if not 1 <= poradie <= celkovy_pocet_platieb or poradie in najdene:
+                    rozdiely.append(f"Čiastka {poradie}: nadbytočná (platba má {celkovy_pocet_platieb} čiastok).")
+                    continue
+                najdene.add(poradie)
+                ocakavane = {
+                    'iban': info_platby['iban'], 'bic': info_platby['bic'], 'mena': 'EUR',
+                    'suma': ciastocne_sumy[poradie - 1], 'vs': info_platby['vs'], 'ks': info_platby['ks'],
+                    'poznamka': poznamka_ciastky(info_platby, poradie, celkovy_pocet_platieb),
+                    'prijemca': info_platby['prijemca'],
+                }
+                rozdiely.extend(f"Čiastka {poradie}: {rozdiel}" for rozdiel in overenie.porovnaj(dekodovane, ocakavane))
+        except OSError as e:
+            return {'ciastok': 0, 'ocakavanych': celkovy_pocet_platieb, 'sucet': sucet,
+                    'rozdiely': [f"Výstup sa nedá prečítať: {e}"]}
+        except ValueError as e:
+            rozdiely.append(f"Výstup sa nedá prečítať: {e}")
+
+        chybajuce = [poradie for poradie in range(1, celkovy_pocet_platieb + 1) if poradie not in najdene]
+        if chybajuce:
+            ukazka = ', '.join(map(str, chybajuce[:10])) + (', ...' if len(chybajuce) > 10 else '')
+            rozdiely.append(f"Chýba {len(chybajuce)} z {celkovy_pocet_platieb} čiastok ({ukazka}).")
+        if sucet != info_platby['celkova_suma']:
+            rozdiely.append(f"Súčet čiastok {sucet:.2f} nesedí s celkovou sumou {info_platby['celkova_suma']:.2f}.")
+        if len(rozdiely) > MAX_ROZDIELOV_RIADKU:
+            rozdiely[MAX_ROZDIELOV_RIADKU:] = [f"... a ďalších {len(rozdiely) - MAX_ROZDIELOV_RIADKU} rozdielov."]
+        meranie.pripocitaj('overene_ciastky', len(najdene))
+        return {'ciastok': len(najdene), 'ocakavanych': celkovy_pocet_platieb, 'sucet': sucet, 'rozdiely': rozdiely}
+
+def _dokonci_overenie_riadku(rozpracovany, suhrn, zapisovac, format_vystupu='pdf', priecinok=VYSTUPNY_PRIECINOK):
+    """
+    Dokončí overenie riadku manifestu (počká na úlohu v poole, bez poolu overí tu)
+    a zapíše výsledok do súhrnu a reportu.
+    """
+    cislo_riadku, vs, info_platby, uloha, chyba = rozpracovany
+    vysledok = None
+    if chyba is None:
+        vysledok = _vysledok_ulohy(uloha) if uloha is not None else over_platbu(info_platby, format_vystupu, priecinok)
+        if vysledok['rozdiely']:
+            chyba = ' '.join(vysledok['rozdiely'])
+    if vysledok is not None:
+        suhrn['ciastok'] += vysledok['ciastok']
+        suhrn['sucet'] += vysledok['sucet']
+    stav = 'OK' if chyba is None else ('NEZHODA' if vysledok is not None else 'CHYBA')
+    if chyba is None:
+        suhrn['uspesne'] += 1
+    else:
+        suhrn['chyby'].append((cislo_riadku, vs, chyba))
+    meranie.zaznamenaj('overenie', riadok=cislo_riadku, vs=vs, stav=stav, chyba=chyba,
+                       ciastok=vysledok and vysledok['ciastok'], sucet=vysledok and vysledok['sucet'])
+    if zapisovac:
+        zapisovac.writerow([cislo_riadku, vs, stav, info_platby['celkova_suma'] if info_platby else '',
+                            vysledok['sucet'] if vysledok else '', vysledok['ciastok'] if vysledok else '',
+                            chyba or ''])
+
+def over_davku(cesta_manifestu, partneri=None, cesta_reportu=None, format_vystupu='pdf', priecinok=VYSTUPNY_PRIECINOK, pracovnici=1,
+               strategia_delenia=None, limity_bank=None):
+    """
+    Overí výstupy dávky: pre každý riadok manifestu dekóduje payloady všetkých čiastok
+    z vytvorených súborov (pozri over_platbu) a porovná ich s manifestom.
+    Pri pracovnici > 1 (alebo 0 = všetky jadrá) sa riadky overujú paralelne v procesoch.
+    Ak je zadaný cesta_reportu, zapíše sa CSV so súčtom čiastok voči celkovej sume pre každý riadok.
+    Vráti súhrn {'uspesne', 'chyby': [(riadok, vs, popis), ...], 'ciastok', 'sucet'}.
+    """
+    if partneri is not None and not isinstance(partneri, adresar.RegisterPartnerov):
+        partneri = adresar.RegisterPartnerov(partneri)
+    suhrn = {'uspesne': 0, 'chyby': [], 'ciastok': 0, 'sucet': Decimal('0')}
+    report = None
+    zapisovac = None
+    pool = None
+    try:
+        if cesta_reportu:
+            report = open(cesta_reportu, 'w', encoding='utf-8', newline='')
+            zapisovac = csv.writer(report, delimiter=';')
+            zapisovac.writerow(['riadok', 'vs', 'stav', 'celkova_suma', 'sucet_ciastok', 'ciastok', 'rozdiely'])
+        pool = vytvor_pool(pracovnici)
+        okno = 2 * pocet_pracovnikov(pracovnici) if pool else 0
+        rozpracovane = collections.deque()
+        for cislo_riadku, zaznam in citaj_manifest(cesta_manifestu):
+            vs = zaznam.get('vs', '') if isinstance(zaznam, dict) else ''
+            info_platby = uloha = chyba = None
+            try:
+                if isinstance(zaznam, Exception):
+                    raise zaznam
+                info_platby = priprav_platbu_z_manifestu(zaznam, partneri, strategia_delenia, limity_bank)
+                if pool:
+                    uloha = pool.submit(spusti_s_meranim, over_platbu, info_platby, format_vystupu, priecinok)
+            except Exception as e:
+                chyba = str(e)
+            rozpracovane.append((cislo_riadku, vs, info_platby, uloha, chyba))
+            while len(rozpracovane) > okno:
+                _dokonci_overenie_riadku(rozpracovane.popleft(), suhrn, zapisovac, format_vystupu, priecinok)
+        while rozpracovane:
+            _dokonci_overenie_riadku(rozpracovane.popleft(), suhrn, zapisovac, format_vystupu, priecinok)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        if report:
+            report.close()
+    return suhrn
+
+def vypis_suhrn_overenia(suhrn):
+    """Vypíše výsledok overenia výstupov dávky."""
+    print(f"\n{ANSI_BOLD}--- Výsledok overenia ---{ANSI_END}")
+    print(f"✅ {ANSI_GREEN}Platby zhodné s manifestom: {suhrn['uspesne']}{ANSI_END} "
+          f"({suhrn['ciastok']} dekódovaných QR kódov, spolu {suhrn['sucet']:.2f} EUR)")
+    if suhrn['chyby']:
+        print(f"❌ {ANSI_RED}Nezhody a chyby: {len(suhrn['chyby'])}{ANSI_END}")
+        for cislo_riadku, vs, popis in suhrn['chyby']:
+            print(f"   {ANSI_RED}Riadok {cislo_riadku} (VS {vs or '-'}): {popis}{ANSI_END}")
+
+def vypis_statistiky_cache():
+    """Vypíše počítadlá cache hlavného procesu (procesy poolu majú vlastné)."""
+    for nazov, stat in cache.statistiky().items():
+        zasahy = stat['zasahy_pamat'] + stat['zasahy_disk']
+        spolu = zasahy + stat['minutia']
+        if spolu:
+            print(f"ℹ️ {ANSI_BLUE}Cache {nazov}: {zasahy}/{spolu} zásahov "
+                  f"(pamäť {stat['zasahy_pamat']}, disk {stat['zasahy_disk']}){ANSI_END}")
+
+def vypis_merania():
+    """Vypíše namerané časy etáp (od najdrahšej) a počítadlá."""
+    namerane = meranie.suhrn()
+    print(f"\n{ANSI_BOLD}--- Časy etáp ---{ANSI_END}")
+    for nazov, etapa in sorted(namerane['etapy'].items(), key=lambda polozka: -polozka[1]['spolu_ms']):
+        print(f"  {nazov:<15} {etapa['spolu_ms'] / 1000:9.3f} s  {etapa['pocet']:8d}×  "
+              f"priemer {etapa['priemer_ms']:8.3f} ms  max {etapa['max_ms']:8.3f} ms")
+    for nazov, hodnota in namerane['pocitadla'].items():
+        print(f"  {ANSI_BLUE}{nazov}: {hodnota}{ANSI_END}")
+
+def vypis_suhrn_davky(suhrn):
+    """Vypíše výsledok dávkového spracovania."""
+    print(f"\n{ANSI_BOLD}--- Výsledok dávky ---{ANSI_END}")
+    print(f"✅ {ANSI_GREEN}Úspešne spracované: {suhrn['uspesne']}{ANSI_END}")
+    if suhrn.get('preskocene'):
+        print(f"⏭️ {ANSI_BLUE}Preskočené (bez zmeny od predchádzajúceho behu): {suhrn['preskocene']}{ANSI_END}")
+    if suhrn['chyby']:
+        print(f"❌ {ANSI_RED}Chybné riadky: {len(suhrn['chyby'])}{ANSI_END}")
+        for cislo_riadku, vs, popis in suhrn['chyby']:
+            print(f"   {ANSI_RED}Riadok {cislo_riadku} (VS {vs or '-'}): {popis}{ANSI_END}")
+
+def vypis_partnera(kluc, partner):
+    """Vypíše jeden riadok menu s partnerom."""
+    if partner:
+        print(f"  [{ANSI_CYAN}{kluc}{ANSI_END}]: {partner.get('nazov', 'N/A')} ({partner.get('iban', 'N/A')})")
+    else:
+        print(f"  [{ANSI_CYAN}{kluc}{ANSI_END}]: {ANSI_RED}Chybné dáta partnera{ANSI_END}")
 
 def vyber_partnera_menu(partneri, aktualna_cesta):
-    """Zobrazí menu pre výber partnera a vráti voľbu."""
+    """
+    Zobrazí menu pre výber partnera a vráti voľbu.
+    Partnera je možné vybrať číslom, IBAN-om alebo názvom; časť názvu zobrazí nájdených partnerov.
+    Pri veľkom počte partnerov sa celý zoznam nevypisuje.
+    """
+    najdeni = None
     while True:
         print(f"\n{ANSI_BOLD}--- Hlavné Menu ---{ANSI_END}")
         if aktualna_cesta:
@@ -440,34 +1275,37 @@ def vyber_partnera_menu(partneri, aktualna_cesta):
 
         if partneri:
             print(f"{ANSI_BOLD}Komu chcete zaplatiť?{ANSI_END}")
-            # Zoradíme partnerov podľa kľúča (čísla) pre konzistentné zobrazenie
-            try:
-                for key in sorted(partneri.keys(), key=int):
-                    value = partneri.get(key) # Použijeme .get pre bezpečnosť
-                    if value:
-                        print(f"  [{ANSI_CYAN}{key}{ANSI_END}]: {value.get('nazov', 'N/A')} ({value.get('iban', 'N/A')})")
-                    else:
-                        print(f"  [{ANSI_CYAN}{key}{ANSI_END}]: {ANSI_RED}Chybné dáta partnera{ANSI_END}")
-                max_partner_num = max(int(k) for k in partneri.keys()) if partneri else 0
-                prompt_text = f"\nVyberte možnosť ({ANSI_CYAN}0, q, alebo 1-{max_partner_num}{ANSI_END}): "
-            except ValueError:
-                print(f"❌ {ANSI_RED}Chyba: Kľúče partnerov nie sú čísla. Skontrolujte formát súboru.{ANSI_END}")
-                prompt_text = f"\nVyberte možnosť ({ANSI_CYAN}0 alebo q{ANSI_END}): "
-                partneri = {} # Resetneme partnerov, aby sa vynútilo nové načítanie
+            if najdeni is not None:
+                print(f"Nájdení partneri ({len(najdeni)}):")
+                for kluc in najdeni:
+                    vypis_partnera(kluc, partneri.get(kluc))
+            elif len(partneri) <= MAX_ZOBRAZENYCH_PARTNEROV:
+                # Register iteruje partnerov v poradí čísel
+                for kluc in partneri:
+                    vypis_partnera(kluc, partneri.get(kluc))
+            else:
+                print(f"  V súbore je {ANSI_YELLOW}{len(partneri)}{ANSI_END} partnerov – zadajte číslo, IBAN alebo časť názvu.")
+            prompt_text = f"\nVyberte možnosť ({ANSI_CYAN}0, q, číslo, IBAN alebo názov partnera{ANSI_END}): "
         else:
              prompt_text = f"\nVyberte možnosť ({ANSI_CYAN}0 alebo q{ANSI_END}): "
 
 
-        vyber = input(prompt_text).lower().strip()
+        vyber = input(prompt_text).strip()
+        najdeni = None
 
-        if vyber == 'q':
+        if vyber.lower() == 'q':
             return "UKONCIT", None
         if vyber == '0':
             return "ZMENIT_SUBOR", None
-        if partneri and vyber in partneri:
-            return "PARTNER_VYBRANY", partneri[vyber]
-        else:
-            print(f"❌ {ANSI_RED}Neplatný výber, skúste to znova.{ANSI_END}")
+        if partneri and vyber:
+            kluc = partneri.najdi_partnera(vyber)
+            if kluc is not None:
+                return "PARTNER_VYBRANY", partneri[kluc]
+            najdeni = partneri.hladaj(vyber)
+            if najdeni:
+                continue
+            najdeni = None
+        print(f"❌ {ANSI_RED}Neplatný výber, skúste to znova.{ANSI_END}")
 
 # --- HLAVNÁ ČASŤ PROGRAMU ---
 def main():
@@ -481,14 +1319,31 @@ def main():
 {ANSI_CYAN}{ANSI_BOLD}█████
 """)
     #{ANSI_END}
-    vycisti_temp_priecinok() # Vyčistíme prípadné zvyšky z minulého behu
+    config = nacitaj_config()
+    fonty.nastav_cestu_fontu(config.get('cesta_font'))
+    meranie.nastav_zaznamy(config.get('subor_metrik'))
+    if config.get('predohriatie', True):
+        predohrej()  # Knižnice sa načítajú, kým sa čaká na používateľa
+    try:
+        rozlozenie_strany = zostav_rozlozenie(config)
+    except ValueError as e:
+        print(f"⚠️ {ANSI_YELLOW}Varovanie: {e} Použije sa predvolené rozloženie.{ANSI_END}")
+        rozlozenie_strany = None
+    try:
+        kodovanie_qr.nastav(zostav_nastavenia_qr(config))
+    except ValueError as e:
+        print(f"⚠️ {ANSI_YELLOW}Varovanie: {e} Použijú sa predvolené nastavenia QR kódu.{ANSI_END}")
+    format_vystupu = config.get('format_vystupu') or 'pdf'
+    if format_vystupu not in vystupy.FORMATY:
+        print(f"⚠️ {ANSI_YELLOW}Varovanie: Neznámy formát výstupu '{format_vystupu}', použije sa PDF.{ANSI_END}")
+        format_vystupu = 'pdf'
 
     cesta_suboru = nacitaj_cestu_k_partnerom()
     partneri = None
 
     if cesta_suboru and os.path.exists(cesta_suboru):
         print(f"Načítavam partnerov z uloženej cesty: {ANSI_YELLOW}{cesta_suboru}{ANSI_END}")
-        partneri = nacitaj_partnerov_zo_suboru(cesta_suboru)
+        partneri = adresar.nacitaj_register(cesta_suboru)
         if not partneri:
             print(f"{ANSI_YELLOW}Nepodarilo sa načítať partnerov z uloženej cesty. Požiadam o novú cestu.{ANSI_END}")
             cesta_suboru = None # Resetujeme cestu, aby sa pýtala nová
@@ -517,16 +1372,232 @@ def main():
 
         elif akcia == "PARTNER_VYBRANY":
             vybrany_partner = data
-            info_platby = ziskaj_detaily_platby(vybrany_partner)
+            info_platby = ziskaj_detaily_platby(vybrany_partner, config.get('strategia_delenia'), config.get('limity_bank'))
 
             if info_platby:
-                spracuj_platbu(info_platby)
+                spracuj_platbu(info_platby, rozlozenie_strany=rozlozenie_strany,
+                               max_stran=config.get('max_stran_na_subor', MAX_STRAN_NA_SUBOR),
+                               format_vystupu=format_vystupu,
+                               priecinok_vystupu=config.get('vystupny_priecinok') or VYSTUPNY_PRIECINOK)
                 print(f"\nStlačte {ANSI_CYAN}Enter{ANSI_END} pre návrat do hlavného menu...")
                 input() # Pauza, kým sa užívateľ nevráti do menu
             else:
                 print(f"{ANSI_YELLOW}Zadávanie platby bolo zrušené, návrat do hlavného menu.{ANSI_END}")
 
+# --- PRÍKAZOVÝ RIADOK ---
+
+def zostav_rozlozenie(config, nazov=None, format_strany=None, mriezka=None):
+    """
+    Rozloženie strany z argumentov, inak z config.json ('rozlozenie', 'format_strany', 'mriezka').
+    Pri neplatných hodnotách vyhodí ValueError.
+    """
+    mriezka = mriezka or config.get('mriezka')
+    stlpce, riadky = rozlozenie.parsuj_mriezku(mriezka) if mriezka else (None, None)
+    return rozlozenie.vytvor_rozlozenie(nazov or config.get('rozlozenie') or 'riadky',
+                                        format_strany or config.get('format_strany') or 'A4',
+                                        stlpce, riadky)
+
+def zostav_nastavenia_qr(config, korekcia=None, verzia=None, maska=None, velkost_modulu=None):
+    """
+    Nastavenia QR kódovania z argumentov, inak z config.json ('qr_korekcia', 'qr_verzia',
+    'qr_maska', 'qr_velkost_modulu'). Pri neplatných hodnotách vyhodí ValueError.
+    """
+    predvolene = kodovanie_qr.PREDVOLENE
+    return kodovanie_qr.vytvor_nastavenia(
+        korekcia or config.get('qr_korekcia') or predvolene.korekcia,
+        verzia or config.get('qr_verzia') or predvolene.verzia,
+        maska or config.get('qr_maska') or predvolene.maska,
+        velkost_modulu or config.get('qr_velkost_modulu') or predvolene.velkost_modulu)
+
+def _pridaj_argumenty_qr(parser):
+    parser.add_argument("--qr-korekcia", choices=list(kodovanie_qr.UROVNE_KOREKCIE),
+                        help="Úroveň opravy chýb QR kódu (predvolene 'qr_korekcia' z config.json alebo M).")
+    parser.add_argument("--qr-verzia", type=int, metavar="1-40",
+                        help="Najmenšia verzia QR kódu, napr. aby mali všetky kódy rovnaký počet modulov "
+                             "(predvolene najmenšia, do ktorej sa payload zmestí).")
+    parser.add_argument("--qr-maska", choices=kodovanie_qr.MASKY,
+                        help="Výber masky: 'rychla' (predvolene), 'auto' (všetkých 8 ako qrcode.make) alebo pevná 0-7.")
+    parser.add_argument("--qr-modul", type=int, metavar="PX",
+                        help="Veľkosť modulu v PNG/rastrovom QR kóde v pixeloch (predvolene 10).")
+
+def _pridaj_argumenty_rozlozenia(parser):
+    parser.add_argument("--rozlozenie", choices=rozlozenie.STYLY,
+                        help="Rozloženie platieb na strane (predvolene 'rozlozenie' z config.json alebo 'riadky').")
+    parser.add_argument("--strana", choices=list(rozlozenie.FORMATY_STRAN),
+                        help="Formát strany PDF (predvolene 'format_strany' z config.json alebo A4).")
+    parser.add_argument("--mriezka", metavar="STLPCExRIADKY",
+                        help="Rozmery mriežky pre --rozlozenie mriezka, napr. 4x6 (predvolene čo najviac čitateľných kódov).")
+
+def _pridaj_argumenty_merania(parser):
+    parser.add_argument("--metriky", metavar="SUBOR",
+                        help="JSONL súbor, kam sa zapisujú záznamy o behu a časy etáp "
+                             "(predvolene 'subor_metrik' z config.json).")
+
+def spusti_prikazovy_riadok(argumenty):
+    """Spracuje argumenty príkazového riadku (neinteraktívne režimy). Vráti návratový kód."""
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Generátor QR kódov Pay by Square. Bez argumentov sa spustí interaktívne menu."
+    )
+    podprikazy = parser.add_subparsers(dest="prikaz", required=True)
+
+    davka = podprikazy.add_parser("davka", help="Vygeneruje PDF pre všetky platby z manifestu (CSV/JSONL) bez otázok.")
+    davka.add_argument("manifest", help="CSV alebo JSONL so stĺpcami partner/iban, prijemca, suma, vs, ks, poznamka.")
+    davka.add_argument("--partneri", help="Súbor s partnermi (predvolene posledne uložená cesta z config.json).")
+    davka.add_argument("--report", help="CSV súbor, kam sa zapíše výsledok pre každý riadok manifestu.")
+    davka.add_argument("--vektorove-qr", action="store_true", help="QR kódy kresliť ako vektory (menšie PDF, ostrá tlač).")
+    davka.add_argument("--format", choices=vystupy.FORMATY,
+                       help="Výstup: pdf (predvolene 'format_vystupu' z config.json alebo pdf), svg/png (súbor pre každý "
+                            "QR kód) alebo payload (iba payloady v JSONL, bez kreslenia).")
+    davka.add_argument("--priecinok", metavar="PRIECINOK",
+                       help="Priečinok pre výstupy (predvolene 'vystupny_priecinok' z config.json alebo aktuálny).")
+    davka.add_argument("--zip", metavar="SUBOR.zip",
+                       help="Všetky výstupy dávky zapísať do jedného ZIP archívu namiesto samostatných súborov.")
+    davka.add_argument("--stav-behu", metavar="SUBOR.jsonl",
+                       help="Záznam hotových platieb: ďalší beh preskočí nezmenené platby a po prerušení pokračuje "
+                            "za poslednou dokončenou.")
+    davka.add_argument("--vsetko-znova", action="store_true",
+                       help="So --stav-behu vygenerovať všetky platby znova (záznam sa aktualizuje).")
+    davka.add_argument("--delenie", choices=delenie.STRATEGIE,
+                       help="Stratégia delenia súm nad limit (predvolene 'strategia_delenia' z config.json alebo 'strop').")
+    davka.add_argument("--cache", metavar="PRIECINOK",
+                       help="Priečinok pre cache payloadov a QR kódov na disku (predvolene 'cache_priecinok' z config.json).")
+    davka.add_argument("--font", help="Vlastný TTF font pre PDF (predvolene assets/arial.ttf alebo 'cesta_font' z config.json).")
+    davka.add_argument("--pracovnici", type=int, default=1, metavar="N",
+                       help="Počet procesov pre generovanie QR kódov (0 = všetky jadrá, predvolene 1).")
+    _pridaj_argumenty_rozlozenia(davka)
+    _pridaj_argumenty_qr(davka)
+    davka.add_argument("--max-stran", type=int, metavar="N",
+                       help=f"PDF s viac stranami sa rozdelí na časti (0 = nedeliť, predvolene 'max_stran_na_subor' "
+                            f"z config.json alebo {MAX_STRAN_NA_SUBOR}).")
+    davka.add_argument("--kontrola", action="store_true",
+                       help="Iba overí manifest (IBAN-y, sumy, symboly), nič negeneruje.")
+    davka.add_argument("--prisne", action="store_true",
+                       help="Najskôr overí celý manifest a pri akejkoľvek chybe nevytvorí žiadne PDF.")
+    _pridaj_argumenty_merania(davka)
+    davka.add_argument("--profil", "--profile", nargs='?', const='', metavar="SUBOR.prof",
+                       help="Spustí dávku pod cProfile a tracemalloc a vypíše najdrahšie funkcie a alokácie "
+                            "(voliteľne uloží profil do súboru). Procesy poolu sa neprofilujú.")
+
+    over = podprikazy.add_parser("over", help="Overí výstupy dávky: dekóduje payload každého QR kódu a porovná ho s manifestom.")
+    over.add_argument("manifest", help="Manifest, z ktorého bola dávka vygenerovaná (CSV/JSONL).")
+    over.add_argument("--partneri", help="Súbor s partnermi (predvolene posledne uložená cesta z config.json).")
+    over.add_argument("--report", help="CSV súbor so súčtom čiastok voči celkovej sume a rozdielmi pre každý riadok.")
+    over.add_argument("--format", choices=vystupy.FORMATY,
+                      help="Formát overovaných výstupov (predvolene 'format_vystupu' z config.json alebo pdf). "
+                           "QR kódy sa dekódujú z PDF (aj rozdeleného na časti) a zo SVG/PNG, payloady z JSONL.")
+    over.add_argument("--priecinok", help="Priečinok s výstupmi dávky (predvolene 'vystupny_priecinok' z config.json "
+                                           "alebo aktuálny).")
+    over.add_argument("--delenie", choices=delenie.STRATEGIE,
+                      help="Stratégia delenia použitá pri generovaní (predvolene 'strategia_delenia' z config.json).")
+    over.add_argument("--pracovnici", type=int, default=1, metavar="N",
+                      help="Počet procesov pre overovanie (0 = všetky jadrá, predvolene 1).")
+    _pridaj_argumenty_merania(over)
+
+    sluzba = podprikazy.add_parser("server", help="Spustí lokálnu HTTP službu, ktorá vracia PDF/PNG/SVG na požiadanie.")
+    sluzba.add_argument("--host", default="127.0.0.1", help="Adresa, na ktorej služba počúva (predvolene 127.0.0.1).")
+    sluzba.add_argument("--port", type=int, default=8080, help="Port služby (predvolene 8080).")
+    sluzba.add_argument("--partneri", help="Súbor s partnermi (predvolene posledne uložená cesta z config.json).")
+    sluzba.add_argument("--delenie", choices=delenie.STRATEGIE,
+                        help="Stratégia delenia súm nad limit (predvolene 'strategia_delenia' z config.json alebo 'strop').")
+    sluzba.add_argument("--cache", metavar="PRIECINOK",
+                        help="Priečinok pre cache payloadov a QR kódov na disku (predvolene 'cache_priecinok' z config.json).")
+    sluzba.add_argument("--font", help="Vlastný TTF font pre PDF (predvolene assets/arial.ttf alebo 'cesta_font' z config.json).")
+    sluzba.add_argument("--pracovnici", type=int, default=1, metavar="N",
+                        help="Počet procesov pre renderovanie (0 = všetky jadrá, predvolene 1 = vlákno v službe).")
+    _pridaj_argumenty_rozlozenia(sluzba)
+    _pridaj_argumenty_qr(sluzba)
+    _pridaj_argumenty_merania(sluzba)
+
+    args = parser.parse_args(argumenty)
+    colorama.init(autoreset=True)
+    config = nacitaj_config()
+    meranie.nastav_zaznamy(args.metriky or config.get('subor_metrik'))
+    if args.prikaz == "over":
+        cesta_partnerov = args.partneri or nacitaj_cestu_k_partnerom()
+        partneri = adresar.nacitaj_register(cesta_partnerov) if cesta_partnerov else None
+        try:
+            suhrn = over_davku(args.manifest, partneri, args.report, args.format or config.get('format_vystupu') or 'pdf',
+                               args.priecinok or config.get('vystupny_priecinok') or VYSTUPNY_PRIECINOK,
+                               args.pracovnici, args.delenie or config.get('strategia_delenia'),
+                               config.get('limity_bank'))
+        except OSError as e:
+            print(f"❌ {ANSI_RED}Manifest alebo report sa nepodarilo otvoriť: {e}{ANSI_END}")
+            return 2
+        vypis_suhrn_overenia(suhrn)
+        return 1 if suhrn['chyby'] else 0
+    fonty.nastav_cestu_fontu(args.font or config.get('cesta_font'))
+    priecinok_cache = getattr(args, 'cache', None) or config.get('cache_priecinok')
+    if priecinok_cache:
+        cache.nastav_disk(priecinok_cache, config.get('cache_max_mb', cache.PREDVOLENA_VELKOST_DISKU_MB))
+    try:
+        rozlozenie_strany = zostav_rozlozenie(config, args.rozlozenie, args.strana, args.mriezka)
+        kodovanie_qr.nastav(zostav_nastavenia_qr(config, args.qr_korekcia, args.qr_verzia, args.qr_maska, args.qr_modul))
+    except ValueError as e:
+        print(f"❌ {ANSI_RED}{e}{ANSI_END}")
+        return 2
+
+    if args.prikaz == "davka":
+        partneri = None
+        cesta_partnerov = args.partneri or nacitaj_cestu_k_partnerom()
+        if cesta_partnerov:
+            partneri = adresar.nacitaj_register(cesta_partnerov)
+        strategia_delenia = args.delenie or config.get('strategia_delenia')
+        try:
+            if args.kontrola:
+                chyby = over_manifest(args.manifest, partneri, strategia_delenia, config.get('limity_bank'))
+                if not chyby:
+                    print(f"✅ {ANSI_GREEN}Manifest je v poriadku, všetky riadky prešli kontrolou.{ANSI_END}")
+                    return 0
+                vypis_suhrn_davky({'uspesne': 0, 'chyby': chyby})
+                return 1
+            zaciatok = time.perf_counter()
+            with meranie.profiluj(args.profil or None) if args.profil is not None else contextlib.nullcontext():
+                suhrn = spracuj_davku(args.manifest, partneri, args.report,
+                                      vektorove_qr=args.vektorove_qr, pracovnici=args.pracovnici,
+                                      strategia_delenia=strategia_delenia,
+                                      limity_bank=config.get('limity_bank'),
+                                      najprv_overit=args.prisne,
+                                      rozlozenie_strany=rozlozenie_strany,
+                                      max_stran=args.max_stran if args.max_stran is not None
+                                      else config.get('max_stran_na_subor', MAX_STRAN_NA_SUBOR),
+                                      format_vystupu=args.format or config.get('format_vystupu') or 'pdf',
+                                      cesta_zip=args.zip, cesta_stavu=args.stav_behu,
+                                      vsetko_znova=args.vsetko_znova,
+                                      priecinok_vystupu=args.priecinok or config.get('vystupny_priecinok')
+                                      or VYSTUPNY_PRIECINOK)
+        except OSError as e:
+            print(f"❌ {ANSI_RED}Manifest, report, ZIP archív alebo stav behu sa nepodarilo otvoriť: {e}{ANSI_END}")
+            return 2
+        except ValueError as e:
+            print(f"❌ {ANSI_RED}{e}{ANSI_END}")
+            return 2
+        meranie.zaznamenaj('davka', manifest=args.manifest, uspesne=suhrn['uspesne'], preskocene=suhrn['preskocene'],
+                           chybne=len(suhrn['chyby']),
+                           trvanie_s=round(time.perf_counter() - zaciatok, 4), cache=cache.statistiky(),
+                           **meranie.suhrn())
+        vypis_suhrn_davky(suhrn)
+        vypis_statistiky_cache()
+        if args.profil is not None:
+            vypis_merania()
+        return 1 if suhrn['chyby'] else 0
+
+    if args.prikaz == "server":
+        import server  # Načíta sa iba pre tento režim
+        server.spusti_server(args.host, args.port, args.partneri or nacitaj_cestu_k_partnerom(),
+                             pracovnici=args.pracovnici,
+                             strategia_delenia=args.delenie or config.get('strategia_delenia'),
+                             limity_bank=config.get('limity_bank'),
+                             rozlozenie_strany=rozlozenie_strany)
+    return 0
+
 if __name__ == "__main__":
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support() # Nutné pre procesy v PyInstaller .exe na Windows
+    if len(sys.argv) > 1:
+        # Neinteraktívny režim (napr. 'davka'), bez pauz a čakania na Enter
+        sys.exit(spusti_prikazovy_riadok(sys.argv[1:]))
     try:
         main()
     except KeyboardInterrupt:
@@ -539,5 +1610,4 @@ if __name__ == "__main__":
         print(f"{ANSI_RED}--- Koniec Traceback ---{ANSI_END}")
         input(f"Stlačte {ANSI_CYAN}Enter{ANSI_END} pre ukončenie.")
     finally:
-        vycisti_temp_priecinok()
         print(f"\n{ANSI_BLUE}Program bol ukončený.{ANSI_END}")
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Meranie etáp generovania (časy a počítadlá), štruktúrované JSON záznamy a profilovanie.
+
+Etapy (načítanie partnerov, delenie, payload, QR, kreslenie a uloženie PDF) sa merajú
+cez meraj(); súčty za beh vráti suhrn(). Procesy v poole merajú do vlastných počítadiel,
+ktoré sa s výsledkom úlohy vrátia hlavnému procesu (odober/pripoj).
+Ak je nastavený súbor záznamov, zaznamenaj() doň pridá jeden JSON riadok na udalosť (JSONL).
+"""
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+ANSI_BOLD = "\033[1m"
+ANSI_BLUE = "\033[94m"
+ANSI_END = "\033[0m"
+
+POCET_RIADKOV_PROFILU = 25    # Koľko najdrahších funkcií sa vypíše pri profilovaní
+HLBKA_ALOKACII = 10           # Koľko rámcov zásobníka si tracemalloc pamätá pri alokácii
+
+_zamok = threading.Lock()
+_etapy = {}       # Názov etapy -> [počet, spolu sekúnd, najdlhšie sekúnd]
+_pocitadla = {}   # Názov -> hodnota
+_subor_zaznamov = None
+
+
+@contextmanager
+def meraj(etapa):
+    """Zmeria trvanie bloku 'with' a pripočíta ho k etape (aj keď blok skončí výnimkou)."""
+    zaciatok = time.perf_counter()
+    try:
+        yield
+    finally:
+        zapis_cas(etapa, time.perf_counter() - zaciatok)
+
+
+def zapis_cas(etapa, trvanie, pocet=1):
+    """Pripočíta k etape 'pocet' vykonaní, ktoré spolu trvali 'trvanie' sekúnd."""
+    with _zamok:
+        zaznam = _etapy.get(etapa)
+        if zaznam is None:
+            _etapy[etapa] = [pocet, trvanie, trvanie]
+        else:
+            zaznam[0] += pocet
+            zaznam[1] += trvanie
+            if trvanie > zaznam[2]:
+                zaznam[2] = trvanie
+
+
+def pripocitaj(nazov, hodnota=1):
+    """Zvýši počítadlo (napr. počet strán alebo chybných riadkov)."""
+    with _zamok:
+        _pocitadla[nazov] = _pocitadla.get(nazov, 0) + hodnota
+
+
+def suhrn():
+    """Namerané etapy a počítadlá ako slovník pripravený na JSON (časy v milisekundách)."""
+    with _zamok:
+        etapy = {
+            nazov: {
+                'pocet': pocet,
+                'spolu_ms': round(spolu * 1000, 3),
+                'priemer_ms': round(spolu / pocet * 1000, 3) if pocet else 0.0,
+                'max_ms': round(najdlhsie * 1000, 3),
+            }
+            for nazov, (pocet, spolu, najdlhsie) in _etapy.items()
+        }
+        return {'etapy': etapy, 'pocitadla': dict(_pocitadla)}
+
+
+def odober():
+    """Vráti surové namerané hodnoty a vynuluje ich (proces v poole ich posiela s výsledkom úlohy)."""
+    global _etapy, _pocitadla
+    with _zamok:
+        namerane = (_etapy, _pocitadla)
+        _etapy, _pocitadla = {}, {}
+    return namerane
+
+
+def pripoj(namerane):
+    """Pripočíta hodnoty z odober() (napr. z iného procesu) k tomuto procesu."""
+    etapy, pocitadla = namerane
+    with _zamok:
+        for nazov, (pocet, spolu, najdlhsie) in etapy.items():
+            zaznam = _etapy.setdefault(nazov, [0, 0.0, 0.0])
+            zaznam[0] += pocet
+            zaznam[1] += spolu
+            zaznam[2] = max(zaznam[2], najdlhsie)
+        for nazov, hodnota in pocitadla.items():
+            _pocitadla[nazov] = _pocitadla.get(nazov, 0) + hodnota
+
+
+def vynuluj():
+    """Zabudne všetky namerané hodnoty."""
+    odober()
+
+
+def nastav_zaznamy(cesta):
+    """Zapne (alebo pri cesta=None vypne) zapisovanie JSON záznamov do súboru."""
+    global _subor_zaznamov
+    _subor_zaznamov = cesta
+
+
+def zaznamenaj(udalost, **udaje):
+    """
+    Pridá do súboru záznamov jeden JSON riadok {'cas', 'udalost', 'pid', ...údaje}.
+    Bez nastaveného súboru nerobí nič. Súbor sa otvára na pripojenie pri každom zázname,
+    takže ho môže zdieľať viac procesov a prečítať aj počas behu.
+    """
+    if not _subor_zaznamov:
+        return
+    zaznam = {'cas': datetime.now().isoformat(timespec='milliseconds'), 'udalost': udalost, 'pid': os.getpid()}
+    zaznam.update(udaje)
+    riadok = json.dumps(zaznam, ensure_ascii=False, default=str) + '\n'
+    with _zamok, open(_subor_zaznamov, 'a', encoding='utf-8') as f:
+        f.write(riadok)
+
+
+@contextmanager
+def profiluj(cesta_profilu=None, pocet_riadkov=POCET_RIADKOV_PROFILU):
+    """
+    Spustí blok 'with' pod cProfile a tracemalloc a potom vypíše najdrahšie funkcie
+    (podľa celkového času aj vlastného času), odkiaľ sa volajú a kde vzniká najviac pamäte.
+    Pri cesta_profilu sa profil uloží aj do súboru (pstats, napr. pre snakeviz).
+    Meria iba hlavné vlákno tohto procesu.
+    """
+    import cProfile
+    import tracemalloc
+    profil = cProfile.Profile()
+    tracemalloc.start(HLBKA_ALOKACII)
+    profil.enable()
+    try:
+        yield
+    finally:
+        profil.disable()
+        snimka = tracemalloc.take_snapshot()
+        _, spicka = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if cesta_profilu:
+            profil.dump_stats(cesta_profilu)
+        vypis_profil(profil, snimka, spicka, pocet_riadkov)
+
+
+def vypis_profil(profil, snimka, spicka, pocet_riadkov=POCET_RIADKOV_PROFILU):
+    """Vypíše výsledok profiluj(): časy funkcií, volajúcich najdrahších funkcií a alokácie."""
+    import pstats
+    vystup = io.StringIO()
+    statistiky = pstats.Stats(profil, stream=vystup).strip_dirs()
+    statistiky.sort_stats('cumulative').print_stats(pocet_riadkov)
+    statistiky.sort_stats('tottime').print_stats(pocet_riadkov)
+    # Odkiaľ sa volajú funkcie s najväčším vlastným časom (najhorúcejšie cesty volaní)
+    statistiky.print_callers(max(1, pocet_riadkov // 5))
+    print(f"\n{ANSI_BOLD}--- Profil (cProfile) ---{ANSI_END}")
+    print(vystup.getvalue())
+
+    print(f"{ANSI_BOLD}--- Pamäť (tracemalloc) ---{ANSI_END}")
+    print(f"{ANSI_BLUE}Špička: {spicka / 1024 / 1024:.1f} MiB{ANSI_END}")
+    for statistika in snimka.statistics('traceback')[:max(1, pocet_riadkov // 2)]:
+        # Rámce sú od najstaršieho, miesto alokácie je posledný; vypíšu sa posledné tri volania
+        cesta = ' <- '.join(f"{os.path.basename(ramec.filename)}:{ramec.lineno}"
+                            for ramec in reversed(statistika.traceback[-3:]))
+        print(f"  {statistika.size / 1024:9.1f} KiB v {statistika.count:7d} blokoch  {cesta}")
@@ -0,0 +1,381 @@
+"""
+Spätné čítanie vygenerovaných platieb: dekódovanie payloadu Pay by Square
+(base32hex -> LZMA -> CRC32 -> polia) a prečítanie payloadu z vlastných SVG/PNG QR kódov
+a z QR kódov v PDF (vektorové obdĺžniky aj vložené obrázky).
+
+QR kód sa číta bez externého dekodéra: z obrázka sa zistí matica modulov, z formátovej
+informácie úroveň korekcie a maska a dátové bity sa prečítajú v rovnakom poradí, v akom ich
+ukladá knižnica qrcode. Reed-Solomon opravy sa nepoužívajú (vlastné obrázky sú bez poškodenia),
+chybne prečítaný kód odhalí CRC payloadu. Pomocou porovnaj() sa dekódované polia porovnajú
+s očakávanými údajmi platby.
+"""
+import binascii
+import lzma
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+# Rovnaké nastavenie LZMA ako pri generovaní (pay_by_square.generate)
+FILTRE_LZMA = [{'id': lzma.FILTER_LZMA1, 'lc': 3, 'lp': 0, 'pb': 2, 'dict_size': 128 * 1024}]
+ABECEDA_ALFANUM = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:'
+
+# Polia, ktoré sa porovnávajú s očakávanou platbou (dátum splatnosti je deň generovania)
+POROVNAVANE_POLIA = ('iban', 'bic', 'suma', 'mena', 'vs', 'ks', 'poznamka', 'prijemca')
+
+
+# --- PAYLOAD ---
+
+def dekoduj_payload(payload):
+    """
+    Dekóduje payload Pay by Square na slovník polí (suma v Decimal, datum ako date).
+    Pri poškodenom alebo nepodporovanom payloade vyhodí ValueError.
+    """
+    payload = payload.strip()
+    if not re.fullmatch(r'[0-9A-V]+', payload):
+        raise ValueError("Payload obsahuje znaky mimo base32hex.")
+    hodnota = int(payload, 32)  # Abeceda base32hex 0-9A-V je presne abeceda int(..., 32)
+    pocet_bitov = 5 * len(payload)
+    pocet_bajtov = pocet_bitov // 8  # Doplnenie na násobok 5 bitov sa zahodí
+    data = (hodnota >> (pocet_bitov - 8 * pocet_bajtov)).to_bytes(pocet_bajtov, 'big')
+    if len(data) < 5:
+        raise ValueError("Payload je príliš krátky.")
+    if data[0] >> 4 != 0:
+        raise ValueError(f"Nepodporovaný typ by square dokumentu ({data[0] >> 4}), očakáva sa platba.")
+    dlzka = int.from_bytes(data[2:4], 'little')
+
+    try:
+        dekompresor = lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=FILTRE_LZMA)
+        obsah = dekompresor.decompress(data[4:], max_length=dlzka)
+    except lzma.LZMAError as e:
+        raise ValueError(f"LZMA dáta sa nedajú rozbaliť: {e}") from None
+    if len(obsah) != dlzka or dlzka < 4:
+        raise ValueError(f"Rozbalené dáta majú {len(obsah)} bajtov namiesto {dlzka}.")
+    if binascii.crc32(obsah[4:]) != int.from_bytes(obsah[:4], 'little'):
+        raise ValueError("Kontrolný súčet CRC32 nesedí.")
+    return _parsuj_polia(obsah[4:].decode('utf-8').split('\t'))
+
+
+def _parsuj_polia(polia):
+    """Polia dokumentu oddelené tabulátorom -> slovník (podporuje jednu platbu, ako ju generuje program)."""
+    polia = iter(polia)
+
+    def dalsie():
+        try:
+            return next(polia)
+        except StopIteration:
+            raise ValueError("Payload má menej polí, ako vyžaduje formát.") from None
+
+    dalsie()  # Identifikátor faktúry
+    if dalsie() != '1':
+        raise ValueError("Payload obsahuje iný počet platieb ako 1.")
+    dalsie()  # Typ platby
+    suma_text, mena, datum_text = dalsie(), dalsie(), dalsie()
+    vysledok = {'mena': mena, 'vs': dalsie(), 'ks': dalsie(), 'ss': dalsie()}
+    dalsie()  # Referencia platiteľa
+    vysledok['poznamka'] = dalsie()
+    pocet_uctov = dalsie()
+    if pocet_uctov != '1':
+        raise ValueError(f"Payload obsahuje {pocet_uctov or '0'} účtov namiesto 1.")
+    vysledok['iban'], vysledok['bic'] = dalsie(), dalsie()
+    if dalsie() != '0' or dalsie() != '0':
+        raise ValueError("Trvalý príkaz ani inkaso nie sú podporované.")
+    vysledok['prijemca'] = dalsie()
+    try:
+        vysledok['suma'] = Decimal(suma_text)
+        vysledok['datum'] = datetime.strptime(datum_text, '%Y%m%d').date() if datum_text else None
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Neplatná suma '{suma_text}' alebo dátum '{datum_text}'.") from None
+    return vysledok
+
+
+def porovnaj(dekodovane, ocakavane):
+    """Zoznam rozdielov medzi dekódovanými a očakávanými poliami (iba POROVNAVANE_POLIA v ocakavane)."""
+    rozdiely = []
+    for pole in POROVNAVANE_POLIA:
+        if pole in ocakavane and dekodovane.get(pole) != ocakavane[pole]:
+            rozdiely.append(f"{pole}: '{dekodovane.get(pole)}' namiesto '{ocakavane[pole]}'")
+    return rozdiely
+
+
+# --- QR KÓD ZO SVG/PNG ---
+
+def matica_zo_svg(text):
+    """Matica modulov zo SVG, ktoré vytvára main.matica_na_svg (obdĺžniky 'M<x> <y>h<dĺžka>v1...')."""
+    velkost = re.search(r'viewBox="0 0 (\d+) (\d+)"', text)
+    if not velkost:
+        raise ValueError("SVG nemá viewBox s rozmermi QR kódu.")
+    pocet = int(velkost.group(1))
+    matica = [bytearray(pocet) for _ in range(pocet)]
+    for x, y, dlzka in re.findall(r'M(\d+) (\d+)h(\d+)', text):
+        x, y, dlzka = int(x), int(y), int(dlzka)
+        matica[y][x:x + dlzka] = b'\x01' * dlzka
+    return _orez(matica)
+
+
+def matica_z_obrazka(obrazok):
+    """
+    Matica modulov z PIL obrázka QR kódu bez natočenia (ako z main.matica_na_obrazok).
+    Veľkosť modulu sa zistí z ľavého horného vyhľadávacieho štvorca (7 modulov), hodnota
+    modulu sa číta z jeho stredu (zmenšenie orezaného kódu metódou NEAREST).
+    """
+    from PIL import Image
+    tmave = obrazok.convert('L').point(lambda hodnota: 1 if hodnota < 128 else 0)
+    okraj = tmave.getbbox()
+    if okraj is None:
+        raise ValueError("Obrázok neobsahuje QR kód.")
+    x0, y0, x1, _ = okraj
+    pixely = tmave.load()
+    koniec = x0
+    while koniec < x1 and pixely[koniec, y0]:
+        koniec += 1
+    modul = (koniec - x0) / 7
+    pocet = round((x1 - x0) / modul)
+    if pocet < 21:
+        raise ValueError("Vyhľadávací štvorec QR kódu sa nenašiel.")
+    data = tmave.crop(okraj).resize((pocet, pocet), Image.NEAREST).tobytes()
+    return [data[i:i + pocet] for i in range(0, len(data), pocet)]
+
+
+def _orez(matica):
+    """Odstráni tichú zónu (riadky a stĺpce bez tmavého modulu okolo kódu)."""
+    riadky = [i for i, riadok in enumerate(matica) if any(riadok)]
+    stlpce = [j for j in range(len(matica[0])) if any(riadok[j] for riadok in matica)] if riadky else []
+    if not riadky:
+        raise ValueError("Matica neobsahuje QR kód.")
+    return [bytes(riadok[stlpce[0]:stlpce[-1] + 1]) for riadok in matica[riadky[0]:riadky[-1] + 1]]
+
+
+def _formatova_informacia(matica):
+    """(úroveň korekcie, maska) z formátovej informácie vedľa ľavého horného štvorca."""
+    from qrcode import util
+    pocet = len(matica)
+    bity = 0
+    for i in range(15):
+        if i < 8:
+            modul = matica[8][pocet - i - 1]
+        elif i < 9:
+            modul = matica[8][15 - i]
+        else:
+            modul = matica[8][15 - i - 1]
+        bity |= (1 if modul else 0) << i
+    # Najbližšia platná hodnota (BCH kód opraví až 3 chybné bity)
+    vzdialenost, data = min((bin(util.BCH_type_info(data) ^ bity).count('1'), data) for data in range(32))
+    if vzdialenost > 3:
+        raise ValueError("Formátová informácia QR kódu sa nedá prečítať.")
+    return data >> 3, data & 7
+
+
+@lru_cache(maxsize=40)
+def _funkcne_moduly(verzia):
+    """
+    Matica, v ktorej sú None iba dátové moduly (vyhľadávacie, zarovnávacie a časovacie vzory
+    sú vyplnené). Pamätá sa pre každú verziu, preto sa nesmie meniť.
+    """
+    import qrcode
+    qr = qrcode.QRCode(version=verzia, border=0)
+    qr.modules_count = verzia * 4 + 17
+    qr.modules = [[None] * qr.modules_count for _ in range(qr.modules_count)]
+    qr.setup_position_probe_pattern(0, 0)
+    qr.setup_position_probe_pattern(qr.modules_count - 7, 0)
+    qr.setup_position_probe_pattern(0, qr.modules_count - 7)
+    qr.setup_position_adjust_pattern()
+    qr.setup_timing_pattern()
+    qr.setup_type_info(True, 0)
+    if verzia >= 7:
+        qr.setup_type_number(True)
+    return qr.modules
+
+
+def dekoduj_maticu(matica):
+    """
+    Prečíta text z matice QR kódu (riadky 0/1, s tichou zónou alebo bez nej).
+    Podporuje numerický, alfanumerický a bajtový režim. Pri nečitateľnej matici vyhodí ValueError.
+    """
+    from qrcode import base, util
+    matica = _orez(matica)
+    pocet = len(matica)
+    if (pocet - 17) % 4 or not 1 <= (pocet - 17) // 4 <= 40:
+        raise ValueError(f"Neplatný rozmer QR kódu ({pocet} modulov).")
+    verzia = (pocet - 17) // 4
+    korekcia, maska = _formatova_informacia(matica)
+    funkcne = _funkcne_moduly(verzia)
+    je_maskovany = util.mask_func(maska)
+
+    # Dátové bity v rovnakom poradí ako QRCode.map_data: dvojstĺpce sprava, striedavo hore a dole
+    bity = []
+    riadok, smer = pocet - 1, -1
+    for stlpec in range(pocet - 1, 0, -2):
+        if stlpec <= 6:
+            stlpec -= 1  # Preskočí sa zvislý časovací vzor
+        while 0 <= riadok < pocet:
+            for c in (stlpec, stlpec - 1):
+                if funkcne[riadok][c] is None:
+                    bity.append((1 if matica[riadok][c] else 0) ^ (1 if je_maskovany(riadok, c) else 0))
+            riadok += smer
+        riadok -= smer
+        smer = -smer
+    kodove_slova = [int(''.join(map(str, bity[i:i + 8])), 2) for i in range(0, len(bity) - 7, 8)]
+
+    # Dátové slová blokov sú prekladané (1. slovo každého bloku, potom 2. ...), opravné sa vynechajú
+    bloky = base.rs_blocks(verzia, korekcia)
+    data = [[] for _ in bloky]
+    pozicia = 0
+    for i in range(max(blok.data_count for blok in bloky)):
+        for cislo, blok in enumerate(bloky):
+            if i < blok.data_count:
+                data[cislo].append(kodove_slova[pozicia])
+                pozicia += 1
+    return _citaj_segmenty(''.join(f"{slovo:08b}" for blok in data for slovo in blok), verzia)
+
+
+def _citaj_segmenty(bity, verzia):
+    """Text zo segmentov dátového toku (režim, dĺžka, dáta), až po ukončovač."""
+    from qrcode import util
+    pozicia = 0
+
+    def citaj(pocet):
+        nonlocal pozicia
+        if pozicia + pocet > len(bity):
+            raise ValueError("Dátový tok QR kódu je neúplný.")
+        hodnota = int(bity[pozicia:pozicia + pocet], 2)
+        pozicia += pocet
+        return hodnota
+
+    casti = []
+    while len(bity) - pozicia >= 4:
+        rezim = citaj(4)
+        if rezim == 0:
+            break
+        if rezim not in (util.MODE_NUMBER, util.MODE_ALPHA_NUM, util.MODE_8BIT_BYTE):
+            raise ValueError(f"Nepodporovaný režim QR segmentu ({rezim}).")
+        dlzka = citaj(util.length_in_bits(rezim, verzia))
+        if rezim == util.MODE_ALPHA_NUM:
+            for _ in range(dlzka // 2):
+                dvojica = citaj(11)
+                casti.append(ABECEDA_ALFANUM[dvojica // 45] + ABECEDA_ALFANUM[dvojica % 45])
+            if dlzka % 2:
+                casti.append(ABECEDA_ALFANUM[citaj(6)])
+        elif rezim == util.MODE_NUMBER:
+            for zostava in range(dlzka, 0, -3):
+                cifier = min(3, zostava)
+                casti.append(f"{citaj((4, 7, 10)[cifier - 1]):0{cifier}d}")
+        else:
+            casti.append(bytes(citaj(8) for _ in range(dlzka)).decode('utf-8'))
+    return ''.join(casti)
+
+
+# --- QR KÓDY Z PDF ---
+
+# Vektorový QR kód (main.vykresli_qr_vektorovo): mierka na modul, obdĺžniky 'stĺpec riadok dĺžka 1 re', výplň
+_VEKTOROVY_KOD = rb'q [-\d.]+ 0 0 [-\d.]+ [-\d.]+ [-\d.]+ cm\s+((?:\d+ \d+ \d+ 1 re\s+)+)f Q'
+# Rastrový QR kód: obrázok (XObject) vykreslený operátorom Do
+_OBRAZOK = rb'/([^\s/]+) Do'
+_OPERACIE_QR = re.compile(_VEKTOROVY_KOD + rb'|' + _OBRAZOK)
+_OBDLZNIK = re.compile(rb'(\d+) (\d+) (\d+) 1 re')
+_ODKAZ = re.compile(rb'(\d+) 0 R')
+
+
+def _objekty_pdf(data):
+    """
+    Objekty PDF podľa tabuľky xref: {číslo: (slovník ako bajty, surový stream alebo None)}.
+    Stačí na PDF z ReportLabu (klasická tabuľka xref, priama dĺžka streamu).
+    """
+    koniec = re.search(rb'startxref\s+(\d+)\s+%%EOF\s*$', data)
+    if koniec is None or not data.startswith(b'xref', int(koniec.group(1))):
+        raise ValueError("PDF nemá tabuľku xref (nie je z tohto programu alebo je poškodené).")
+    pozicia = int(koniec.group(1))
+    hlavicka = re.compile(rb'xref\s+(\d+) (\d+)\s+').match(data, pozicia)
+    if hlavicka is None:
+        raise ValueError("Tabuľka xref v PDF je poškodená.")
+    prvy, pocet = int(hlavicka.group(1)), int(hlavicka.group(2))
+    polozky = data[hlavicka.end():hlavicka.end() + 20 * pocet]
+    objekty = {}
+    for i in range(pocet):
+        polozka = polozky[20 * i:20 * i + 20]
+        if polozka[17:18] != b'n':
+            continue
+        zaciatok = int(polozka[:10])
+        # Slovník je text, prvé 'stream' alebo 'endobj' za začiatkom objektu patrí tomuto objektu
+        koniec_objektu = data.index(b'endobj', zaciatok)
+        zaciatok_streamu = data.find(b'stream', zaciatok, koniec_objektu)
+        if zaciatok_streamu < 0:
+            objekty[prvy + i] = (data[zaciatok:koniec_objektu], None)
+            continue
+        slovnik = data[zaciatok:zaciatok_streamu]
+        dlzka = re.search(rb'/Length (\d+)', slovnik)
+        if dlzka is None:
+            raise ValueError("Stream v PDF nemá priamu dĺžku.")
+        zaciatok_dat = zaciatok_streamu + 6
+        zaciatok_dat += 2 if data.startswith(b'\r\n', zaciatok_dat) else 1
+        objekty[prvy + i] = (slovnik, data[zaciatok_dat:zaciatok_dat + int(dlzka.group(1))])
+    return objekty
+
+
+def _dekoduj_stream(slovnik, surovy):
+    """Použije filtre streamu (ASCII85Decode, FlateDecode - ako ich zapisuje ReportLab)."""
+    import base64
+    import zlib
+    filtre = re.search(rb'/Filter\s*(\[[^\]]*\]|/\w+)', slovnik)
+    data = surovy
+    for nazov in re.findall(rb'/(\w+)', filtre.group(1)) if filtre else ():
+        if nazov == b'ASCII85Decode':
+            data = base64.a85decode(data.strip().removesuffix(b'~>'))
+        elif nazov == b'FlateDecode':
+            data = zlib.decompress(data)
+        else:
+            raise ValueError(f"Nepodporovaný filter PDF '{nazov.decode()}'.")
+    return data
+
+
+def _strany_pdf(objekty, cislo):
+    """Čísla objektov strán v poradí (prechod stromu /Kids od objektu cislo)."""
+    slovnik = objekty[cislo][0]
+    deti = re.search(rb'/Kids\s*\[([^\]]*)\]', slovnik)
+    if deti is None:
+        yield cislo
+        return
+    for dieta in _ODKAZ.findall(deti.group(1)):
+        yield from _strany_pdf(objekty, int(dieta))
+
+
+def _obrazok_pdf(slovnik, data):
+    """PIL obrázok z XObject obrázka (8 bitov na zložku, RGB alebo odtiene šedej)."""
+    from PIL import Image
+    sirka = int(re.search(rb'/Width (\d+)', slovnik).group(1))
+    vyska = int(re.search(rb'/Height (\d+)', slovnik).group(1))
+    if b'/BitsPerComponent 8' not in slovnik:
+        raise ValueError("Obrázok v PDF nemá 8 bitov na zložku.")
+    rezim = 'L' if b'/DeviceGray' in slovnik else 'RGB'
+    return Image.frombytes(rezim, (sirka, vyska), data)
+
+
+def matice_z_pdf(data):
+    """
+    Postupne vracia matice QR kódov z PDF v poradí kreslenia (po stranách): vektorové kódy
+    sa zložia z obdĺžnikov modulov, rastrové z vložených obrázkov. Strany sa čítajú zo stromu
+    strán, obsah strán cez ASCII85/Flate. Pri nečitateľnom PDF vyhodí ValueError.
+    """
+    objekty = _objekty_pdf(data)
+    koren = next((cislo for cislo, (slovnik, _) in objekty.items()
+                  if re.search(rb'/Type /Pages\b', slovnik) and b'/Parent' not in slovnik), None)
+    if koren is None:
+        raise ValueError("PDF nemá strom strán.")
+    for strana in _strany_pdf(objekty, koren):
+        slovnik = objekty[strana][0]
+        obsah = re.search(rb'/Contents\s*(\[[^\]]*\]|\d+ 0 R)', slovnik)
+        xobjekty = re.search(rb'/XObject\s*<<(.*?)>>', slovnik, re.S)
+        obrazky = dict(re.findall(rb'/([^\s/]+)\s+(\d+) 0 R', xobjekty.group(1))) if xobjekty else {}
+        for odkaz in _ODKAZ.findall(obsah.group(1)) if obsah else ():
+            for operacia in _OPERACIE_QR.finditer(_dekoduj_stream(*objekty[int(odkaz)])):
+                if operacia.group(1) is not None:
+                    useky = [tuple(map(int, usek)) for usek in _OBDLZNIK.findall(operacia.group(1))]
+                    velkost = max(max(riadok, stlpec + dlzka) for stlpec, riadok, dlzka in useky) + 1
+                    matica = [bytearray(velkost) for _ in range(velkost)]
+                    for stlpec, riadok, dlzka in useky:
+                        matica[riadok][stlpec:stlpec + dlzka] = b'\x01' * dlzka
+                    yield _orez(matica)
+                elif operacia.group(2) in obrazky:
+                    slovnik_obrazka, surovy = objekty[int(obrazky[operacia.group(2)])]
+                    if b'/Subtype /Image' in slovnik_obrazka:
+                        yield matica_z_obrazka(_obrazok_pdf(slovnik_obrazka, _dekoduj_stream(slovnik_obrazka, surovy)))
@@ -0,0 +1,151 @@
+"""
+Rozloženie QR platieb na strane PDF.
+
+Pozície všetkých políčok na strane sa vypočítajú vopred (raz pre dokument),
+kreslenie potom len prechádza platby a políčka. Štýly:
+    riadky     - pôvodné rozloženie: jeden 55 mm blok na riadok, QR vľavo, text vpravo
+    kompaktne  - menšie bloky v dvoch stĺpcoch
+    mriezka    - mriežka N×M s QR a krátkym popisom, spoločné údaje raz v hlavičke strany
+    etikety    - etiketový hárok (70 × 37 mm), každá etiketa má všetky údaje
+"""
+from collections import namedtuple
+
+from reportlab.lib.pagesizes import A4, A5, letter
+from reportlab.lib.units import mm
+
+FORMATY_STRAN = {'A4': A4, 'A5': A5, 'Letter': letter}
+STYLY = ('riadky', 'kompaktne', 'mriezka', 'etikety')
+
+MIN_QR_MM = 30          # Najmenší QR kód, ktorý automatická mriežka ešte použije (čitateľnosť mobilom)
+MIN_QR_RUCNE_MM = 15    # Pod túto veľkosť neprejde ani ručne zadaná mriežka
+OKRAJ_BUNKY = 2 * mm    # Vnútorný okraj políčka mriežky
+POPIS_BUNKY = 9 * mm    # Miesto pod QR v mriežke na sumu a poradie
+VYSKA_HLAVICKY = 14 * mm
+ETIKETA = (70 * mm, 37 * mm)
+
+# Pre blokové štýly (QR vľavo, text vpravo) sú odsadenia merané od vrchu bloku,
+# pre štýl 'bunka' (QR hore, popis pod ním) sa väčšina z nich nepoužije.
+Rozlozenie = namedtuple('Rozlozenie', [
+    'nazov',              # Názov štýlu (pozri STYLY)
+    'strana',             # (šírka, výška) strany v bodoch
+    'styl',               # 'blok' alebo 'bunka'
+    'pozicie',            # Ľavé dolné rohy políčok na jednej strane, v poradí vypĺňania
+    'sirka_bunky',
+    'vyska_bunky',
+    'velkost_qr',
+    'odsadenie_qr',       # Od vrchu políčka po vrch QR kódu
+    'medzera_textu',      # Medzi QR kódom a textom (blok)
+    'odsadenie_textu',    # Od vrchu políčka po prvý riadok textu (blok)
+    'krok_riadku',
+    'velkost_textu',
+    'velkost_poradia',
+    'odsadenie_poradia',  # Od vrchu políčka po účiaru poradového čísla (blok)
+    'hlavicka',           # True, ak sa spoločné údaje píšu raz na vrch strany (mriezka)
+    'oddelovac',          # Výška prerušovanej čiary nad spodkom políčka, None = bez čiary
+])
+
+
+def _pozicie_mriezky(strana, stlpce, riadky, lavy, horny, sirka_bunky, vyska_bunky):
+    """Pozície políčok po riadkoch zhora nadol, zľava doprava."""
+    _, vyska = strana
+    return tuple(
+        (lavy + stlpec * sirka_bunky, vyska - horny - (riadok + 1) * vyska_bunky)
+        for riadok in range(riadky) for stlpec in range(stlpce)
+    )
+
+
+def _riadky(strana):
+    """Pôvodné rozloženie: 55 mm bloky pod sebou, kým sa zmestia nad spodný okraj."""
+    sirka, vyska = strana
+    vyska_bloku, horny, bocny = 55 * mm, 20 * mm, 15 * mm
+    # Blok sa pridá, kým jeho vrch ostáva aspoň vyska_bloku + horny nad spodkom strany
+    pocet = max(1, int((vyska - 2 * horny - vyska_bloku) // vyska_bloku) + 1)
+    pozicie = _pozicie_mriezky(strana, 1, pocet, bocny, horny, sirka - 2 * bocny, vyska_bloku)
+    return Rozlozenie('riadky', strana, 'blok', pozicie, sirka - 2 * bocny, vyska_bloku,
+                      40 * mm, 5 * mm, 10 * mm, 8 * mm, 5 * mm, 10, 24, vyska_bloku / 2 - 5 * mm, False, 5 * mm)
+
+
+def _kompaktne(strana):
+    """Bloky s 30 mm QR kódom v dvoch stĺpcoch."""
+    sirka, vyska = strana
+    okraj, vyska_bloku = 10 * mm, 38 * mm
+    stlpce = 2 if sirka >= 180 * mm else 1
+    riadky = max(1, int((vyska - 2 * okraj) // vyska_bloku))
+    sirka_bunky = (sirka - 2 * okraj) / stlpce
+    pozicie = _pozicie_mriezky(strana, stlpce, riadky, okraj, okraj, sirka_bunky, vyska_bloku)
+    return Rozlozenie('kompaktne', strana, 'blok', pozicie, sirka_bunky, vyska_bloku,
+                      30 * mm, 4 * mm, 4 * mm, 7 * mm, 4 * mm, 8, 14, vyska_bloku / 2 - 4 * mm, False, 2 * mm)
+
+
+def _mriezka(strana, stlpce=None, riadky=None):
+    """Mriežka N×M; bez zadaných rozmerov sa zvolí najviac políčok s QR aspoň MIN_QR_MM."""
+    sirka, vyska = strana
+    okraj = 10 * mm
+    vyuzitelna_sirka = sirka - 2 * okraj
+    vyuzitelna_vyska = vyska - okraj - okraj - VYSKA_HLAVICKY
+    if not stlpce:
+        stlpce = max(1, int(vyuzitelna_sirka // (MIN_QR_MM * mm + 2 * OKRAJ_BUNKY)))
+    if not riadky:
+        riadky = max(1, int(vyuzitelna_vyska // (MIN_QR_MM * mm + 2 * OKRAJ_BUNKY + POPIS_BUNKY)))
+    sirka_bunky = vyuzitelna_sirka / stlpce
+    vyska_bunky = vyuzitelna_vyska / riadky
+    velkost_qr = min(sirka_bunky - 2 * OKRAJ_BUNKY, vyska_bunky - 2 * OKRAJ_BUNKY - POPIS_BUNKY)
+    if velkost_qr < MIN_QR_RUCNE_MM * mm:
+        raise ValueError(f"Mriežka {stlpce}x{riadky} je na tejto strane príliš hustá "
+                         f"(QR kód by mal iba {velkost_qr / mm:.0f} mm).")
+    pozicie = _pozicie_mriezky(strana, stlpce, riadky, okraj, okraj + VYSKA_HLAVICKY, sirka_bunky, vyska_bunky)
+    return Rozlozenie('mriezka', strana, 'bunka', pozicie, sirka_bunky, vyska_bunky,
+                      velkost_qr, OKRAJ_BUNKY, 0, 0, 3.5 * mm, 7, 7, 0, True, None)
+
+
+def _etikety(strana):
+    """
+    Etiketový hárok s etiketami 70 × 37 mm, vycentrovaný na strane.
+    Políčko je etiketa bez 3 mm okraja zľava a sprava, poradie je vpravo dole pod textom.
+    """
+    sirka, vyska = strana
+    sirka_etikety, vyska_etikety = ETIKETA
+    okraj_etikety = 3 * mm
+    stlpce = max(1, int(sirka // sirka_etikety))
+    riadky = max(1, int(vyska // vyska_etikety))
+    lavy = (sirka - stlpce * sirka_etikety) / 2 + okraj_etikety
+    horny = (vyska - riadky * vyska_etikety) / 2
+    pozicie = _pozicie_mriezky(strana, stlpce, riadky, lavy, horny, sirka_etikety, vyska_etikety)
+    return Rozlozenie('etikety', strana, 'blok', pozicie, sirka_etikety - 2 * okraj_etikety, vyska_etikety,
+                      30 * mm, 3.5 * mm, 2 * mm, 6 * mm, 3 * mm, 6, 9, 31 * mm, False, None)
+
+
+def vytvor_rozlozenie(nazov='riadky', format_strany='A4', stlpce=None, riadky=None):
+    """
+    Vypočíta rozloženie (všetky pozície políčok na strane) pre daný štýl a formát strany.
+    stlpce/riadky sa použijú iba pre štýl 'mriezka'. Pri neplatných hodnotách vyhodí ValueError.
+    """
+    strana = FORMATY_STRAN.get(format_strany)
+    if strana is None:
+        raise ValueError(f"Neznámy formát strany '{format_strany}' (možnosti: {', '.join(FORMATY_STRAN)}).")
+    if nazov == 'riadky':
+        return _riadky(strana)
+    if nazov == 'kompaktne':
+        return _kompaktne(strana)
+    if nazov == 'mriezka':
+        return _mriezka(strana, stlpce, riadky)
+    if nazov == 'etikety':
+        return _etikety(strana)
+    raise ValueError(f"Neznáme rozloženie '{nazov}' (možnosti: {', '.join(STYLY)}).")
+
+
+def parsuj_mriezku(text):
+    """Prevedie text 'NxM' (stĺpce × riadky) na dvojicu čísel. Pri neplatnom zápise vyhodí ValueError."""
+    stlpce, oddelovac, riadky = text.lower().replace('×', 'x').partition('x')
+    if not oddelovac or not stlpce.strip().isdigit() or not riadky.strip().isdigit():
+        raise ValueError(f"Mriežka '{text}' musí mať tvar STLPCExRIADKY, napr. 4x6.")
+    stlpce, riadky = int(stlpce), int(riadky)
+    if stlpce < 1 or riadky < 1:
+        raise ValueError("Mriežka musí mať aspoň jeden stĺpec a riadok.")
+    return stlpce, riadky
+
+
+def pocet_stran(rozlozenie, pocet_platieb):
+    """Koľko strán zaberie daný počet platieb."""
+    na_stranu = len(rozlozenie.pozicie)
+    return max(1, -(-pocet_platieb // na_stranu))
@@ -0,0 +1,314 @@
+"""
+Lokálna HTTP služba na generovanie QR kódov a PDF na požiadanie (napr. z ERP).
+
+Beží dlhodobo, takže importy, partneri, fonty a cache ostávajú "teplé" a každá
+požiadavka platí iba za samotné renderovanie. Server je postavený na asyncio
+(bez ďalších knižníc), renderovanie beží mimo event loop - v poole procesov
+alebo pri jednom pracovníkovi vo vlákne.
+
+Koncové body:
+    POST /pdf, /png, /svg   telo je JSON s rovnakými kľúčmi ako riadok manifestu
+                            (partner/iban, prijemca, bic, suma, vs, ks, poznamka, delenie),
+                            pre PNG/SVG aj 'poradie' čiastky, pre PDF 'vektorove_qr'
+    GET  /metriky           latencia požiadaviek (počet, priemer, p50/p95/p99, max), časy etáp a cache
+    GET  /zdravie           jednoduchá kontrola, že služba beží
+"""
+import asyncio
+import collections
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import adresar
+import cache
+import main
+import meranie
+
+ANSI_GREEN = "\033[92m"
+ANSI_YELLOW = "\033[93m"
+ANSI_END = "\033[0m"
+
+PREDVOLENY_HOST = '127.0.0.1'
+PREDVOLENY_PORT = 8080
+MAX_VELKOST_TELA = 1024 * 1024   # Väčšie telo požiadavky sa odmietne (413)
+MAX_POCET_HLAVICIEK = 100
+POCET_VZORIEK_LATENCIE = 1000    # Z koľkých posledných požiadaviek sa počítajú percentily
+MAX_CIASTOK_POZIADAVKY = 1000    # Platba rozdelená na viac čiastok sa odmietne (400), generujte ju dávkou
+
+FORMATY = {
+    'pdf': 'application/pdf',
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+# Koncové body s vlastnými metrikami; ostatné požiadavky (404, neznáme metódy) idú pod jeden kľúč,
+# aby klient nemohol ľubovoľnými cestami zväčšovať slovník metrík
+ZNAME_CESTY = ('/pdf', '/png', '/svg', '/metriky', '/zdravie')
+ZNAME_METODY = ('GET', 'POST')
+NEZNAMA_POZIADAVKA = 'neznáma'
+
+STAVY = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error',
+}
+
+
+class MetrikyLatencie:
+    """Počítadlá a posledné latencie požiadaviek pre každý koncový bod."""
+
+    def __init__(self, pocet_vzoriek=POCET_VZORIEK_LATENCIE):
+        self._pocet_vzoriek = pocet_vzoriek
+        self._body = {}
+        self._zamok = threading.Lock()
+        self.start = time.monotonic()
+
+    def zaznamenaj(self, bod, trvanie, chyba=False):
+        """Zaznamená jednu požiadavku (trvanie v sekundách)."""
+        with self._zamok:
+            stat = self._body.get(bod)
+            if stat is None:
+                stat = self._body[bod] = {
+                    'pocet': 0, 'chyby': 0, 'spolu': 0.0, 'max': 0.0,
+                    'vzorky': collections.deque(maxlen=self._pocet_vzoriek),
+                }
+            stat['pocet'] += 1
+            stat['chyby'] += bool(chyba)
+            stat['spolu'] += trvanie
+            stat['max'] = max(stat['max'], trvanie)
+            stat['vzorky'].append(trvanie)
+
+    def suhrn(self):
+        """Metriky ako slovník (časy v milisekundách), pripravený na JSON."""
+        with self._zamok:
+            body = {}
+            for bod, stat in self._body.items():
+                vzorky = sorted(stat['vzorky'])
+                body[bod] = {
+                    'pocet': stat['pocet'],
+                    'chyby': stat['chyby'],
+                    'priemer_ms': round(stat['spolu'] / stat['pocet'] * 1000, 2),
+                    'p50_ms': _percentil_ms(vzorky, 50),
+                    'p95_ms': _percentil_ms(vzorky, 95),
+                    'p99_ms': _percentil_ms(vzorky, 99),
+                    'max_ms': round(stat['max'] * 1000, 2),
+                }
+        return {'beh_s': round(time.monotonic() - self.start, 1), 'koncove_body': body}
+
+
+def _percentil_ms(zoradene_vzorky, percentil):
+    if not zoradene_vzorky:
+        return None
+    index = min(len(zoradene_vzorky) - 1, int(len(zoradene_vzorky) * percentil / 100))
+    return round(zoradene_vzorky[index] * 1000, 2)
+
+
+class ChybaPoziadavky(Exception):
+    """Chyba, ktorá sa vráti klientovi s daným HTTP stavom."""
+
+    def __init__(self, stav, sprava):
+        super().__init__(sprava)
+        self.stav = stav
+
+
+class QRServer:
+    """Stav služby (partneri, nastavenia, pool, metriky) a obsluha HTTP spojení."""
+
+    def __init__(self, cesta_partnerov=None, pracovnici=1, strategia_delenia=None, limity_bank=None,
+                 rozlozenie_strany=None):
+        self.cesta_partnerov = cesta_partnerov
+        self.pracovnici = pracovnici
+        self.strategia_delenia = strategia_delenia
+        self.limity_bank = limity_bank
+        self.rozlozenie_strany = rozlozenie_strany
+        self.metriky = MetrikyLatencie()
+        self.pool = None
+        self._partneri = None
+
+    def partneri(self):
+        """
+        Aktuálny register partnerov; súbor sa znovu načíta iba pri zmene (inak ostáva posledný platný).
+        Volá os.stat a pri zmene číta celý súbor, preto sa počas behu volá mimo event loop.
+        """
+        if self.cesta_partnerov:
+            register = adresar.nacitaj_register(self.cesta_partnerov)
+            if register is not None:
+                self._partneri = register
+        return self._partneri
+
+    async def spusti(self, host=PREDVOLENY_HOST, port=PREDVOLENY_PORT):
+        """Spustí server a obsluhuje požiadavky, kým nie je prerušený."""
+        self.partneri()
+        # Knižnice a fonty v hlavnom procese (pri jednom pracovníkovi sa renderuje tu)
+        main.predohrej(na_pozadi=False)
+        self.pool = main.vytvor_pool(self.pracovnici, zahriat_fonty=True)
+        try:
+            server = await asyncio.start_server(self._obsluz_spojenie, host, port)
+            adresy = ', '.join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+            print(f"✅ {ANSI_GREEN}QR služba beží na {adresy}{ANSI_END} (Ctrl+C ukončí)")
+            async with server:
+                await server.serve_forever()
+        finally:
+            if self.pool:
+                self.pool.shutdown(cancel_futures=True)
+
+    async def _obsluz_spojenie(self, reader, writer):
+        """Obslúži jedno TCP spojenie (aj viac požiadaviek pri keep-alive)."""
+        try:
+            while True:
+                poziadavka = await _citaj_poziadavku(reader)
+                if poziadavka is None:
+                    break
+                metoda, cesta, hlavicky, telo, udrzat_spojenie = poziadavka
+                zaciatok = time.perf_counter()
+                hlavicky_odpovede = {}
+                try:
+                    obsah, typ, hlavicky_odpovede = await self._spracuj(metoda, cesta, telo)
+                    stav = 200
+                except ChybaPoziadavky as e:
+                    stav, obsah, typ = e.stav, _json_bajty({'chyba': str(e)}), 'application/json'
+                except Exception as e:
+                    stav, obsah, typ = 500, _json_bajty({'chyba': str(e)}), 'application/json'
+                trvanie = time.perf_counter() - zaciatok
+                self.metriky.zaznamenaj(_kluc_metrik(metoda, cesta), trvanie, chyba=stav >= 400)
+                meranie.zaznamenaj('poziadavka', metoda=metoda, cesta=cesta, stav=stav,
+                                   trvanie_ms=round(trvanie * 1000, 2), bajtov=len(obsah))
+                hlavicky_odpovede['X-Trvanie-Ms'] = f"{trvanie * 1000:.1f}"
+                writer.write(_zostav_odpoved(stav, typ, obsah, hlavicky_odpovede, udrzat_spojenie))
+                await writer.drain()
+                if not udrzat_spojenie:
+                    break
+        except ChybaPoziadavky as e:
+            # Neplatná požiadavka (riadok, hlavičky, Content-Length) - odpovie sa a spojenie sa zavrie
+            obsah = _json_bajty({'chyba': str(e)})
+            self.metriky.zaznamenaj(NEZNAMA_POZIADAVKA, 0.0, chyba=True)
+            meranie.zaznamenaj('poziadavka', stav=e.stav, chyba=str(e), bajtov=len(obsah))
+            writer.write(_zostav_odpoved(e.stav, 'application/json', obsah, {}, False))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Klient zavrel spojenie
+        finally:
+            writer.close()
+
+    async def _spracuj(self, metoda, cesta, telo):
+        """Vráti (obsah, content-type, hlavičky) pre danú požiadavku, alebo vyhodí ChybaPoziadavky."""
+        if cesta == '/zdravie':
+            return _json_bajty({'stav': 'ok'}), 'application/json', {}
+        if cesta == '/metriky':
+            metriky = self.metriky.suhrn()
+            metriky['cache'] = cache.statistiky()  # Iba hlavný proces, procesy poolu majú vlastné
+            metriky.update(meranie.suhrn())          # Časy etáp renderovania (aj z procesov poolu)
+            partneri = self._partneri
+            metriky['partnerov'] = len(partneri) if partneri is not None else 0
+            return _json_bajty(metriky), 'application/json', {}
+
+        format_vystupu = cesta.lstrip('/')
+        if format_vystupu not in FORMATY:
+            raise ChybaPoziadavky(404, f"Neznáma cesta '{cesta}'.")
+        if metoda != 'POST':
+            raise ChybaPoziadavky(405, "Použite metódu POST s JSON telom.")
+        try:
+            zaznam = json.loads(telo or b'{}')
+        except ValueError as e:
+            raise ChybaPoziadavky(400, f"Telo požiadavky nie je platný JSON: {e}") from None
+        if not isinstance(zaznam, dict):
+            raise ChybaPoziadavky(400, "Telo požiadavky musí byť JSON objekt.")
+
+        try:
+            # Overenie údajov je lacné, robí sa hneď; načítanie partnerov a renderovanie idú mimo event loop
+            slucka = asyncio.get_running_loop()
+            partneri = await slucka.run_in_executor(None, self.partneri)
+            info_platby = main.priprav_platbu_z_manifestu(zaznam, partneri, self.strategia_delenia, self.limity_bank)
+            pocet_ciastok = main.rozdel_sumu(info_platby)[0]
+            if pocet_ciastok > MAX_CIASTOK_POZIADAVKY:
+                raise ChybaPoziadavky(400, f"Platba by sa rozdelila na {pocet_ciastok} čiastok, služba generuje "
+                                           f"najviac {MAX_CIASTOK_POZIADAVKY}; väčšie platby generujte dávkou.")
+            poradie = zaznam.get('poradie') or 1
+            if isinstance(poradie, str) and poradie.isascii() and poradie.isdigit():
+                poradie = int(poradie)
+            if not isinstance(poradie, int) or isinstance(poradie, bool):
+                raise ChybaPoziadavky(400, f"Poradie platby musí byť od 1 do {pocet_ciastok}.")
+            vektorove_qr = bool(zaznam.get('vektorove_qr', True))
+            argumenty = (info_platby, format_vystupu, poradie, vektorove_qr, self.rozlozenie_strany)
+            if self.pool:
+                # Proces v poole meria etapy do vlastných počítadiel, vráti ich s výsledkom
+                (obsah, pocet), namerane = await slucka.run_in_executor(
+                    self.pool, main.spusti_s_meranim, main.vyrenderuj_platbu, *argumenty)
+                meranie.pripoj(namerane)
+            else:
+                obsah, pocet = await slucka.run_in_executor(None, main.vyrenderuj_platbu, *argumenty)
+        except ValueError as e:
+            raise ChybaPoziadavky(400, str(e)) from None
+
+        hlavicky = {'X-Pocet-Platieb': str(pocet)}
+        if format_vystupu == 'pdf':
+            hlavicky['Content-Disposition'] = f'inline; filename="QR_Platba_VS_{info_platby["vs"]}.pdf"'
+        return obsah, FORMATY[format_vystupu], hlavicky
+
+
+async def _citaj_poziadavku(reader):
+    """
+    Prečíta jednu HTTP/1.x požiadavku. Vráti (metóda, cesta, hlavičky, telo, udržať_spojenie),
+    alebo None, ak klient spojenie zavrel.
+    """
+    prvy_riadok = await reader.readline()
+    if not prvy_riadok.strip():
+        return None
+    try:
+        metoda, ciel, verzia = prvy_riadok.decode('latin-1').split()
+    except ValueError:
+        raise ChybaPoziadavky(400, "Neplatný riadok požiadavky.") from None
+
+    hlavicky = {}
+    while True:
+        riadok = await reader.readline()
+        if riadok in (b'\r\n', b'\n', b''):
+            break
+        if len(hlavicky) >= MAX_POCET_HLAVICIEK:
+            raise ChybaPoziadavky(400, "Príliš veľa hlavičiek.")
+        nazov, _, hodnota = riadok.decode('latin-1').partition(':')
+        hlavicky[nazov.strip().lower()] = hodnota.strip()
+
+    dlzka = hlavicky.get('content-length') or '0'
+    # Iba nezáporné celé číslo z ASCII číslic (int() by prijal aj '-5', '+5' či '1_0')
+    if not (dlzka.isascii() and dlzka.isdigit()):
+        raise ChybaPoziadavky(400, "Neplatná hlavička Content-Length.")
+    dlzka = int(dlzka)
+    if dlzka > MAX_VELKOST_TELA:
+        raise ChybaPoziadavky(413, "Telo požiadavky je príliš veľké.")
+    telo = await reader.readexactly(dlzka) if dlzka else b''
+
+    spojenie = hlavicky.get('connection', '').lower()
+    udrzat_spojenie = spojenie != 'close' if verzia == 'HTTP/1.1' else spojenie == 'keep-alive'
+    return metoda.upper(), urlsplit(ciel).path, hlavicky, telo, udrzat_spojenie
+
+
+def _kluc_metrik(metoda, cesta):
+    """Kľúč v MetrikyLatencie: známa metóda a cesta, inak spoločný kľúč pre neznáme požiadavky."""
+    if metoda in ZNAME_METODY and cesta in ZNAME_CESTY:
+        return f"{metoda} {cesta}"
+    return NEZNAMA_POZIADAVKA
+
+
+def _zostav_odpoved(stav, typ, obsah, hlavicky, udrzat_spojenie):
+    riadky = [
+        f"HTTP/1.1 {stav} {STAVY.get(stav, '')}",
+        f"Content-Type: {typ}",
+        f"Content-Length: {len(obsah)}",
+        f"Connection: {'keep-alive' if udrzat_spojenie else 'close'}",
+    ]
+    riadky.extend(f"{nazov}: {hodnota}" for nazov, hodnota in hlavicky.items())
+    return ('\r\n'.join(riadky) + '\r\n\r\n').encode('latin-1') + obsah
+
+
+def _json_bajty(data):
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def spusti_server(host=PREDVOLENY_HOST, port=PREDVOLENY_PORT, cesta_partnerov=None, pracovnici=1,
+                  strategia_delenia=None, limity_bank=None, rozlozenie_strany=None):
+    """Spustí QR službu a blokuje do prerušenia (Ctrl+C)."""
+    server = QRServer(cesta_partnerov, pracovnici, strategia_delenia, limity_bank, rozlozenie_strany)
+    try:
+        asyncio.run(server.spusti(host, port))
+    except KeyboardInterrupt:
+        print(f"\n{ANSI_YELLOW}QR služba bola ukončená.{ANSI_END}")
@@ -0,0 +1,95 @@
+"""
+Stav dávkového behu: ktoré platby sú už hotové, s akým vstupom a do ktorých súborov.
+
+Záznam je JSONL súbor - po dokončení každej platby sa pridá jeden riadok
+{kluc, odtlacok, subory, ...}, takže po páde alebo prerušení ostanú zapísané všetky
+dokončené platby (neúplný posledný riadok sa pri načítaní ignoruje).
+Kľúčom je výstup platby (formát a základ názvu súboru), odtlačkom SHA-256 zo všetkých
+vstupov, ktoré menia výsledok (údaje platby a nastavenia výstupu). Ďalší beh preskočí
+platbu, ktorej odtlačok sa nezmenil a všetky jej súbory (pri SVG/PNG každý QR kód zvlášť)
+na disku stále existujú s rovnakou veľkosťou.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+
+VERZIA = 2  # Zmena formátu záznamu alebo výstupov zneplatní všetky staré odtlačky
+
+
+def odtlacok(info_platby, nastavenia_vystupu):
+    """
+    SHA-256 údajov platby a nastavení výstupu (formát, rozloženie, nastavenia QR, font...).
+    Dátum splatnosti sa nezapočítava - je to vždy deň generovania a nezmenená platba
+    sa nemá generovať znova iba preto, že prešiel deň.
+    """
+    platba = {kluc: hodnota for kluc, hodnota in info_platby.items() if kluc != 'datum'}
+    data = json.dumps([VERZIA, platba, nastavenia_vystupu], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _velkost(cesta):
+    """Veľkosť súboru, pri chýbajúcom súbore -1."""
+    try:
+        return os.path.getsize(cesta)
+    except OSError:
+        return -1
+
+
+class StavBehu:
+    """Hotové platby z predchádzajúcich behov a priebežný zápis nových."""
+
+    def __init__(self, cesta):
+        self.cesta = cesta
+        self._hotove = {}
+        pocet_riadkov = 0
+        if os.path.exists(cesta):
+            with open(cesta, 'r', encoding='utf-8') as f:
+                for riadok in f:
+                    try:
+                        zaznam = json.loads(riadok)
+                        self._hotove[zaznam['kluc']] = zaznam
+                        pocet_riadkov += 1
+                    except (ValueError, KeyError, TypeError):
+                        continue  # Neúplný riadok po páde
+        if pocet_riadkov > 2 * len(self._hotove) + 100:
+            self._zhutni()
+        self._subor = open(cesta, 'a', encoding='utf-8')
+
+    def _zhutni(self):
+        """Prepíše záznam iba s posledným stavom každej platby (atomicky, dočasný súbor + os.replace)."""
+        fd, docasny = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.cesta)), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for zaznam in self._hotove.values():
+                f.write(json.dumps(zaznam, ensure_ascii=False) + '\n')
+        os.replace(docasny, self.cesta)
+
+    def hotova(self, kluc, odtlacok_platby):
+        """
+        Vráti záznam predchádzajúceho behu, ak je platba s týmto odtlačkom hotová
+        a všetky jej súbory sú na disku (s rovnakou veľkosťou), inak None.
+        """
+        zaznam = self._hotove.get(kluc)
+        if zaznam is None or zaznam['odtlacok'] != odtlacok_platby:
+            return None
+        for cesta, velkost in zaznam['subory']:
+            if _velkost(cesta) != velkost:
+                return None
+        return zaznam
+
+    def zapis(self, kluc, odtlacok_platby, subory, **udaje):
+        """Zaznamená dokončenú platbu a hneď ju zapíše na disk."""
+        zaznam = {
+            'kluc': kluc,
+            'odtlacok': odtlacok_platby,
+            'subory': [[cesta, _velkost(cesta)] for cesta in subory],
+            'cas': datetime.now().isoformat(timespec='seconds'),
+        }
+        zaznam.update(udaje)
+        self._hotove[kluc] = zaznam
+        self._subor.write(json.dumps(zaznam, ensure_ascii=False, default=str) + '\n')
+        self._subor.flush()
+
+    def zatvor(self):
+        self._subor.close()
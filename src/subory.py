@@ -0,0 +1,175 @@
+"""
+Bezpečný zápis súborov, keď na jednom počítači beží naraz viac procesov generátora.
+
+Výstupy a config.json sa zapisujú atomicky: najprv do dočasného súboru vedľa cieľa
+(v názve je PID procesu, dva procesy teda nikdy nepíšu do toho istého dočasného súboru)
+a až po úspešnom zápise sa premenujú na cieľový názov (os.replace). Iný proces tak nikdy
+neuvidí rozpísaný súbor a prerušený zápis nepoškodí predchádzajúcu verziu.
+Úpravu config.json (načítanie, zmena, zápis) chráni zámok súboru medzi procesmi (zamok).
+Dočasné súbory procesov, ktoré boli ukončené uprostred zápisu, maže vycisti_docasne.
+"""
+import contextlib
+import itertools
+import os
+import re
+import time
+
+PRIPONA_ZAMKU = '.lock'
+CAKANIE_NA_ZAMOK_S = 10  # Iba Windows; fcntl.flock čaká, kým sa zámok neuvoľní
+VEK_OPUSTENEHO_DOCASNEHO_S = 3600  # Mladší dočasný súbor sa nemaže, ani keď jeho proces nebeží
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+ERROR_INVALID_PARAMETER = 87
+STILL_ACTIVE = 259
+
+_DOCASNY_SUBOR = re.compile(r'.+\.(\d+)\.\d+\.tmp')
+
+_pocitadlo = itertools.count()
+
+
+def docasna_cesta(cesta):
+    """Jedinečný názov dočasného súboru vedľa cieľa (v rámci procesu aj medzi procesmi)."""
+    return f"{cesta}.{os.getpid()}.{next(_pocitadlo)}.tmp"
+
+
+class AtomickySubor:
+    """
+    Binárny súbor na zápis, ktorý sa na cieľový názov premenuje až pri zatvorení.
+    zrus() (alebo výnimka v bloku with) dočasný súbor zmaže a cieľ nechá tak, ako bol.
+    """
+
+    def __init__(self, cesta):
+        self.cesta = cesta
+        self._docasna = docasna_cesta(cesta)
+        self._subor = open(self._docasna, 'xb')
+
+    @property
+    def closed(self):
+        return self._subor.closed
+
+    def write(self, data):
+        return self._subor.write(data)
+
+    def close(self):
+        if not self._subor.closed:
+            self._subor.close()
+            nahradit(self._docasna, self.cesta)
+
+    def zrus(self):
+        if not self._subor.closed:
+            self._subor.close()
+            with contextlib.suppress(OSError):
+                os.remove(self._docasna)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, typ_vynimky, *_):
+        if typ_vynimky is None:
+            self.close()
+        else:
+            self.zrus()
+
+
+def nahradit(docasna, cesta):
+    """
+    Premenuje dočasný súbor na cieľový. Ak sa to nepodarí (napr. na Windows je cieľ otvorený
+    v prehliadači PDF), dočasný súbor zmaže a chybu nechá volajúcemu.
+    """
+    try:
+        os.replace(docasna, cesta)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(docasna)
+        raise
+
+
+def _proces_bezi(pid):
+    """Či proces s daným PID ešte beží (pri pochybnostiach sa predpokladá, že áno)."""
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # os.kill na Windows proces ukončí - stav sa zisťuje cez OpenProcess/GetExitCodeProcess
+        import ctypes
+        from ctypes import wintypes
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        proces = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not proces:
+            # Neexistujúci proces vráti ERROR_INVALID_PARAMETER, chýbajúce práva znamenajú, že beží
+            return ctypes.get_last_error() != ERROR_INVALID_PARAMETER
+        try:
+            kod = wintypes.DWORD()
+            if not kernel32.GetExitCodeProcess(proces, ctypes.byref(kod)):
+                return True
+            return kod.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(proces)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # PermissionError - proces beží pod iným používateľom
+    return True
+
+
+def vycisti_docasne(priecinok, predpona_podpriecinkov=None):
+    """
+    Zmaže opustené dočasné súbory ('<názov>.<pid>.<n>.tmp') v priečinku a v jeho podpriečinkoch
+    začínajúcich predpona_podpriecinkov - zostanú po procese ukončenom uprostred zápisu. Maže iba
+    súbory staršie ako VEK_OPUSTENEHO_DOCASNEHO_S, ktorých proces (PID v názve) už nebeží - dlhá časť
+    PDF sa otvorí na začiatku a zapíše až na konci, bežiaci proces do nej celý čas nič nezapisuje.
+    """
+    hranica = time.time() - VEK_OPUSTENEHO_DOCASNEHO_S
+    try:
+        polozky = list(os.scandir(priecinok))
+    except OSError:
+        return
+    for polozka in polozky:
+        with contextlib.suppress(OSError):
+            if polozka.is_dir(follow_symlinks=False):
+                if predpona_podpriecinkov and polozka.name.startswith(predpona_podpriecinkov):
+                    vycisti_docasne(polozka.path)
+            else:
+                zhoda = _DOCASNY_SUBOR.fullmatch(polozka.name)
+                if zhoda and polozka.stat().st_mtime < hranica and not _proces_bezi(int(zhoda.group(1))):
+                    os.remove(polozka.path)
+
+
+def zapis_atomicky(cesta, data):
+    """Zapíše bajty do súboru naraz - iný proces uvidí buď starý, alebo celý nový obsah."""
+    with AtomickySubor(cesta) as f:
+        f.write(data)
+
+
+@contextlib.contextmanager
+def zamok(cesta):
+    """
+    Výhradný zámok súboru medzi procesmi (na '<cesta>.lock', samotný súbor sa atomicky nahrádza).
+    Súbor zámku sa nemaže - inak by dva procesy mohli zamknúť každý iný súbor.
+    """
+    with open(cesta + PRIPONA_ZAMKU, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            koniec = time.monotonic() + CAKANIE_NA_ZAMOK_S
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if time.monotonic() > koniec:
+                        raise
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,147 @@
+"""
+Výstupy vygenerovaných platieb okrem PDF: QR kód každej čiastky ako SVG/PNG súbor
+a payloady Pay by Square ako JSONL (bez kreslenia čohokoľvek).
+
+Zapisuje sa do cieľa - priečinka (CielPriecinok) alebo jedného ZIP archívu (CielZip),
+do ktorého sa súbory zapisujú priamo, bez dočasných súborov na disku. Oba ciele
+zapisujú atomicky (pozri subory) - súbor, ani archív, sa na cieľovom názve objaví
+až celý zapísaný, takže viac procesov môže písať do toho istého priečinka.
+Zapisovače prijímajú platby postupne (aj generátor) a vracajú zoznam vytvorených
+súborov; SVG/PNG bajty pripravuje už generovanie čiastok (aj v procesoch poolu).
+"""
+import json
+import os
+import time
+
+import meranie
+import subory
+
+# Tieto prípony sú už skomprimované, v ZIP archíve sa iba uložia
+UZ_SKOMPRIMOVANE = ('.png',)
+PREDPONA_NAZVU = 'QR_Platba_VS_'
+
+
+class CielPriecinok:
+    """Súbory sa zapisujú do priečinka (predvolene aktuálneho)."""
+
+    def __init__(self, priecinok='.'):
+        self.priecinok = priecinok
+        subory.vycisti_docasne(priecinok, PREDPONA_NAZVU)  # Po procesoch ukončených uprostred zápisu
+
+    def cesta(self, nazov):
+        """Cesta k súboru, ako sa hlási používateľovi a v reporte."""
+        return os.path.normpath(os.path.join(self.priecinok, nazov))
+
+    def otvor(self, nazov):
+        """
+        Otvorí súbor na zápis (binárne), chýbajúce priečinky vytvorí. Zapisuje sa do dočasného
+        súboru, ktorý sa na názov premenuje až pri zatvorení (pri výnimke v bloku with sa zahodí).
+        """
+        cesta = self.cesta(nazov)
+        os.makedirs(os.path.dirname(cesta) or '.', exist_ok=True)
+        return subory.AtomickySubor(cesta)
+
+    def zrus(self, subor):
+        """Zahodí rozpísaný súbor (pôvodný súbor s rovnakým názvom ostane nezmenený)."""
+        subor.zrus()
+
+    def zatvor(self):
+        pass
+
+
+class CielZip:
+    """
+    Všetky súbory idú do jedného ZIP archívu, každý sa zapisuje priamo do archívu.
+    Archív sa vytvára pod dočasným názvom a na cieľový sa premenuje až pri zatvorení.
+    """
+
+    def __init__(self, cesta):
+        import zipfile
+        self.cesta_archivu = cesta
+        self._docasna = subory.docasna_cesta(cesta)
+        self.archiv = zipfile.ZipFile(self._docasna, 'x', zipfile.ZIP_DEFLATED)
+
+    def cesta(self, nazov):
+        return f"{self.cesta_archivu}:{nazov}"
+
+    def otvor(self, nazov):
+        """Otvorí novú položku archívu na zápis (naraz môže byť otvorená iba jedna)."""
+        import zipfile
+        info = zipfile.ZipInfo(nazov.replace(os.sep, '/'), date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED if nazov.lower().endswith(UZ_SKOMPRIMOVANE) else zipfile.ZIP_DEFLATED
+        return self.archiv.open(info, 'w', force_zip64=True)
+
+    def zrus(self, subor):
+        """Položku archívu treba zatvoriť, inak sa archív nedá dokončiť; ostane v ňom neúplná."""
+        subor.close()
+
+    def zatvor(self):
+        try:
+            self.archiv.close()
+        except BaseException:
+            os.remove(self._docasna)
+            raise
+        subory.nahradit(self._docasna, self.cesta_archivu)
+
+
+def zaklad_nazvu(info_platby):
+    """Spoločný začiatok názvov výstupov platby (bez prípony)."""
+    return f"{PREDPONA_NAZVU}{info_platby['vs']}"
+
+
+def zapis_obrazky(info_platby, platby, ciel, statistiky=None):
+    """
+    Zapíše QR kód každej čiastky ako samostatný súbor '<základ>/<základ>_<poradie>.svg|png'.
+    Platby musia mať pripravené 'qr_svg' alebo 'qr_png' (bajty). Vráti zoznam vytvorených súborov.
+    """
+    zaciatok = time.perf_counter()
+    zaklad = zaklad_nazvu(info_platby)
+    vytvorene_subory = []
+    for platba in platby:
+        pripona, data = ('svg', platba['qr_svg']) if 'qr_svg' in platba else ('png', platba['qr_png'])
+        sirka = len(str(platba['celkovy_pocet']))
+        nazov = f"{zaklad}/{zaklad}_{platba['poradie']:0{sirka}d}.{pripona}"
+        with meranie.meraj('zapis_vystupu'), ciel.otvor(nazov) as f:
+            f.write(data)
+        vytvorene_subory.append(ciel.cesta(nazov))
+    if statistiky is not None:
+        # Do súhrnu ide priečinok, nie tisíce jednotlivých súborov
+        statistiky.update(stran=0, platieb=len(vytvorene_subory),
+                          subory=[ciel.cesta(zaklad + '/')] if vytvorene_subory else [],
+                          trvanie_s=time.perf_counter() - zaciatok)
+    return vytvorene_subory
+
+
+def zapis_payloady(info_platby, platby, ciel, statistiky=None):
+    """
+    Zapíše payloady všetkých čiastok do '<základ>.jsonl' (jeden JSON objekt na riadok
+    s poradím, sumou a payloadom). Nič sa nekreslí. Vráti zoznam vytvorených súborov.
+    """
+    zaciatok = time.perf_counter()
+    nazov = f"{zaklad_nazvu(info_platby)}.jsonl"
+    pocet = 0
+    with ciel.otvor(nazov) as f:
+        for platba in platby:
+            zaznam = {
+                'vs': info_platby['vs'],
+                'poradie': platba['poradie'],
+                'celkovy_pocet': platba['celkovy_pocet'],
+                'suma': str(platba['suma']),
+                'payload': platba['payload'],
+            }
+            with meranie.meraj('zapis_vystupu'):
+                f.write((json.dumps(zaznam, ensure_ascii=False) + '\n').encode('utf-8'))
+            pocet += 1
+    vytvorene_subory = [ciel.cesta(nazov)]
+    if statistiky is not None:
+        statistiky.update(stran=0, platieb=pocet, subory=vytvorene_subory, trvanie_s=time.perf_counter() - zaciatok)
+    return vytvorene_subory
+
+
+# Zapisovače podľa formátu; PDF kreslí main.vytvor_pdf_dokument
+ZAPISOVACE = {
+    'svg': zapis_obrazky,
+    'png': zapis_obrazky,
+    'payload': zapis_payloady,
+}
+FORMATY = ('pdf',) + tuple(ZAPISOVACE)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Moduly v src/ sa navzájom importujú ako samostatné moduly (python src/main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,51 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+import delenie
+
+IBAN = 'SK3112000000198742637541'  # Kód banky 1200
+LIMITY_BANK = {'1200': 250, '0900': 5000}
+
+
+def _sumy():
+    nahodne = random.Random(20261018)
+    sumy = ['0.01', '0.99', '1', '999.99', '1000', '1000.01', '2500', '5562,50', '123456.78', '24999999.99']
+    sumy += [f"{nahodne.randint(1, 10 ** nahodne.randint(1, 7))}.{nahodne.randint(0, 99):02d}" for _ in range(200)]
+    return sumy
+
+
+@pytest.mark.parametrize('strategia', delenie.STRATEGIE)
+def test_sucet_ciastok_sedi_na_cent(strategia):
+    for suma in _sumy():
+        ciastky = list(delenie.ciastky(suma, Decimal('1000.00'), strategia, IBAN, LIMITY_BANK))
+        limit = delenie.limit_ciastky(Decimal('1000.00'), strategia, IBAN, LIMITY_BANK)
+        assert sum(ciastky) == delenie.na_sumu(suma), (strategia, suma)
+        assert len(ciastky) == delenie.pocet_ciastok(suma, Decimal('1000.00'), strategia, IBAN, LIMITY_BANK)
+        assert all(0 < delenie.na_centy(c) <= limit and c == c.quantize(delenie.CENT) for c in ciastky)
+        if strategia == 'rovnomerne':
+            assert max(ciastky) - min(ciastky) <= delenie.CENT
+
+
+def test_poradie_zvysku():
+    assert list(delenie.ciastky('2500', 1000, 'strop')) == [Decimal('1000.00')] * 2 + [Decimal('500.00')]
+    assert list(delenie.ciastky('2500', 1000, 'zvysok_prvy')) == [Decimal('500.00')] + [Decimal('1000.00')] * 2
+    assert list(delenie.ciastky('5562', 1000, 'rovnomerne')) == [Decimal('927.00')] * 6
+
+
+@pytest.mark.parametrize('suma', ['1e26', '1e30', '-1e30', 'abc', '', 'nan', 'inf', '1,2,3'])
+def test_neplatna_suma_je_value_error(suma):
+    with pytest.raises(ValueError):
+        delenie.pocet_ciastok(suma, 1000)
+    with pytest.raises(ValueError):
+        list(delenie.ciastky(suma, 1000))
+
+
+def test_prilis_vela_ciastok():
+    suma = Decimal(1000) * (delenie.MAX_CIASTOK + 1)
+    assert delenie.pocet_ciastok(Decimal(1000) * delenie.MAX_CIASTOK, 1000) == delenie.MAX_CIASTOK
+    with pytest.raises(ValueError):
+        delenie.pocet_ciastok(suma, 1000)
+    with pytest.raises(ValueError):
+        next(delenie.ciastky(suma, 1000))
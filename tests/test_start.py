@@ -0,0 +1,7 @@
+import benchmark
+
+
+def test_start_bez_tazkych_kniznic():
+    # Čas štartu závisí od stroja - rozpočet v ms kontroluje iba benchmark.py --start
+    start = benchmark.zmeraj_start(opakovani=0)
+    assert start['tazke_moduly'] == []